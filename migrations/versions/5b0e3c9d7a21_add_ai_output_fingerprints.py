@@ -0,0 +1,37 @@
+"""Add fingerprints of the inputs behind stored AI outputs.
+
+Revision ID: 5b0e3c9d7a21
+Revises: 16e578626d45
+Create Date: 2026-10-17 10:12:03.418562
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e3c9d7a21'
+down_revision: Union[str, Sequence[str], None] = '16e578626d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('consultations', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('ai_diag_fingerprint', sa.String(length=64))
+        )
+        batch_op.add_column(
+            sa.Column('ai_exam_fingerprint', sa.String(length=64))
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('consultations', schema=None) as batch_op:
+        batch_op.drop_column('ai_exam_fingerprint')
+        batch_op.drop_column('ai_diag_fingerprint')
@@ -0,0 +1,45 @@
+"""Add wearable_series table for columnar wearable data.
+
+Revision ID: c3a7e91f4b25
+Revises: 8f2d4a6c1e37
+Create Date: 2026-10-17 14:21:08.553102
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7e91f4b25'
+down_revision: Union[str, Sequence[str], None] = '8f2d4a6c1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'wearable_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('consultation_id', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=20), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('columns', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['consultation_id'],
+            ['consultations.id'],
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('consultation_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('wearable_series')
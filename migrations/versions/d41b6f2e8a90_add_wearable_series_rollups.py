@@ -0,0 +1,31 @@
+"""Store wearable rollups on the series row instead of the consultation.
+
+Revision ID: d41b6f2e8a90
+Revises: c3a7e91f4b25
+Create Date: 2026-10-17 16:02:41.207315
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b6f2e8a90'
+down_revision: Union[str, Sequence[str], None] = 'c3a7e91f4b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('wearable_series', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rollups', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('wearable_series', schema=None) as batch_op:
+        batch_op.drop_column('rollups')
@@ -0,0 +1,37 @@
+"""Add owner and lease columns to jobs.
+
+Revision ID: e7c2a5d9b134
+Revises: d41b6f2e8a90
+Create Date: 2026-10-17 16:48:09.531872
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2a5d9b134'
+down_revision: Union[str, Sequence[str], None] = 'd41b6f2e8a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('owner', sa.String(length=255), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column('lease_expires_at', sa.DateTime(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('owner')
@@ -0,0 +1,349 @@
+"""In-process background jobs for the research app.
+
+Expensive steps (LLM calls, report extraction, de-identification) are
+submitted as jobs instead of running inside the request. Job state lives
+in the ``jobs`` table, so pages can poll for results and jobs that were
+queued or running when the server stopped are picked up again on start.
+A fixed number of worker threads executes jobs in priority order (lower
+numbers first, then submission order).
+
+Several processes may share the table. A worker claims a job with a
+conditional ``UPDATE`` (only one process moves it out of ``queued``) and
+holds it under a lease that its queue renews while the job runs. Only
+running jobs whose lease has expired, i.e. whose owner stopped, are
+queued again.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import socket
+import threading
+import uuid
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from research.models.ui import Job
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any], Session], Any]
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+ACTIVE = (QUEUED, RUNNING)
+
+# seconds a running job stays claimed without a heartbeat from its owner
+LEASE_SECONDS = 60
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    """Return the public view of *job* used by the polling endpoints."""
+
+    def _iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'patient_id': job.patient_uuid,
+        'status': job.status,
+        'priority': job.priority,
+        'result': job.result,
+        'error': job.error,
+        'created_at': _iso(job.created_at),
+        'started_at': _iso(job.started_at),
+        'finished_at': _iso(job.finished_at),
+    }
+
+
+class JobQueue:
+    """Bounded worker pool executing persisted jobs by priority."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        max_workers: int = 4,
+        lease_seconds: float = LEASE_SECONDS,
+    ) -> None:
+        """Create a stopped queue; :meth:`start` launches the workers."""
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.lease = timedelta(seconds=lease_seconds)
+        # identifies this queue's claims across processes and hosts
+        self.owner = (
+            f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        )
+        self._stop = threading.Event()
+        self._handlers: Dict[str, Tuple[Handler, int]] = {}
+        # (priority, sequence, job id); a None id stops a worker
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._lease_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: Handler, priority: int = 0):
+        """Run *handler* for jobs of *kind*, by default at *priority*.
+
+        The handler receives the job payload and a fresh database session
+        and returns a JSON-serialisable result.
+        """
+        self._handlers[kind] = (handler, priority)
+
+    def start(self) -> 'JobQueue':
+        """Re-queue unfinished jobs from the database and start workers.
+
+        A lease thread renews the leases of the jobs this queue runs and
+        picks up running jobs whose owner let the lease expire.
+        """
+        with self._lock:
+            if self._threads:
+                return self
+            self._stop.clear()
+            resumed = self._reclaim(queued=True)
+            if resumed:
+                logger.info('Resuming %d unfinished jobs', resumed)
+            for i in range(self.max_workers):
+                thread = threading.Thread(
+                    target=self._work, name=f'job-worker-{i}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            self._lease_thread = threading.Thread(
+                target=self._keep_leases, name='job-lease', daemon=True
+            )
+            self._lease_thread.start()
+        return self
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        patient_id: Optional[str] = None,
+        priority: Optional[int] = None,
+        dedupe: bool = True,
+    ) -> str:
+        """Persist a new job and queue it; return its id.
+
+        With *dedupe*, an unfinished job of the same kind for the same
+        patient is returned instead of queueing a duplicate, so refreshing
+        a waiting page does not pile up work.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f'No handler registered for job kind {kind!r}')
+        if priority is None:
+            priority = self._handlers[kind][1]
+        with self.session_factory() as db:
+            if dedupe and patient_id is not None:
+                existing = (
+                    db.query(Job)
+                    .filter(
+                        Job.kind == kind,
+                        Job.patient_uuid == patient_id,
+                        Job.status.in_(ACTIVE),
+                    )
+                    .first()
+                )
+                if existing is not None:
+                    return str(existing.id)
+            job = Job(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                patient_uuid=patient_id,
+                status=QUEUED,
+                priority=priority,
+                payload=payload,
+                created_at=datetime.utcnow(),
+            )
+            db.add(job)
+            db.commit()
+            job_id = str(job.id)
+        self._push(priority, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the state of *job_id*, or None if it does not exist."""
+        with self.session_factory() as db:
+            job = db.get(Job, job_id)
+            return job_to_dict(job) if job else None
+
+    def list(
+        self,
+        patient_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return the most recent jobs, optionally filtered."""
+        with self.session_factory() as db:
+            query = db.query(Job)
+            if patient_id is not None:
+                query = query.filter(Job.patient_uuid == patient_id)
+            if status is not None:
+                query = query.filter(Job.status == status)
+            jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+            return [job_to_dict(job) for job in jobs]
+
+    def join(self) -> None:
+        """Block until every queued job has been processed."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """Stop the workers once the jobs already queued are done."""
+        with self._lock:
+            for _ in self._threads:
+                # sentinels sort after every real priority
+                self._queue.put((2**31, next(self._seq), None))
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            # leases are renewed until the last job has finished
+            self._stop.set()
+            if self._lease_thread is not None:
+                self._lease_thread.join()
+                self._lease_thread = None
+
+    def _push(self, priority: int, job_id: str) -> None:
+        self._queue.put((priority, next(self._seq), job_id))
+
+    def _reclaim(self, queued: bool = False) -> int:
+        """Queue running jobs with an expired lease; return how many.
+
+        With *queued*, jobs already waiting in the table are pushed too.
+        Jobs without a lease were started before leases existed.
+        """
+        now = datetime.utcnow()
+        expired = (Job.status == RUNNING) & (
+            Job.lease_expires_at.is_(None) | (Job.lease_expires_at < now)
+        )
+        with self.session_factory() as db:
+            stale = db.query(Job.id).filter(expired).all()
+            if stale:
+                db.query(Job).filter(
+                    expired, Job.id.in_([row.id for row in stale])
+                ).update(
+                    {
+                        Job.status: QUEUED,
+                        Job.owner: None,
+                        Job.started_at: None,
+                        Job.lease_expires_at: None,
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+            query = db.query(Job.id, Job.priority).filter(Job.status == QUEUED)
+            if not queued:
+                query = query.filter(Job.id.in_([row.id for row in stale]))
+            # pushing a job another process also holds is harmless: only
+            # one of them wins the claim in _run
+            pending = query.order_by(Job.created_at).all()
+        for job_id, priority in pending:
+            self._push(priority, job_id)
+        return len(pending)
+
+    def _keep_leases(self) -> None:
+        interval = self.lease.total_seconds() / 3
+        while not self._stop.wait(interval):
+            try:
+                with self.session_factory() as db:
+                    db.query(Job).filter(
+                        Job.owner == self.owner, Job.status == RUNNING
+                    ).update(
+                        {Job.lease_expires_at: datetime.utcnow() + self.lease},
+                        synchronize_session=False,
+                    )
+                    db.commit()
+                self._reclaim()
+            except Exception:
+                logger.exception('Could not renew job leases')
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                if job_id is None:
+                    return
+                self._run(job_id)
+            except Exception:
+                logger.exception('Job %s crashed the worker loop', job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str) -> None:
+        with self.session_factory() as db:
+            now = datetime.utcnow()
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == job_id, Job.status == QUEUED)
+                .update(
+                    {
+                        Job.status: RUNNING,
+                        Job.owner: self.owner,
+                        Job.started_at: now,
+                        Job.lease_expires_at: now + self.lease,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if claimed != 1:
+                # finished, or claimed by another worker or process
+                return
+            job = db.get(Job, job_id)
+            kind, payload = job.kind, dict(job.payload or {})
+
+        handler, _ = self._handlers[kind]
+        result: Any = None
+        error: Optional[str] = None
+        with self.session_factory() as work_db:
+            try:
+                result = handler(payload, work_db)
+            except Exception as exc:
+                work_db.rollback()
+                logger.exception('Job %s (%s) failed', job_id, kind)
+                error = str(exc) or type(exc).__name__
+
+        with self.session_factory() as db:
+            finished = (
+                db.query(Job)
+                .filter(
+                    Job.id == job_id,
+                    Job.owner == self.owner,
+                    Job.status == RUNNING,
+                )
+                .update(
+                    {
+                        Job.status: FAILED if error else DONE,
+                        Job.result: result,
+                        Job.error: error,
+                        Job.finished_at: datetime.utcnow(),
+                        Job.lease_expires_at: None,
+                        # inputs may hold identifiable data; only results
+                        # are kept
+                        Job.payload: None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+        if finished != 1:
+            logger.warning('Job %s lost its lease before finishing', job_id)
+
+
+__all__ = [
+    'ACTIVE',
+    'DONE',
+    'FAILED',
+    'LEASE_SECONDS',
+    'QUEUED',
+    'RUNNING',
+    'JobQueue',
+    'job_to_dict',
+]
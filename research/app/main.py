@@ -17,15 +17,20 @@ repository pattern, preventing data loss on server restart. State is
 derived from the patient data itself.
 """
 
-import io
+import asyncio
+import json
 import logging
+import os
 import sys
+import tempfile
 import uuid
 
+from dataclasses import dataclass
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, cast
+from urllib.parse import urlencode
 
 from fastapi import (
     Depends,
@@ -36,28 +41,51 @@ from fastapi import (
     Request,
     UploadFile,
 )
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 
 # Now import the project-specific modules
 from hiperhealth.agents.diagnostics import core as diag
+from hiperhealth.agents.extraction.columnar import TableBuilder
 from hiperhealth.agents.extraction.medical_reports import (
-    MedicalReportFileExtractor,
+    get_medical_report_extractor,
+)
+from hiperhealth.agents.extraction.wearable import (
+    get_wearable_data_extractor,
 )
-from hiperhealth.agents.extraction.wearable import WearableDataFileExtractor
+from hiperhealth.agents.metrics import registry as llm_metrics
+from hiperhealth.agents.resilience import LLMUnavailableError
+from hiperhealth.agents.streaming import PartialDiagnosis
 from hiperhealth.privacy.deidentifier import (
     Deidentifier,
     deidentify_patient_record,
 )
+from hiperhealth.schema.clinical_outputs import (
+    LLMDiagnosis,
+    LLMDiagnosisWithExams,
+)
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from sqlalchemy.orm import Session
 
 from research.app.database import SessionLocal
+from research.app.jobs import JobQueue
+from research.app.prefetch import ExamPrefetcher
 from research.app.reports import (
+    discard_spooled_reports,
+    extract_spooled_reports,
     load_fhir_reports,
     process_uploaded_reports,
     save_fhir_reports,
+    spool_uploaded_reports,
 )
+from research.app.wearable import save_wearable_table, wearable_prompt_data
 from research.models.repositories import ResearchRepository
 from research.models.ui import Patient
 
@@ -69,6 +97,12 @@ sys.path.append(str(PROJECT_ROOT / 'src'))
 sys.path.append(str(PROJECT_ROOT))
 
 APP_DIR = Path(__file__).parent
+# uploaded reports wait here for their job; they hold patient data, so
+# the default is outside the source tree
+JOB_SPOOL_DIR = Path(
+    os.getenv('JOB_SPOOL_DIR')
+    or Path(tempfile.gettempdir()) / 'hiperhealth-uploads'
+)
 TEMPLATES = Environment(
     loader=FileSystemLoader(APP_DIR / 'templates'),
     autoescape=select_autoescape(),
@@ -91,6 +125,23 @@ def get_deidentifier() -> Deidentifier:
     return Deidentifier()
 
 
+@lru_cache(maxsize=None)
+def get_exam_prefetcher() -> Optional[ExamPrefetcher]:
+    """Get the shared exam prefetcher, or None when disabled.
+
+    ``EXAM_PREFETCH_TOP_N`` (default 3, ``0`` disables) sets how many likely
+    selections are prefetched, ``EXAM_PREFETCH_WORKERS`` the pool size and
+    ``EXAM_PREFETCH_TTL`` (default 900) the seconds unclaimed requests are
+    kept.
+    """
+    top_n = int(os.getenv('EXAM_PREFETCH_TOP_N', '3'))
+    if top_n <= 0:
+        return None
+    workers = int(os.getenv('EXAM_PREFETCH_WORKERS', '4'))
+    ttl = float(os.getenv('EXAM_PREFETCH_TTL', '900'))
+    return ExamPrefetcher(max_workers=workers, top_n=top_n, ttl=ttl)
+
+
 def get_repository(
     db: Session = Depends(get_db),
 ) -> ResearchRepository:
@@ -104,6 +155,18 @@ app = FastAPI(title='TeleHealthCareAI â€" Physician Portal')
 app.mount('/static', _STATIC, name='static')
 
 
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(
+    request: Request, exc: LLMUnavailableError
+) -> HTMLResponse:
+    """Answer 503 instead of holding the request when the LLM is degraded."""
+    logger.warning('LLM unavailable: %s', exc)
+    return HTMLResponse(
+        'The AI assistant is temporarily unavailable. Please try again.',
+        status_code=503,
+    )
+
+
 # --- Helper Functions ---
 def _render(template: str, **context: Any) -> HTMLResponse:
     tpl = TEMPLATES.get_template(template)
@@ -230,6 +293,38 @@ def patient_to_dict(patient: Patient) -> Dict[str, Any]:
     return patient_dict
 
 
+def _differential_patient(
+    patient: Patient, record: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return the patient payload of the differential prompt.
+
+    The daily wearable windows are not part of the record; they are read
+    from the stored rollups here.
+    """
+    consultation = patient.consultations[-1]
+    return dict(
+        record['patient'], wearable_data=wearable_prompt_data(consultation)
+    )
+
+
+async def _prefetched_exams(
+    patient_id: str, selected: List[str], lang: str
+) -> Optional[LLMDiagnosis]:
+    """Return a speculative exams result for *selected*, if one exists."""
+    prefetcher = get_exam_prefetcher()
+    if prefetcher is None:
+        return None
+    future = prefetcher.take(patient_id, selected, language=lang)
+    if future is None or future.cancelled():
+        # awaiting a cancelled future would cancel this request instead
+        return None
+    try:
+        return await asyncio.wrap_future(future)
+    except Exception:
+        logger.warning('Prefetched exams failed', exc_info=True)
+        return None
+
+
 def _get_next_step(patient: Patient) -> str:
     """Determine the next step by checking for missing data."""
     if not patient.consultations:
@@ -513,7 +608,7 @@ async def tests_post(
         if isinstance(r, dict) and 'filename' in r
     }
 
-    extractor = MedicalReportFileExtractor()
+    extractor = get_medical_report_extractor()
     context = {
         'patient_id': patient_id,
         'patient_data': {},
@@ -528,22 +623,43 @@ async def tests_post(
             return _render('tests.html', **context)
         return RedirectResponse(f'/consultation/{patient_id}', status_code=303)
 
+    jobs = get_job_queue()
+    if action == 'upload' and reports and jobs is not None:
+        files, error = await spool_uploaded_reports(
+            reports, seen_filenames, extractor, JOB_SPOOL_DIR
+        )
+        if not files:
+            context['error'] = error
+            return _render('tests.html', **context)
+        try:
+            job_id = await run_in_threadpool(
+                jobs.submit,
+                'reports',
+                {'patient_id': patient_id, 'files': files, 'rejected': error},
+                patient_id=patient_id,
+                dedupe=False,
+            )
+        except Exception:
+            discard_spooled_reports(files)
+            raise
+        return _wait_for_job(job_id, f'/tests?patient_id={patient_id}')
+
     if action == 'upload' and reports:
         new_reports, error = await process_uploaded_reports(
             reports, seen_filenames, extractor
         )
+        if new_reports:
+            # keep the reports that succeeded even if others failed
+            fhir_reports.extend(new_reports)
+            try:
+                save_fhir_reports(consultation, fhir_reports, repo)
+            except Exception as e:
+                context['error'] = f'Report data validation failed: {e}'
+                return _render('tests.html', **context)
         if error:
             context['error'] = error
             return _render('tests.html', **context)
 
-        fhir_reports.extend(new_reports)
-
-        try:
-            save_fhir_reports(consultation, fhir_reports, repo)
-        except Exception as e:
-            context['error'] = f'Report data validation failed: {e}'
-            return _render('tests.html', **context)
-
         record = patient_to_dict(patient)
         context = {
             'patient_id': patient_id,
@@ -594,13 +710,19 @@ async def wearable_post(
         return RedirectResponse(f'/consultation/{patient_id}', status_code=303)
 
     if file and file.size > 0:
-        extractor = WearableDataFileExtractor()
+        extractor = get_wearable_data_extractor()
         try:
-            file_content = await file.read()
-            wearable_data = extractor.extract_wearable_data(
-                io.BytesIO(file_content)
+            # parse the upload chunk by chunk instead of buffering it;
+            # cells stay strings and are typed a batch column at a time
+            builder = TableBuilder()
+            async for batch in extractor.aiter_wearable_records(
+                file, raw=True
+            ):
+                await run_in_threadpool(builder.add, batch)
+            table = await run_in_threadpool(builder.build)
+            await run_in_threadpool(
+                save_wearable_table, consultation, table, repo.db
             )
-            consultation.wearable_data = wearable_data
             repo.db.commit()
             return RedirectResponse(
                 f'/consultation/{patient_id}', status_code=303
@@ -625,24 +747,202 @@ async def wearable_post(
     return _render('wearable.html', **context)
 
 
-@app.get('/diagnosis', response_class=HTMLResponse)
-def diagnosis(
-    request: Request,
+def _streaming_enabled() -> bool:
+    """Return True unless ``DIAGNOSIS_STREAMING=0`` disables SSE pages."""
+    return os.getenv('DIAGNOSIS_STREAMING', '1') != '0'
+
+
+def _stored_output(
+    raw: Optional[Dict[str, Any]],
+    fingerprint: Optional[str],
+    expected: str,
+) -> Optional[LLMDiagnosisWithExams]:
+    """Return a stored AI output if it was built from the same inputs."""
+    if not raw or fingerprint != expected:
+        return None
+    return LLMDiagnosisWithExams.model_validate(raw)
+
+
+def _store_differential(
+    repo: ResearchRepository,
+    patient_id: str,
+    lang: str,
+    ai: LLMDiagnosisWithExams,
+    fingerprint: str,
+) -> None:
+    """Persist the differential and start prefetching likely exams."""
+    consultation = repo.get_patient_by_uuid(patient_id).consultations[-1]
+    consultation.ai_diag_raw = ai.model_dump()
+    consultation.ai_diag_fingerprint = fingerprint
+    repo.db.commit()
+
+    prefetcher = get_exam_prefetcher()
+    if prefetcher is not None:
+        prefetcher.schedule(
+            patient_id,
+            ai.options,
+            language=lang,
+            skip=lambda selection: ai.exams_for(selection) is not None,
+        )
+
+
+def _store_exams(
+    repo: ResearchRepository,
+    patient_id: str,
+    lang: str,
+    ai: LLMDiagnosis,
+) -> None:
+    """Persist exam suggestions for the current diagnosis selection."""
+    patient = repo.get_patient_by_uuid(patient_id)
+    selected = patient_to_dict(patient)['selected_diagnoses']
+    consultation = patient.consultations[-1]
+    consultation.ai_exam_raw = ai.model_dump()
+    consultation.ai_exam_fingerprint = diag.exams_fingerprint(selected, lang)
+    repo.db.commit()
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'event: {event}\ndata: {payload}\n\n'
+
+
+@dataclass
+class DifferentialInputs:
+    """What the differential endpoints need, read off the event loop."""
+
+    patient_id: str
+    lang: str
+    patient: Dict[str, Any]
+    fingerprint: str
+    stored: Optional[LLMDiagnosisWithExams]
+
+
+def differential_inputs(
     patient_id: str,
     repo: ResearchRepository = Depends(get_repository),
-) -> HTMLResponse:
-    """Display AI-generated diagnosis suggestions."""
+) -> DifferentialInputs:
+    """Load the consultation and fingerprint its differential inputs.
+
+    A sync dependency, so FastAPI runs the queries, serialisation and
+    prompt assembly in its threadpool.
+    """
     patient = repo.get_patient_by_uuid(patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail='Patient not found')
     record = patient_to_dict(patient)
     lang = record['meta']['lang']
-
-    ai = diag.differential(
-        record['patient'], language=lang, session_id=patient_id
+    consultation = patient.consultations[-1]
+    payload = _differential_patient(patient, record)
+    fingerprint = diag.differential_fingerprint(payload, lang)
+    stored = _stored_output(
+        consultation.ai_diag_raw, consultation.ai_diag_fingerprint, fingerprint
     )
+    return DifferentialInputs(patient_id, lang, payload, fingerprint, stored)
+
+
+@dataclass
+class ExamsInputs:
+    """What the exams endpoints need, read off the event loop."""
+
+    patient_id: str
+    lang: str
+    selected: List[str]
+    # stored suggestions, or exams bundled with a current differential
+    ai: Optional[LLMDiagnosis]
+    stored: bool
+
+
+def exams_inputs(
+    patient_id: str,
+    repo: ResearchRepository = Depends(get_repository),
+) -> ExamsInputs:
+    """Load the selected diagnoses and any reusable exam suggestions.
+
+    Exams bundled with the stored differential are used only while that
+    differential matches the consultation inputs.
+    """
+    patient = repo.get_patient_by_uuid(patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail='Patient not found')
+    record = patient_to_dict(patient)
+    lang = record['meta']['lang']
+    selected = record['selected_diagnoses']
 
     consultation = patient.consultations[-1]
-    consultation.ai_diag_raw = ai.model_dump()
-    repo.db.commit()
+    fingerprint = diag.exams_fingerprint(selected, lang)
+    ai: Optional[LLMDiagnosis] = _stored_output(
+        consultation.ai_exam_raw, consultation.ai_exam_fingerprint, fingerprint
+    )
+    if ai is not None:
+        return ExamsInputs(patient_id, lang, selected, ai, stored=True)
+    # the stored differential only answers for the current inputs
+    current = diag.differential_fingerprint(
+        _differential_patient(patient, record), lang
+    )
+    if consultation.ai_diag_fingerprint == current:
+        ai = diag.precomputed_exams(consultation.ai_diag_raw, selected)
+    return ExamsInputs(patient_id, lang, selected, ai, stored=False)
+
+
+@app.get('/diagnosis', response_class=HTMLResponse)
+async def diagnosis(
+    request: Request,
+    regenerate: bool = False,
+    inputs: DifferentialInputs = Depends(differential_inputs),
+    repo: ResearchRepository = Depends(get_repository),
+) -> HTMLResponse:
+    """Display AI-generated diagnosis suggestions.
+
+    The stored differential is shown again while the consultation inputs
+    are unchanged. Otherwise, with streaming enabled, the page is returned
+    straight away and filled in from ``/diagnosis/stream``. *regenerate*
+    bypasses the LLM response cache for the new differential.
+    """
+    patient_id, lang = inputs.patient_id, inputs.lang
+    if inputs.stored is not None:
+        return _render(
+            'diagnosis.html',
+            request=request,
+            patient_id=patient_id,
+            summary=inputs.stored.summary,
+            options=inputs.stored.options,
+            lang=lang,
+        )
+
+    if _streaming_enabled():
+        return _render(
+            'diagnosis.html',
+            request=request,
+            patient_id=patient_id,
+            summary='',
+            options=[],
+            lang=lang,
+            stream=True,
+            regenerate=regenerate,
+        )
+
+    jobs = get_job_queue()
+    if jobs is not None:
+        job_id = await run_in_threadpool(
+            jobs.submit,
+            'differential',
+            {'patient_id': patient_id, 'regenerate': regenerate},
+            patient_id=patient_id,
+        )
+        return _wait_for_job(job_id, f'/diagnosis?patient_id={patient_id}')
+
+    # One round-trip returns the differential plus exams per option, so the
+    # exams step can usually be served without another LLM call.
+    ai = await diag.adifferential_with_exams(
+        inputs.patient,
+        language=lang,
+        session_id=patient_id,
+        refresh=regenerate,
+    )
+    await run_in_threadpool(
+        _store_differential, repo, patient_id, lang, ai, inputs.fingerprint
+    )
 
     return _render(
         'diagnosis.html',
@@ -654,6 +954,94 @@ def diagnosis(
     )
 
 
+@app.get('/diagnosis/stream')
+async def diagnosis_stream(
+    regenerate: bool = False,
+    inputs: DifferentialInputs = Depends(differential_inputs),
+    repo: ResearchRepository = Depends(get_repository),
+) -> StreamingResponse:
+    """Stream the differential as server-sent events.
+
+    Emits ``summary`` events as the summary grows, one ``option`` event per
+    completed diagnosis and a final ``done`` event once the validated reply
+    has been stored in ``ai_diag_raw``; failures end with ``error``. A
+    stored differential for unchanged inputs is replayed without a call;
+    *regenerate* bypasses the LLM response cache.
+    """
+    patient_id, lang, stored = inputs.patient_id, inputs.lang, inputs.stored
+
+    async def events() -> AsyncIterator[str]:
+        if stored is not None:
+            yield _sse('summary', stored.summary)
+            for option in stored.options:
+                yield _sse('option', option)
+            yield _sse(
+                'done', {'summary': stored.summary, 'options': stored.options}
+            )
+            return
+        partial = PartialDiagnosis()
+        try:
+            async for item in diag.astream_differential_with_exams(
+                inputs.patient,
+                language=lang,
+                session_id=patient_id,
+                refresh=regenerate,
+            ):
+                if isinstance(item, str):
+                    for event, value in partial.feed(item):
+                        yield _sse(event, value)
+                    continue
+                ai = cast(LLMDiagnosisWithExams, item)
+                await run_in_threadpool(
+                    _store_differential,
+                    repo,
+                    patient_id,
+                    lang,
+                    ai,
+                    inputs.fingerprint,
+                )
+                yield _sse(
+                    'done', {'summary': ai.summary, 'options': ai.options}
+                )
+        except (LLMUnavailableError, HTTPException) as exc:
+            logger.warning('Streaming differential failed: %s', exc)
+            yield _sse('error', 'The AI assistant is temporarily unavailable.')
+        except Exception:
+            # the response has started, so the client only sees this event
+            logger.exception(
+                'Streaming differential for %s failed', patient_id
+            )
+            yield _sse('error', 'The differential could not be generated.')
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@app.post(
+    '/diagnosis/regenerate', response_class=RedirectResponse, status_code=303
+)
+def diagnosis_regenerate(
+    patient_id: str,
+    repo: ResearchRepository = Depends(get_repository),
+) -> RedirectResponse:
+    """Discard the stored differential so it is generated afresh.
+
+    The redirect asks for a fresh completion too, since the LLM response
+    cache would otherwise return the same reply for the same inputs.
+    """
+    patient = repo.get_patient_by_uuid(patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail='Patient not found')
+    patient.consultations[-1].ai_diag_fingerprint = None
+    repo.db.commit()
+    return RedirectResponse(
+        f'/diagnosis?patient_id={patient_id}&regenerate=true', status_code=303
+    )
+
+
 @app.post('/diagnosis')
 async def diagnosis_post(
     request: Request,
@@ -685,23 +1073,39 @@ async def diagnosis_post(
 
 
 @app.get('/exams', response_class=HTMLResponse)
-def exams(
+async def exams(
     request: Request,
-    patient_id: str,
+    inputs: ExamsInputs = Depends(exams_inputs),
     repo: ResearchRepository = Depends(get_repository),
 ) -> HTMLResponse:
-    """Display AI-generated exam suggestions."""
-    patient = repo.get_patient_by_uuid(patient_id)
-    record = patient_to_dict(patient)
-    lang = record['meta']['lang']
-
-    ai = diag.exams(
-        record['selected_diagnoses'], language=lang, session_id=patient_id
+    """Display AI-generated exam suggestions.
+
+    The stored suggestions are shown again while the selected diagnoses
+    are unchanged.
+    """
+    patient_id, lang, selected = (
+        inputs.patient_id,
+        inputs.lang,
+        inputs.selected,
     )
-
-    consultation = patient.consultations[-1]
-    consultation.ai_exam_raw = ai.model_dump()
-    repo.db.commit()
+    ai = inputs.ai
+    if not inputs.stored:
+        jobs = get_job_queue()
+        if ai is None and jobs is not None:
+            job_id = await run_in_threadpool(
+                jobs.submit,
+                'exams',
+                {'patient_id': patient_id},
+                patient_id=patient_id,
+            )
+            return _wait_for_job(job_id, f'/exams?patient_id={patient_id}')
+        if ai is None:
+            ai = await _prefetched_exams(patient_id, selected, lang)
+        if ai is None:
+            ai = await diag.aexams(
+                selected, language=lang, session_id=patient_id
+            )
+        await run_in_threadpool(_store_exams, repo, patient_id, lang, ai)
 
     return _render(
         'exams.html',
@@ -713,14 +1117,47 @@ def exams(
     )
 
 
+@app.post(
+    '/exams/regenerate', response_class=RedirectResponse, status_code=303
+)
+async def exams_regenerate(
+    inputs: ExamsInputs = Depends(exams_inputs),
+    repo: ResearchRepository = Depends(get_repository),
+) -> RedirectResponse:
+    """Ask the model for new exam suggestions, then show them."""
+    patient_id, lang = inputs.patient_id, inputs.lang
+    next_url = f'/exams?patient_id={patient_id}'
+    jobs = get_job_queue()
+    if jobs is not None:
+        job_id = await run_in_threadpool(
+            jobs.submit,
+            'exams',
+            {'patient_id': patient_id, 'regenerate': True},
+            patient_id=patient_id,
+            dedupe=False,
+        )
+        return _wait_for_job(job_id, next_url)
+
+    ai = await diag.aexams(
+        inputs.selected,
+        language=lang,
+        session_id=patient_id,
+        refresh=True,
+    )
+    await run_in_threadpool(_store_exams, repo, patient_id, lang, ai)
+    return RedirectResponse(next_url, status_code=303)
+
+
 @app.post('/exams')
 async def exams_post(
     request: Request,
     patient_id: str,
-    deidentifier: Deidentifier = Depends(get_deidentifier),
     repo: ResearchRepository = Depends(get_repository),
 ) -> RedirectResponse:
-    """Save selected exams, evaluations, and finalize the record."""
+    """Save selected exams, evaluations, and finalize the record.
+
+    De-identification runs as a background job when the queue is enabled.
+    """
     form_data = await request.form()
     selected = form_data.getlist('selected')
     custom = form_data.getlist('custom')
@@ -741,8 +1178,23 @@ async def exams_post(
             }
         }
 
-    deidentified_record = deidentify_patient_record(record, deidentifier)
-    repo.update_consultation(patient_id, deidentified_record)
+    jobs = get_job_queue()
+    if jobs is not None:
+        job_id = await run_in_threadpool(
+            jobs.submit,
+            'deidentify',
+            {'patient_id': patient_id, 'record': record},
+            patient_id=patient_id,
+            dedupe=False,
+        )
+        return _wait_for_job(job_id, f'/done?patient_id={patient_id}')
+
+    deidentified_record = await run_in_threadpool(
+        deidentify_patient_record, record, get_deidentifier()
+    )
+    await run_in_threadpool(
+        repo.update_consultation, patient_id, deidentified_record
+    )
     return RedirectResponse(f'/done?patient_id={patient_id}', status_code=303)
 
 
@@ -800,3 +1252,164 @@ def delete_patient(
     """Delete a patient record."""
     repo.delete_patient(patient_id)
     return RedirectResponse(url='/', status_code=303)
+
+
+# --- Background Jobs ---
+def _differential_job(payload: Dict[str, Any], db: Session) -> Any:
+    repo = ResearchRepository(db_session=db)
+    patient_id = payload['patient_id']
+    patient = repo.get_patient_by_uuid(patient_id)
+    if patient is None:
+        raise LookupError(f'Unknown patient {patient_id}')
+    record = patient_to_dict(patient)
+    lang = record['meta']['lang']
+    payload = _differential_patient(patient, record)
+    fingerprint = diag.differential_fingerprint(payload, lang)
+    ai = diag.differential_with_exams(
+        payload,
+        language=lang,
+        session_id=patient_id,
+        refresh=bool(payload.get('regenerate')),
+    )
+    _store_differential(repo, patient_id, lang, ai, fingerprint)
+    return {'summary': ai.summary, 'options': ai.options}
+
+
+def _exams_job(payload: Dict[str, Any], db: Session) -> Any:
+    repo = ResearchRepository(db_session=db)
+    patient_id = payload['patient_id']
+    record = patient_to_dict(repo.get_patient_by_uuid(patient_id))
+    lang = record['meta']['lang']
+    selected = record['selected_diagnoses']
+
+    ai: Optional[LLMDiagnosis] = None
+    prefetcher = get_exam_prefetcher()
+    if prefetcher is not None and not payload.get('regenerate'):
+        future = prefetcher.take(patient_id, selected, language=lang)
+        if future is not None and not future.cancelled():
+            try:
+                ai = future.result()
+            except Exception:
+                # includes CancelledError if it is cancelled meanwhile
+                logger.warning('Prefetched exams failed', exc_info=True)
+    if ai is None:
+        ai = diag.exams(
+            selected,
+            language=lang,
+            session_id=patient_id,
+            refresh=bool(payload.get('regenerate')),
+        )
+    _store_exams(repo, patient_id, lang, ai)
+    return {'summary': ai.summary, 'options': ai.options}
+
+
+def _reports_job(payload: Dict[str, Any], db: Session) -> Any:
+    repo = ResearchRepository(db_session=db)
+    try:
+        patient = repo.get_patient_by_uuid(payload['patient_id'])
+        if patient is None:
+            raise LookupError(f'Unknown patient {payload["patient_id"]}')
+        new_reports, error = extract_spooled_reports(
+            payload['files'], get_medical_report_extractor()
+        )
+    finally:
+        # the uploads hold patient data; never leave them behind
+        discard_spooled_reports(payload['files'])
+    # files rejected at upload are reported with the failed extractions
+    error = '; '.join(filter(None, [payload.get('rejected'), error])) or None
+    if error and not new_reports:
+        raise RuntimeError(error)
+    consultation = patient.consultations[-1]
+    fhir_reports = load_fhir_reports(consultation) + new_reports
+    save_fhir_reports(consultation, fhir_reports, repo)
+    return {'reports': [r['filename'] for r in new_reports], 'error': error}
+
+
+def _deidentify_job(payload: Dict[str, Any], db: Session) -> Any:
+    repo = ResearchRepository(db_session=db)
+    record = deidentify_patient_record(payload['record'], get_deidentifier())
+    repo.update_consultation(payload['patient_id'], record)
+    return {'patient_id': payload['patient_id']}
+
+
+def build_job_queue(session_factory: Any, max_workers: int = 4) -> JobQueue:
+    """Create a job queue with every research app job registered.
+
+    Interactive LLM steps run first, report extraction next and the final
+    de-identification last.
+    """
+    jobs = JobQueue(session_factory, max_workers=max_workers)
+    jobs.register('differential', _differential_job, priority=0)
+    jobs.register('exams', _exams_job, priority=0)
+    jobs.register('reports', _reports_job, priority=5)
+    jobs.register('deidentify', _deidentify_job, priority=10)
+    return jobs
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> Optional[JobQueue]:
+    """Get the shared background job queue, or None when disabled.
+
+    ``JOB_WORKERS`` (default 4, ``0`` runs every step inside the request)
+    sets the number of worker threads.
+    """
+    workers = int(os.getenv('JOB_WORKERS', '4'))
+    if workers <= 0:
+        return None
+    return build_job_queue(SessionLocal, workers).start()
+
+
+def _wait_for_job(job_id: str, next_url: str) -> RedirectResponse:
+    """Send the browser to the page polling *job_id*."""
+    query = urlencode({'next': next_url})
+    return RedirectResponse(f'/jobs/{job_id}/wait?{query}', status_code=303)
+
+
+def _job_or_404(job_id: str) -> Dict[str, Any]:
+    jobs = get_job_queue()
+    job = jobs.get(job_id) if jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return job
+
+
+@app.get('/jobs')
+def list_jobs(
+    patient_id: Optional[str] = None, status: Optional[str] = None
+) -> Any:
+    """List recent background jobs, optionally per patient or status."""
+    jobs = get_job_queue()
+    if jobs is None:
+        return JSONResponse([])
+    return JSONResponse(jobs.list(patient_id=patient_id, status=status))
+
+
+@app.get('/jobs/{job_id}')
+def job_status(job_id: str) -> Any:
+    """Return the status, and once finished the result, of a job."""
+    return JSONResponse(_job_or_404(job_id))
+
+
+@app.get('/jobs/{job_id}/wait', response_class=HTMLResponse)
+def job_wait(request: Request, job_id: str, next: str = '/') -> HTMLResponse:
+    """Show a progress page that polls the job and then moves on."""
+    job = _job_or_404(job_id)
+    if not next.startswith('/') or next.startswith('//'):
+        next = '/'
+    return _render(
+        'job.html', request=request, job=job, next_url=next, title='Working'
+    )
+
+
+@app.get('/metrics')
+def metrics(format: str = 'json') -> Any:
+    """Report token and latency percentiles of recent LLM calls.
+
+    ``?format=prometheus`` returns the text exposition format for scraping.
+    """
+    if format == 'prometheus':
+        return PlainTextResponse(
+            llm_metrics.render_prometheus(),
+            media_type='text/plain; version=0.0.4',
+        )
+    return JSONResponse(llm_metrics.summary())
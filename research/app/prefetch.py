@@ -0,0 +1,137 @@
+"""Speculative exam suggestions computed while the physician reviews.
+
+After the differential is shown, the most likely diagnosis selections are
+sent to ``diag.exams`` in a small thread pool. When the physician posts a
+selection that was prefetched, ``/exams`` reuses the running (or finished)
+request and the remaining speculative requests are cancelled. Patients
+who never reach that step are dropped after ``ttl`` seconds, or once more
+than ``max_patients`` are pending.
+"""
+
+import logging
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from hiperhealth.agents.diagnostics import core as diag
+from hiperhealth.schema.clinical_outputs import LLMDiagnosis
+
+logger = logging.getLogger(__name__)
+
+ExamsFn = Callable[..., LLMDiagnosis]
+_Key = Tuple[str, FrozenSet[str]]
+
+
+def candidate_selections(
+    options: Union[List[str], Dict[str, float]], top_n: int
+) -> List[List[str]]:
+    """Return the *top_n* most likely selections, most likely first.
+
+    Options given as a mapping are ranked by their score; lists are assumed
+    to be ordered by likelihood already. Candidates are the prefixes of the
+    ranking: ``[top1]``, ``[top1, top2]`` and so on.
+    """
+    if isinstance(options, dict):
+        ranked = sorted(options, key=lambda k: options[k], reverse=True)
+    else:
+        ranked = list(options)
+    return [ranked[:size] for size in range(1, min(top_n, len(ranked)) + 1)]
+
+
+class ExamPrefetcher:
+    """Bounded pool of speculative ``diag.exams`` requests per patient."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        top_n: int = 3,
+        fetch: ExamsFn = diag.exams,
+        ttl: float = 900.0,
+        max_patients: int = 256,
+    ) -> None:
+        """Initialize the worker pool."""
+        self.top_n = top_n
+        self.ttl = ttl
+        self.max_patients = max_patients
+        self._fetch = fetch
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='exam-prefetch'
+        )
+        self._lock = threading.Lock()
+        # oldest first; each entry remembers when it was scheduled
+        self._pending: Dict[
+            str, Tuple[float, Dict[_Key, Future[LLMDiagnosis]]]
+        ] = {}
+
+    def schedule(
+        self,
+        patient_id: str,
+        options: Union[List[str], Dict[str, float]],
+        language: str = 'en',
+        skip: Optional[Callable[[List[str]], bool]] = None,
+    ) -> int:
+        """Start prefetching exams for the likely selections.
+
+        Selections for which *skip* returns ``True`` (for example because
+        the combined differential already covers them) are not requested.
+        Returns the number of requests submitted.
+        """
+        self.cancel(patient_id)
+        futures: Dict[_Key, Future[LLMDiagnosis]] = {}
+        for selection in candidate_selections(options, self.top_n):
+            if skip is not None and skip(selection):
+                continue
+            futures[(language, frozenset(selection))] = self._pool.submit(
+                self._fetch,
+                selection,
+                language=language,
+                session_id=patient_id,
+            )
+        now = time.monotonic()
+        with self._lock:
+            self._pending[patient_id] = (now, futures)
+            expired = self._evict(now)
+        for future in expired:
+            future.cancel()
+        return len(futures)
+
+    def _evict(self, now: float) -> List[Future[LLMDiagnosis]]:
+        """Drop expired and surplus patients; return their futures.
+
+        Called with the lock held.
+        """
+        dropped: List[Future[LLMDiagnosis]] = []
+        for patient_id, (scheduled, futures) in list(self._pending.items()):
+            full = len(self._pending) > self.max_patients
+            if not full and now - scheduled < self.ttl:
+                break
+            del self._pending[patient_id]
+            dropped.extend(futures.values())
+        return dropped
+
+    def take(
+        self, patient_id: str, selected: List[str], language: str = 'en'
+    ) -> Optional[Future[LLMDiagnosis]]:
+        """Return the prefetched request matching *selected*, if any.
+
+        Every other speculative request for the patient is cancelled.
+        """
+        with self._lock:
+            _, futures = self._pending.pop(patient_id, (0.0, {}))
+        match = futures.pop((language, frozenset(selected)), None)
+        for stale in futures.values():
+            stale.cancel()
+        return match
+
+    def cancel(self, patient_id: str) -> None:
+        """Cancel all speculative requests for *patient_id*."""
+        with self._lock:
+            _, futures = self._pending.pop(patient_id, (0.0, {}))
+        for future in futures.values():
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel queued work and stop the worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,13 +1,19 @@
 """Helper functions for managing and processing medical reports."""
 
+import json
 import logging
+import shutil
+import uuid
 
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from hiperhealth.agents.extraction.medical_reports import (
     MedicalReportExtractorError,
     MedicalReportFileExtractor,
+    ReportResult,
 )
 
 logger = logging.getLogger(__name__)
@@ -60,48 +66,224 @@ def validate_report_file(
     return True, None
 
 
+def _collect_results(
+    results: List[ReportResult], filenames: List[str]
+) -> Tuple[List[dict], List[str]]:
+    """Split extraction results into FHIR reports and error messages."""
+    fhir_reports: List[dict] = []
+    errors: List[str] = []
+    for result, filename in zip(results, filenames):
+        if result.ok and isinstance(result.data, dict):
+            fhir = dict(result.data)
+            fhir['filename'] = filename
+            fhir_reports.append(fhir)
+            continue
+        if result.error is None:
+            logger.warning(
+                'Unexpected extractor output type: '
+                f'{type(result.data).__name__}'
+            )
+            message = 'Failed to process report'
+        elif isinstance(result.error, MedicalReportExtractorError):
+            logger.error(
+                'Medical report extraction failed', exc_info=result.error
+            )
+            message = 'Failed to extract report data'
+        else:
+            logger.error(
+                'Error processing uploaded report', exc_info=result.error
+            )
+            message = 'Error processing report'
+        errors.append(f'{filename}: {message}')
+    return fhir_reports, errors
+
+
 async def process_uploaded_reports(
     reports: List[UploadFile],
     seen_filenames: set,
     extractor: MedicalReportFileExtractor,
 ) -> Tuple[List[dict], Optional[str]]:
-    """Process uploaded medical reports and extract FHIR data."""
-    fhir_reports = []
-
-    for report in reports:
-        if not report.filename:
-            continue
+    """Process uploaded medical reports and extract FHIR data.
 
-        try:
-            # Validate file
+    Valid files are extracted concurrently with
+    :meth:`~MedicalReportFileExtractor.extract_many`. Files that fail
+    validation or extraction are left out and described in the returned
+    error message; the other reports are still returned.
+    """
+    accepted: List[UploadFile] = []
+    errors: List[str] = []
+    try:
+        for report in reports:
+            if not report.filename:
+                continue
             valid, error_msg = validate_report_file(
                 report, seen_filenames, extractor
             )
             if not valid:
-                return [], error_msg
-
-            # Use stream directly (memory efficient)
+                errors.append(f'{report.filename}: {error_msg}')
+                continue
             await report.seek(0)
-            fhir = extractor.extract_report_data(report.file)
+            accepted.append(report)
+            seen_filenames.add(report.filename.lower())
+
+        results = await run_in_threadpool(
+            extractor.extract_many, [report.file for report in accepted]
+        )
+    finally:
+        for report in reports:
+            await report.close()
 
-            # Type validation: ensure dict
-            if not isinstance(fhir, dict):
-                logger.warning(
-                    f'Unexpected extractor output type: {type(fhir).__name__}'
-                )
-                return [], 'Failed to process report'
+    fhir_reports, failures = _collect_results(
+        results, [str(report.filename) for report in accepted]
+    )
+    errors.extend(failures)
+    return fhir_reports, '; '.join(errors) or None
 
-            fhir['filename'] = report.filename
-            fhir_reports.append(fhir)
-            seen_filenames.add(report.filename.lower())
 
-        except MedicalReportExtractorError:
-            logger.error('Medical report extraction failed', exc_info=True)
-            return [], 'Failed to extract report data'
-        except Exception:
-            logger.error('Error processing uploaded report', exc_info=True)
-            return [], 'Error processing report'
-        finally:
+async def spool_uploaded_reports(
+    reports: List[UploadFile],
+    seen_filenames: set,
+    extractor: MedicalReportFileExtractor,
+    directory: Path,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Validate uploaded reports and copy them to disk for a background job.
+
+    Returns ``{'path', 'filename'}`` entries for
+    :func:`extract_spooled_reports` and, like
+    :func:`process_uploaded_reports`, a message describing the files that
+    failed validation and were left out. The copying runs in the
+    threadpool.
+    """
+    try:
+        return await run_in_threadpool(
+            _spool_reports, reports, seen_filenames, extractor, directory
+        )
+    finally:
+        for report in reports:
             await report.close()
 
-    return fhir_reports, None
+
+def _spool_reports(
+    reports: List[UploadFile],
+    seen_filenames: Set[str],
+    extractor: MedicalReportFileExtractor,
+    directory: Path,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Copy the valid *reports* into a new directory under *directory*."""
+    target = directory / uuid.uuid4().hex
+    spooled: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    seen = set(seen_filenames)
+    for report in reports:
+        if not report.filename:
+            continue
+        valid, error_msg = validate_report_file(report, seen, extractor)
+        if not valid:
+            errors.append(f'{report.filename}: {error_msg}')
+            continue
+        # uploads are identifiable: keep them private to this user
+        target.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = target / f'{len(spooled):03d}{Path(report.filename).suffix}'
+        report.file.seek(0)
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(report.file, out)
+        spooled.append({'path': str(path), 'filename': report.filename})
+        seen.add(report.filename.lower())
+    return spooled, '; '.join(errors) or None
+
+
+def discard_spooled_reports(files: List[Dict[str, Any]]) -> None:
+    """Delete the files written by :func:`spool_uploaded_reports`."""
+    for entry in files:
+        Path(entry['path']).unlink(missing_ok=True)
+    if files:
+        shutil.rmtree(Path(files[0]['path']).parent, ignore_errors=True)
+
+
+def extract_spooled_reports(
+    files: List[Dict[str, Any]],
+    extractor: MedicalReportFileExtractor,
+) -> Tuple[List[dict], Optional[str]]:
+    """Extract FHIR data from spooled report files, then delete them.
+
+    Like :func:`process_uploaded_reports`, failed files are described in
+    the error message without dropping the reports that succeeded.
+    """
+    try:
+        results = extractor.extract_many(
+            [Path(entry['path']) for entry in files]
+        )
+    finally:
+        discard_spooled_reports(files)
+    fhir_reports, errors = _collect_results(
+        results, [entry['filename'] for entry in files]
+    )
+    return fhir_reports, '; '.join(errors) or None
+
+
+def _ingested(output: Path) -> set:
+    """Return the files already extracted successfully into *output*."""
+    done = set()
+    if not output.exists():
+        return done
+    with output.open(encoding='utf-8') as lines:
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # a run interrupted mid-write leaves a partial last line
+                continue
+            if row.get('ok'):
+                done.add(row['file'])
+    return done
+
+
+def ingest_report_directory(
+    directory: Path,
+    output: Path,
+    extractor: MedicalReportFileExtractor,
+    *,
+    max_workers: int = 4,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, int]:
+    """Extract every report under *directory* into the JSONL *output*.
+
+    Each line holds the file path relative to *directory*, ``ok``, the
+    FHIR data or the error. With *resume*, files already extracted
+    successfully are skipped and failed ones are retried. Returns the
+    number of ``ok``, ``failed`` and ``skipped`` files.
+    """
+    suffixes = {f'.{ext}' for ext in extractor.allowed_extensions}
+    files = sorted(
+        path
+        for path in directory.rglob('*')
+        if path.is_file() and path.suffix.lower() in suffixes
+    )
+    done = _ingested(output) if resume else set()
+    pending = [p for p in files if str(p.relative_to(directory)) not in done]
+    counts = {'ok': 0, 'failed': 0, 'skipped': len(files) - len(pending)}
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open('a' if resume else 'w', encoding='utf-8') as out:
+
+        def _write(result: ReportResult) -> None:
+            row = {
+                'file': str(Path(result.source).relative_to(directory)),
+                'ok': result.ok,
+                'fhir': result.data,
+                'error': str(result.error) if result.error else None,
+                'error_type': (
+                    type(result.error).__name__ if result.error else None
+                ),
+            }
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+            out.flush()
+            counts['ok' if result.ok else 'failed'] += 1
+            if progress is not None:
+                progress(row)
+
+        extractor.extract_many(
+            pending, max_workers=max_workers, progress=_write
+        )
+    return counts
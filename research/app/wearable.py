@@ -0,0 +1,114 @@
+"""Storage for consultation wearable data.
+
+Series are kept as compressed columnar ``.npz`` blobs in the
+``wearable_series`` table, next to their hourly/daily rollups computed
+once at upload; both columns are deferred. ``Consultation.wearable_data``
+only holds a reference and per-column summary statistics, so loading a
+patient no longer deserialises the series or its rollups; the daily
+windows are read from the rollups when a prompt needs them.
+"""
+
+import logging
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, cast
+
+from hiperhealth.agents.extraction.columnar import WearableTable
+from hiperhealth.agents.extraction.rollup import rollup_table
+from sqlalchemy.orm import Session
+
+from research.models.ui import Consultation, WearableSeries
+
+logger = logging.getLogger(__name__)
+
+
+def wearable_reference(
+    series: WearableSeries, table: WearableTable
+) -> Dict[str, Any]:
+    """Return the summary stored in ``Consultation.wearable_data``."""
+    return {
+        'series_id': series.id,
+        'format': series.format,
+        'rows': len(table),
+        'size_bytes': series.size_bytes,
+        'columns': table.schema,
+        'summary': table.describe(),
+    }
+
+
+def save_wearable_table(
+    consultation: Consultation, table: WearableTable, db: Session
+) -> WearableSeries:
+    """Store *table* for *consultation*, replacing any earlier series.
+
+    The caller commits the session.
+    """
+    blob = table.to_npz()
+    rollups = rollup_table(table)
+    series = consultation.wearable_series
+    if series is None:
+        series = WearableSeries(consultation=consultation)
+        db.add(series)
+    series.format = 'npz'
+    series.rows = len(table)
+    series.size_bytes = len(blob)
+    series.columns = table.schema
+    series.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    series.data = blob
+    series.rollups = rollups
+    db.flush()
+    consultation.wearable_data = cast(Any, wearable_reference(series, table))
+    return cast(WearableSeries, series)
+
+
+def load_wearable_table(consultation: Consultation) -> Optional[WearableTable]:
+    """Return the consultation's wearable data, or None if there is none.
+
+    Consultations saved before the series table existed keep their rows
+    in ``wearable_data`` and are converted on the fly.
+    """
+    series = consultation.wearable_series
+    if series is not None:
+        return WearableTable.from_npz(series.data)
+    legacy = consultation.wearable_data
+    if isinstance(legacy, list) and legacy:
+        return WearableTable.from_records(legacy)
+    return None
+
+
+def wearable_summary(consultation: Consultation) -> Dict[str, Any]:
+    """Return the per-column statistics without loading the series."""
+    data = consultation.wearable_data
+    if isinstance(data, dict):
+        summary: Dict[str, Any] = data.get('summary', {})
+        return summary
+    table = load_wearable_table(consultation)
+    return table.describe() if table is not None else {}
+
+
+def wearable_rollups(consultation: Consultation) -> Dict[str, Any]:
+    """Return the hourly/daily rollups stored at upload time.
+
+    Older consultations without stored rollups are reduced on the fly.
+    """
+    series = consultation.wearable_series
+    if series is not None and series.rollups is not None:
+        rollups: Dict[str, Any] = series.rollups
+        return rollups
+    table = load_wearable_table(consultation)
+    if table is None:
+        return {'time_column': None, 'windows': {}}
+    return rollup_table(table)
+
+
+def wearable_prompt_data(consultation: Consultation) -> Any:
+    """Return ``wearable_data`` with the daily windows the prompt uses.
+
+    Only the stored reference is extended, with the windows loaded from
+    the deferred rollups; raw rows and skipped uploads are returned as is.
+    """
+    data = consultation.wearable_data
+    if not isinstance(data, dict) or consultation.wearable_series is None:
+        return data
+    windows = wearable_rollups(consultation)['windows']
+    return dict(data, daily=windows.get('day', []))
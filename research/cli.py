@@ -11,6 +11,8 @@ from typing import Any
 import questionary
 import typer
 
+from hiperhealth.agents.client import configure, get_settings
+from hiperhealth.agents.diagnostics import batch
 from hiperhealth.agents.diagnostics import core as diag
 from rich import print
 
@@ -62,23 +64,25 @@ def consult() -> None:
     patient['previous_tests'] = typer.prompt("Summary or 'none'")
 
     # ── LLM calls via agents ────────────────────────────────────────────
-    diag_json = diag.differential(patient)
-    print(f'\n[bold magenta]AI summary:[/bold magenta] {diag_json["summary"]}')
+    diag_json = diag.differential_with_exams(patient)
+    print(f'\n[bold magenta]AI summary:[/bold magenta] {diag_json.summary}')
     chosen_diag = multiselect(
-        'Select diagnoses to investigate', diag_json['options']
+        'Select diagnoses to investigate', list(diag_json.options)
     )
 
-    exam_json = diag.exams(chosen_diag)
-    print(f'\n[bold magenta]AI summary:[/bold magenta] {exam_json["summary"]}')
-    chosen_exams = multiselect('Select exams to request', exam_json['options'])
+    exam_json = diag_json.exams_for(chosen_diag) or diag.exams(chosen_diag)
+    print(f'\n[bold magenta]AI summary:[/bold magenta] {exam_json.summary}')
+    chosen_exams = multiselect(
+        'Select exams to request', list(exam_json.options)
+    )
 
     record = {
         'meta': meta,
         'patient': patient,
         'ai': {
-            'diagnosis_options': diag_json['options'],
+            'diagnosis_options': diag_json.options,
             'selected_diagnoses': chosen_diag,
-            'exam_options': exam_json['options'],
+            'exam_options': exam_json.options,
             'selected_exams': chosen_exams,
         },
     }
@@ -86,5 +90,90 @@ def consult() -> None:
     print(f'\n[green]Record saved to {path}[/green]')
 
 
+def _db_records() -> list[dict[str, Any]]:
+    """Load every consultation stored in the research database."""
+    from research.app.database import SessionLocal
+    from research.app.main import patient_to_dict
+    from research.models.repositories import ResearchRepository
+
+    db = SessionLocal()
+    try:
+        repo = ResearchRepository(db)
+        return [patient_to_dict(p) for p in repo.list_patients()]
+    finally:
+        db.close()
+
+
+@app.command('cohort')
+def cohort(
+    output: Path = typer.Option(..., help='JSONL file for the results.'),
+    input_path: Path | None = typer.Option(
+        None, '--input', help='JSON/JSONL records (default: research DB).'
+    ),
+    concurrency: int = typer.Option(8, help='Maximum in-flight requests.'),
+    rpm: float | None = typer.Option(None, help='Requests per minute.'),
+    tpm: float | None = typer.Option(None, help='Tokens per minute.'),
+    stub: bool = typer.Option(False, help='Use the offline stub backend.'),
+    fake_latency: str | None = typer.Option(
+        None,
+        help='Send requests to the fake LLM backend with this latency '
+        "spec (e.g. 'lognormal:1.5,0.4'); retries and metrics still apply.",
+    ),
+    resume: bool = typer.Option(True, help='Skip already scored records.'),
+) -> None:
+    """Run the differential over a cohort and stream results to JSONL."""
+    records = batch.load_records(input_path) if input_path else _db_records()
+    if fake_latency is not None:
+        configure(backend='fake', fake_latency=fake_latency)
+    print(f'[bold cyan]Scoring {len(records)} records[/bold cyan]')
+
+    def _progress(row: dict[str, Any]) -> None:
+        status = '[green]ok[/green]' if row['ok'] else '[red]failed[/red]'
+        print(f'{row["id"]}: {status} ({row["elapsed"]}s)')
+
+    counts = batch.run_cohort(
+        records,
+        output,
+        backend=batch.stub_differential if stub else diag.adifferential,
+        concurrency=concurrency,
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+        resume=resume,
+        progress=_progress,
+        label='stub' if stub else get_settings().model,
+    )
+    print(f'\n[green]Done:[/green] {counts}')
+
+
+@app.command('ingest-reports')
+def ingest_reports(
+    directory: Path = typer.Argument(..., help='Folder of PDF/image reports.'),
+    output: Path = typer.Option(..., help='JSONL file for the FHIR results.'),
+    workers: int = typer.Option(4, help='Concurrent FHIR conversions.'),
+    resume: bool = typer.Option(True, help='Skip already extracted files.'),
+) -> None:
+    """Extract FHIR data from every report in a directory."""
+    from hiperhealth.agents.extraction.medical_reports import (
+        get_medical_report_extractor,
+    )
+
+    from research.app.reports import ingest_report_directory
+
+    def _progress(row: dict[str, Any]) -> None:
+        status = '[green]ok[/green]' if row['ok'] else '[red]failed[/red]'
+        detail = '' if row['ok'] else f' ({row["error"]})'
+        print(f'{row["file"]}: {status}{detail}')
+
+    counts = ingest_report_directory(
+        directory,
+        output,
+        get_medical_report_extractor(),
+        max_workers=workers,
+        resume=resume,
+        progress=_progress,
+    )
+    print(f'\n[green]Done:[/green] {counts}')
+
+
 if __name__ == '__main__':  # pragma: no cover
     app()
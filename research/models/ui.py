@@ -10,10 +10,11 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 
 class Patient(Base):
@@ -49,9 +50,13 @@ class Consultation(Base):
 
     # Store complex, semi-structured data as JSON
     previous_tests = Column(JSON)
+    # reference to the stored series plus summary stats (see WearableSeries)
     wearable_data = Column(JSON)
     ai_diag_raw = Column(JSON)
     ai_exam_raw = Column(JSON)
+    # digests of the inputs each raw output was generated from
+    ai_diag_fingerprint = Column(String(64))
+    ai_exam_fingerprint = Column(String(64))
 
     patient = relationship(Patient, back_populates='consultations')
     selected_diagnoses = relationship(
@@ -60,6 +65,36 @@ class Consultation(Base):
     selected_exams = relationship(
         'ConsultationExam', back_populates='consultation'
     )
+    wearable_series = relationship(
+        'WearableSeries',
+        back_populates='consultation',
+        uselist=False,
+        cascade='all, delete-orphan',
+    )
+
+
+class WearableSeries(Base):
+    """Wearable time series of a consultation, stored as a columnar blob.
+
+    ``data`` is a compressed ``.npz`` archive written by
+    ``WearableTable.to_npz``; ``rollups`` holds the hourly and daily
+    aggregates. Both are only loaded when accessed.
+    """
+
+    __tablename__ = 'wearable_series'
+    id = Column(Integer, primary_key=True)
+    consultation_id = Column(
+        Integer, ForeignKey('consultations.id'), unique=True, nullable=False
+    )
+    format = Column(String(20), nullable=False, default='npz')
+    rows = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    columns = Column(JSON)
+    created_at = Column(DateTime, nullable=False)
+    data = deferred(Column(LargeBinary, nullable=False))
+    rollups = deferred(Column(JSON))
+
+    consultation = relationship(Consultation, back_populates='wearable_series')
 
 
 class Diagnosis(Base):
@@ -121,3 +156,23 @@ class ConsultationExam(Base):
 
     consultation = relationship(Consultation, back_populates='selected_exams')
     exam = relationship(Exam)
+
+
+class Job(Base):
+    """Background job run by the research app's in-process queue."""
+
+    __tablename__ = 'jobs'
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    patient_uuid = Column(String(36), index=True)
+    status = Column(String(20), nullable=False, index=True)
+    priority = Column(Integer, nullable=False, default=0)
+    payload = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # queue that claimed the job (host:pid:id) and until when it holds it
+    owner = Column(String(255))
+    lease_expires_at = Column(DateTime)
@@ -51,6 +51,8 @@ class ConsultationBase(BaseModel):
     wearable_data: Optional[Any] = None
     ai_diag_raw: Optional[Any] = None
     ai_exam_raw: Optional[Any] = None
+    ai_diag_fingerprint: Optional[str] = Field(None, max_length=64)
+    ai_exam_fingerprint: Optional[str] = Field(None, max_length=64)
 
 
 class ConsultationCreate(ConsultationBase):
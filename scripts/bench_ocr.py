@@ -0,0 +1,164 @@
+"""Benchmark OCR throughput and accuracy with and without preprocessing.
+
+Runs every image in a directory (``tests/data/reports/image_reports`` by
+default) through two pipelines:
+
+* ``baseline``: the full-resolution image handed straight to Tesseract on
+  the calling thread, as the extractor used to do;
+* ``preprocessed``: :func:`hiperhealth.agents.extraction.ocr.preprocess`
+  followed by OCR in a process pool.
+
+For each pipeline it reports images per second, megapixels per second and
+the mean Tesseract word confidence. When an image has a ground-truth
+transcript next to it (``image-1.png`` -> ``image-1.txt``) the character
+similarity to that transcript is reported as well.
+
+Usage::
+
+    python scripts/bench_ocr.py [DIRECTORY] [--workers 4] [--binarize]
+"""
+
+import argparse
+import difflib
+import io
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the project root to the Python path to allow for imports
+# BEFORE local imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+import pytesseract  # noqa: E402
+
+from hiperhealth.agents.extraction.ocr import (  # noqa: E402
+    OCRConfig,
+    preprocess,
+)
+from PIL import Image  # noqa: E402
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.tif', '.tiff'}
+DEFAULT_DIR = project_root / 'tests' / 'data' / 'reports' / 'image_reports'
+
+
+def _recognise(image: Image.Image, **kwargs: str) -> Dict[str, float | str]:
+    """Return the words Tesseract reads in *image* and their confidence."""
+    data = pytesseract.image_to_data(
+        image, output_type=pytesseract.Output.DICT, **kwargs
+    )
+    words = [w for w, c in zip(data['text'], data['conf']) if float(c) >= 0]
+    scores = [float(c) for c in data['conf'] if float(c) >= 0]
+    return {
+        'text': ' '.join(w for w in words if w.strip()),
+        'confidence': sum(scores) / len(scores) if scores else 0.0,
+    }
+
+
+def baseline(data: bytes) -> Dict[str, float | str]:
+    """OCR the untouched image, as the extractor used to."""
+    with Image.open(io.BytesIO(data)) as image:
+        return _recognise(image)
+
+
+def preprocessed(data: bytes, config: OCRConfig) -> Dict[str, float | str]:
+    """OCR the image after the preprocessing stage."""
+    with Image.open(io.BytesIO(data)) as image:
+        ready = preprocess(image, config)
+    return _recognise(ready, lang=config.lang, config=config.tesseract_args)
+
+
+def _similarity(text: str, truth: Optional[str]) -> Optional[float]:
+    if truth is None:
+        return None
+    normalise = ' '.join
+    return difflib.SequenceMatcher(
+        None, normalise(text.split()), normalise(truth.split())
+    ).ratio()
+
+
+def _report(
+    name: str,
+    results: List[Dict[str, float | str]],
+    truths: List[Optional[str]],
+    elapsed: float,
+    megapixels: float,
+) -> None:
+    scores = [
+        s
+        for s in (
+            _similarity(str(r['text']), t)
+            for r, t in zip(results, truths, strict=True)
+        )
+        if s is not None
+    ]
+    confidence = sum(float(r['confidence']) for r in results) / len(results)
+    accuracy = f'{sum(scores) / len(scores):.3f}' if scores else 'n/a'
+    print(
+        f'{name:<13} {len(results) / elapsed:8.2f} img/s '
+        f'{megapixels / elapsed:8.2f} MP/s '
+        f'conf {confidence:6.2f}  accuracy {accuracy}'
+    )
+
+
+def main() -> None:
+    """Run both pipelines and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('directory', nargs='?', type=Path, default=DEFAULT_DIR)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--binarize', action='store_true')
+    parser.add_argument('--target-dpi', type=int, default=300)
+    parser.add_argument('--lang', default='eng')
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        sys.exit('Tesseract is not installed or not on PATH.')
+
+    paths = sorted(
+        p for p in args.directory.iterdir() if p.suffix in IMAGE_SUFFIXES
+    )
+    if not paths:
+        sys.exit(f'No images found in {args.directory}')
+    blobs = [p.read_bytes() for p in paths] * args.repeat
+    truths = [
+        p.with_suffix('.txt').read_text(encoding='utf-8')
+        if p.with_suffix('.txt').exists()
+        else None
+        for p in paths
+    ] * args.repeat
+    megapixels = 0.0
+    for data in blobs:
+        with Image.open(io.BytesIO(data)) as image:
+            megapixels += image.width * image.height / 1e6
+    config = OCRConfig(
+        target_dpi=args.target_dpi, binarize=args.binarize, lang=args.lang
+    )
+    print(f'{len(blobs)} images, {megapixels:.1f} MP, {args.workers} workers')
+
+    start = time.perf_counter()
+    results = [baseline(data) for data in blobs]
+    _report(
+        'baseline',
+        results,
+        truths,
+        time.perf_counter() - start,
+        megapixels,
+    )
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        # start the workers before timing
+        list(pool.map(time.sleep, [0] * args.workers))
+        start = time.perf_counter()
+        results = list(pool.map(preprocessed, blobs, [config] * len(blobs)))
+        elapsed = time.perf_counter() - start
+    _report('preprocessed', results, truths, elapsed, megapixels)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+"""Pluggable completion backends for :mod:`hiperhealth.agents.client`.
+
+The client only needs something that turns a list of chat messages into an
+OpenAI-shaped completion (``rsp.choices[0].message.content`` plus
+``rsp.usage``) or, with ``stream=True``, into an iterable of chunks. Two
+backends are provided:
+
+* :class:`OpenAIBackend` sends the request through the pooled ``OpenAI`` /
+  ``AsyncOpenAI`` clients. It is the default (``LLM_BACKEND=openai``).
+* :class:`FakeBackend` answers locally with deterministic, schema-valid
+  ``LLMDiagnosis`` JSON after a sampled delay. Latency, token counts and
+  error rates are configurable, so the research app and the batch tools
+  can be benchmarked offline (``LLM_BACKEND=fake``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Iterator
+
+# response-header timestamps of the request currently being timed
+_first_byte: ContextVar[list[float] | None] = ContextVar(
+    'hiperhealth_llm_first_byte', default=None
+)
+
+
+@contextmanager
+def first_byte_marks() -> Iterator[list[float]]:
+    """Collect the :func:`mark_first_byte` timestamps made in the block."""
+    marks: list[float] = []
+    token = _first_byte.set(marks)
+    try:
+        yield marks
+    finally:
+        _first_byte.reset(token)
+
+
+def mark_first_byte() -> None:
+    """Record that the first byte of the current reply has arrived."""
+    marks = _first_byte.get()
+    if marks is not None:
+        marks.append(time.perf_counter())
+
+
+class LLMBackend(ABC):
+    """Turns chat messages into an OpenAI-shaped completion."""
+
+    name = 'base'
+
+    @abstractmethod
+    def complete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Return a completion, or a chunk iterator with ``stream=True``.
+
+        Backends call :func:`mark_first_byte` when the reply starts and
+        raise OpenAI exceptions, so retries and metrics work unchanged.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acomplete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Async counterpart of :meth:`complete`."""
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """Send requests through the shared OpenAI clients."""
+
+    name = 'openai'
+
+    def __init__(
+        self, client: Callable[[], Any], async_client: Callable[[], Any]
+    ) -> None:
+        """Use the sync/async client returned by the given factories."""
+        self._client = client
+        self._async_client = async_client
+
+    def complete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Create a JSON-mode chat completion."""
+        return self._client().chat.completions.create(
+            model=model,
+            response_format={'type': 'json_object'},
+            messages=messages,
+            timeout=timeout,
+            **extra,
+        )
+
+    async def acomplete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Create a JSON-mode chat completion on the async client."""
+        return await self._async_client().chat.completions.create(
+            model=model,
+            response_format={'type': 'json_object'},
+            messages=messages,
+            timeout=timeout,
+            **extra,
+        )
+
+
+_ARITY = {
+    'fixed': 1,
+    'uniform': 2,
+    'normal': 2,
+    'lognormal': 2,
+    'exponential': 1,
+}
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """A random variable described by a short text spec.
+
+    Supported specs are ``fixed:v``, ``uniform:lo,hi``,
+    ``normal:mean,sd``, ``lognormal:median,sigma`` and
+    ``exponential:mean``. Samples are never negative.
+    """
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> Distribution:
+        """Parse *spec*; a bare number means ``fixed``."""
+        kind, _, args = spec.strip().partition(':')
+        if not args:
+            kind, args = 'fixed', kind
+        kind = kind.lower()
+        if kind not in _ARITY:
+            raise ValueError(f'Unknown distribution {kind!r} in {spec!r}')
+        params = tuple(float(p) for p in args.split(','))
+        if len(params) != _ARITY[kind]:
+            raise ValueError(
+                f'{kind} takes {_ARITY[kind]} parameters, got {spec!r}'
+            )
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one value using *rng*."""
+        p = self.params
+        if self.kind == 'fixed':
+            value = p[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == 'normal':
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == 'lognormal':
+            value = rng.lognormvariate(math.log(p[0]), p[1])
+        else:
+            value = rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0
+        return max(value, 0.0)
+
+
+_DIAGNOSES = {
+    'Influenza': ['Rapid influenza test', 'Complete blood count'],
+    'COVID-19': ['SARS-CoV-2 PCR', 'Chest X-ray'],
+    'Community-acquired pneumonia': ['Chest X-ray', 'C-reactive protein'],
+    'Acute bronchitis': ['Pulse oximetry', 'Chest auscultation'],
+    'Urinary tract infection': ['Urinalysis', 'Urine culture'],
+    'Iron-deficiency anemia': ['Complete blood count', 'Serum ferritin'],
+    'Hypothyroidism': ['TSH', 'Free T4'],
+    'Type 2 diabetes mellitus': ['Fasting glucose', 'HbA1c'],
+    'Migraine': ['Neurological examination', 'Blood pressure'],
+    'Gastroenteritis': ['Stool culture', 'Electrolyte panel'],
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    # roughly four characters per token for English prose and JSON
+    return max(1, len(text) // 4)
+
+
+def _pad(text: str, tokens: int) -> str:
+    """Lengthen the summary of reply *text* towards *tokens* tokens."""
+    missing = tokens - _estimate_tokens(text)
+    if missing <= 0:
+        return text
+    data = json.loads(text)
+    filler = ' Findings are consistent with the reported history.'
+    summary = data['summary']
+    while len(summary) + len(filler) <= 800 and missing > 0:
+        summary += filler
+        missing -= _estimate_tokens(filler)
+    data['summary'] = summary
+    return json.dumps(data)
+
+
+class _FakeStream:
+    """Chunk iterator mimicking ``openai.Stream``."""
+
+    def __init__(self, chunks: list[Any], delay: float) -> None:
+        self._chunks = chunks
+        self._delay = delay
+
+    def __iter__(self) -> Iterator[Any]:
+        for i, chunk in enumerate(self._chunks):
+            if i and self._delay:
+                time.sleep(self._delay)
+            yield chunk
+
+    def close(self) -> None:
+        self._chunks = []
+
+
+class _FakeAsyncStream:
+    """Chunk iterator mimicking ``openai.AsyncStream``."""
+
+    def __init__(self, chunks: list[Any], delay: float) -> None:
+        self._chunks = chunks
+        self._delay = delay
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        for i, chunk in enumerate(self._chunks):
+            if i and self._delay:
+                await asyncio.sleep(self._delay)
+            yield chunk
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def close(self) -> None:
+        self._chunks = []
+
+
+@dataclass
+class _Plan:
+    """What the fake decided to do for one request."""
+
+    latency: float
+    error: Exception | None
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class FakeBackend(LLMBackend):
+    """Answer locally with deterministic ``LLMDiagnosis`` JSON.
+
+    Parameters
+    ----------
+    latency : str
+        :class:`Distribution` spec of the seconds a full reply takes. For
+        streams ``first_byte`` of it passes before the first chunk and the
+        rest is spread over the remaining chunks.
+    tokens : str, optional
+        :class:`Distribution` spec of completion tokens; the summary is
+        padded to roughly that length. By default tokens are estimated
+        from the reply text.
+    error_rate : float
+        Probability that a request fails with a retryable 429 or 500.
+    invalid_rate : float
+        Probability that a reply does not match the schema.
+    seed : int, optional
+        Seed of the random generator, for reproducible benchmarks.
+    first_byte : float
+        Fraction of the latency spent before the first streamed chunk.
+    chunk_size : int
+        Characters per streamed chunk.
+    """
+
+    name = 'fake'
+
+    def __init__(
+        self,
+        latency: str = 'fixed:0',
+        tokens: str = '',
+        error_rate: float = 0.0,
+        invalid_rate: float = 0.0,
+        seed: int | None = None,
+        first_byte: float = 0.3,
+        chunk_size: int = 16,
+    ) -> None:
+        """Validate the specs and seed the generator."""
+        for name, rate in (
+            ('error_rate', error_rate),
+            ('invalid_rate', invalid_rate),
+        ):
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f'{name} must be within [0, 1]')
+        self.latency = Distribution.parse(latency)
+        self.tokens = Distribution.parse(tokens) if tokens else None
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.first_byte = first_byte
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._rng = random.Random(seed)  # nosec B311
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def reply(messages: list[Any]) -> str:
+        """Return the JSON reply for *messages*, stable per user prompt.
+
+        A user prompt holding a JSON list of diagnoses is answered with
+        exams for them; anything else gets a differential with exams.
+        """
+        user = str(messages[-1].get('content', '')) if messages else ''
+        try:
+            selected = json.loads(user)
+        except ValueError:
+            selected = None
+        if isinstance(selected, list):
+            exams: list[str] = []
+            for dx in selected:
+                for exam in _DIAGNOSES.get(str(dx), ['Clinical examination']):
+                    if exam not in exams:
+                        exams.append(exam)
+            return json.dumps(
+                {
+                    'summary': 'Suggested exams to narrow the differential.',
+                    'options': exams[:10],
+                }
+            )
+        digest = hashlib.sha256(user.encode('utf-8')).digest()
+        names = list(_DIAGNOSES)
+        picked = [names[(digest[0] + i) % len(names)] for i in range(3)]
+        return json.dumps(
+            {
+                'summary': (
+                    'Offline reply: symptoms compatible with '
+                    f'{picked[0].lower()}.'
+                ),
+                'options': picked,
+                'exams': {dx: _DIAGNOSES[dx] for dx in picked},
+                'exams_summary': 'Start with the least invasive exams.',
+            }
+        )
+
+    def _plan(self, messages: list[Any]) -> _Plan:
+        with self._lock:
+            self.calls += 1
+            latency = self.latency.sample(self._rng)
+            failed = self._rng.random() < self.error_rate
+            status = self._rng.choice((429, 500))
+            invalid = self._rng.random() < self.invalid_rate
+            tokens = (
+                round(self.tokens.sample(self._rng)) if self.tokens else None
+            )
+        error = _status_error(status) if failed else None
+        if invalid:
+            text = json.dumps({'summary': 'Reply without options.'})
+        else:
+            text = self.reply(messages)
+            if tokens is not None:
+                text = _pad(text, tokens)
+        prompt = ''.join(str(m.get('content', '')) for m in messages)
+        return _Plan(
+            latency=latency,
+            error=error,
+            text=text,
+            prompt_tokens=_estimate_tokens(prompt),
+            completion_tokens=(
+                tokens if tokens is not None else _estimate_tokens(text)
+            ),
+        )
+
+    def _usage(self, plan: _Plan) -> SimpleNamespace:
+        return SimpleNamespace(
+            prompt_tokens=plan.prompt_tokens,
+            completion_tokens=plan.completion_tokens,
+            total_tokens=plan.prompt_tokens + plan.completion_tokens,
+        )
+
+    def _completion(self, plan: _Plan, model: str) -> SimpleNamespace:
+        message = SimpleNamespace(role='assistant', content=plan.text)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message)],
+            usage=self._usage(plan),
+        )
+
+    def _chunks(self, plan: _Plan, model: str) -> list[Any]:
+        size = self.chunk_size
+        chunks: list[Any] = [
+            SimpleNamespace(
+                model=model,
+                choices=[
+                    SimpleNamespace(
+                        index=0,
+                        delta=SimpleNamespace(content=plan.text[i : i + size]),
+                    )
+                ],
+                usage=None,
+            )
+            for i in range(0, len(plan.text), size)
+        ]
+        chunks.append(
+            SimpleNamespace(model=model, choices=[], usage=self._usage(plan))
+        )
+        return chunks
+
+    def _split(self, plan: _Plan, stream: bool) -> tuple[float, float]:
+        """Return (wait before the reply starts, delay between chunks)."""
+        if not stream:
+            return plan.latency, 0.0
+        head = plan.latency * self.first_byte
+        chunks = max(1, math.ceil(len(plan.text) / self.chunk_size))
+        return head, (plan.latency - head) / chunks
+
+    def complete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Sleep for the sampled latency, then reply or fail."""
+        plan = self._plan(messages)
+        stream = bool(extra.get('stream'))
+        head, delay = self._split(plan, stream)
+        if head > timeout:
+            time.sleep(timeout)
+            raise _timeout_error()
+        time.sleep(head)
+        if plan.error is not None:
+            raise plan.error
+        mark_first_byte()
+        if stream:
+            return _FakeStream(self._chunks(plan, model), delay)
+        return self._completion(plan, model)
+
+    async def acomplete(
+        self, messages: list[Any], *, model: str, timeout: float, **extra: Any
+    ) -> Any:
+        """Async counterpart of :meth:`complete`."""
+        plan = self._plan(messages)
+        stream = bool(extra.get('stream'))
+        head, delay = self._split(plan, stream)
+        if head > timeout:
+            await asyncio.sleep(timeout)
+            raise _timeout_error()
+        await asyncio.sleep(head)
+        if plan.error is not None:
+            raise plan.error
+        mark_first_byte()
+        if stream:
+            return _FakeAsyncStream(self._chunks(plan, model), delay)
+        return self._completion(plan, model)
+
+
+def _request() -> Any:
+    import httpx
+
+    return httpx.Request('POST', 'http://fake-llm/v1/chat/completions')
+
+
+def _status_error(status: int) -> Exception:
+    import httpx
+
+    from openai import InternalServerError, RateLimitError
+
+    response = httpx.Response(status, request=_request())
+    if status == 429:
+        return RateLimitError('Fake rate limit', response=response, body=None)
+    return InternalServerError(
+        'Fake server error', response=response, body=None
+    )
+
+
+def _timeout_error() -> Exception:
+    from openai import APITimeoutError
+
+    return APITimeoutError(request=_request())
+
+
+__all__ = [
+    'Distribution',
+    'FakeBackend',
+    'LLMBackend',
+    'OpenAIBackend',
+    'first_byte_marks',
+    'mark_first_byte',
+]
@@ -0,0 +1,190 @@
+"""Content-addressed caches for LLM completions.
+
+Keys are a SHA-256 over the model name, the system prompt and the
+canonicalised user payload, so two requests with the same patient data hit
+the same entry regardless of dict ordering or whitespace.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+
+def canonicalize(text: str) -> str:
+    """Return a stable JSON form of *text*, or *text* itself if not JSON."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return text
+    return json.dumps(
+        data, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+
+
+def make_cache_key(model: str, system: str, user: str) -> str:
+    """Hash (model, system prompt, canonical user JSON) into a cache key."""
+    digest = hashlib.sha256()
+    for part in (model, system, canonicalize(user)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class BaseResponseCache(ABC):
+    """Base class for raw-response caches with hit/miss counters."""
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        """Initialize counters; *ttl* is the entry lifetime in seconds."""
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # the cache is shared by request and job threads
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for *key* and update the counters."""
+        value = self._get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store *value* under *key*."""
+        self._set(key, value)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters."""
+        with self._counter_lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+        raise NotImplementedError
+
+
+class MemoryCache(BaseResponseCache):
+    """In-process LRU cache with optional TTL."""
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: Optional[float] = None
+    ) -> None:
+        """Initialize an empty LRU holding at most *maxsize* entries."""
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._data)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            created, value = item
+            if self._expired(created):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(BaseResponseCache):
+    """On-disk cache stored in a single SQLite table."""
+
+    def __init__(
+        self, path: Union[str, Path], ttl: Optional[float] = None
+    ) -> None:
+        """Open (or create) the cache database at *path*."""
+        super().__init__(ttl)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'created REAL NOT NULL)'
+            )
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self._expired(created):
+                with self._conn:
+                    self._conn.execute(
+                        'DELETE FROM responses WHERE key = ?', (key,)
+                    )
+                return None
+            return str(value)
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created) '
+                'VALUES (?, ?, ?)',
+                (key, value, time.time()),
+            )
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
+
+
+__all__ = [
+    'BaseResponseCache',
+    'MemoryCache',
+    'SQLiteCache',
+    'canonicalize',
+    'make_cache_key',
+]
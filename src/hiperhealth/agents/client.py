@@ -3,42 +3,497 @@ Shared OpenAI helper used by all agents.
 
 * Forces JSON responses (`response_format={"type": "json_object"}`).
 * Validates with ``LLMDiagnosis.from_llm``.
-* Persists every raw reply under ``data/llm_raw/<sid>_<UTC>.json``.
+* Journals every raw reply under ``data/llm_raw/`` (batched JSONL
+  segments written by a background thread, indexed by session id).
+* ``achat`` runs on a pooled ``AsyncOpenAI`` client, so one event loop can
+  keep many completions in flight.
+* Optionally serves repeated prompts from a response cache
+  (``LLM_CACHE=memory`` or ``LLM_CACHE=sqlite``).
+* Retries transient errors with jittered backoff, re-asks once on an
+  invalid reply, enforces a per-call deadline and fails fast through a
+  circuit breaker while the provider is degraded.
+* ``chat_stream``/``achat_stream`` yield text deltas as they are generated,
+  followed by the validated result.
+* Reports tokens, wall time, time to first byte and retries of every call
+  to the sinks in :mod:`hiperhealth.agents.metrics`.
+* Sends requests through a pluggable backend (see
+  :mod:`hiperhealth.agents.backends`); ``LLM_BACKEND=fake`` answers
+  locally for offline benchmarks.
+
+Importing this module has no side effects: the ``.env`` file, the OpenAI
+clients, the journal directory and the cache are all set up on first use
+from :class:`~hiperhealth.agents.settings.LLMSettings`.
 """
 
 from __future__ import annotations
 
-import os
-import uuid
+import asyncio
+import time
 
-from datetime import datetime, timezone
-from pathlib import Path
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Type
 
-from dotenv import load_dotenv
-from fastapi import HTTPException
-from openai import OpenAI
 from pydantic import ValidationError
 
+from hiperhealth.agents.backends import (
+    FakeBackend,
+    LLMBackend,
+    OpenAIBackend,
+    first_byte_marks,
+    mark_first_byte,
+)
+from hiperhealth.agents.cache import (
+    BaseResponseCache,
+    MemoryCache,
+    SQLiteCache,
+    make_cache_key,
+)
+from hiperhealth.agents.journal import RawResponseJournal
+from hiperhealth.agents.metrics import CallMetrics, emit
+from hiperhealth.agents.resilience import (
+    CircuitBreaker,
+    DeadlineExceededError,
+    RetryPolicy,
+    is_retryable,
+)
+from hiperhealth.agents.settings import LLMSettings
 from hiperhealth.schema.clinical_outputs import LLMDiagnosis
 
-load_dotenv(Path(__file__).parents[3] / '.envs' / '.env')
+if TYPE_CHECKING:
+    import httpx
+
+    from openai import AsyncOpenAI, OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
+
+_settings: LLMSettings | None = None
+_client: OpenAI | None = None
+_async_client: AsyncOpenAI | None = None
+_journal: RawResponseJournal | None = None
+_breaker: CircuitBreaker | None = None
+_backend: LLMBackend | None = None
+
+_cache: BaseResponseCache | None = None
+_cache_configured = False
+
+
+def get_settings() -> LLMSettings:
+    """Return the active settings, reading the environment on first use."""
+    global _settings
+    if _settings is None:
+        _settings = LLMSettings.from_env()
+    return _settings
+
+
+def configure(
+    settings: LLMSettings | None = None, **overrides: Any
+) -> LLMSettings:
+    """Replace the active settings and drop lazily built resources.
+
+    Parameters
+    ----------
+    settings : LLMSettings, optional
+        New settings; defaults to the current ones.
+    **overrides
+        Individual fields to change, e.g. ``model='gpt-4o'``.
+    """
+    global _settings, _client, _async_client, _journal, _breaker, _backend
+    global _cache_configured
+    base = settings or get_settings()
+    _settings = base.with_overrides(**overrides) if overrides else base
+    if _journal is not None:
+        _journal.close()
+    _client = None
+    _async_client = None
+    _journal = None
+    _breaker = None
+    _backend = None
+    _cache_configured = False
+    return _settings
+
+
+def _mark_first_byte(response: httpx.Response) -> None:
+    # httpx runs response hooks once headers arrive, before the body
+    mark_first_byte()
+
+
+async def _amark_first_byte(response: httpx.Response) -> None:
+    _mark_first_byte(response)
+
 
-_MODEL_NAME = os.getenv('OPENAI_MODEL', 'o4-mini')
-_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY', ''))
+def get_client() -> OpenAI:
+    """Return the shared sync ``OpenAI`` client, creating it on first use."""
+    global _client
+    if _client is None:
+        import httpx
 
-_RAW_DIR = Path('data') / 'llm_raw'
-_RAW_DIR.mkdir(parents=True, exist_ok=True)
+        from openai import OpenAI
+
+        settings = get_settings()
+        # retries are handled by ``chat`` so they share one deadline
+        _client = OpenAI(
+            api_key=settings.api_key,
+            base_url=settings.base_url,
+            timeout=settings.timeout,
+            max_retries=0,
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive,
+                ),
+                timeout=settings.timeout,
+                event_hooks={'response': [_mark_first_byte]},
+            ),
+        )
+    return _client
+
+
+def get_journal() -> RawResponseJournal:
+    """Return the raw-reply journal, starting its writer on first use.
+
+    ``LLM_JOURNAL_COMPRESS=1`` gzips segments,
+    ``LLM_JOURNAL_SEGMENT_MB`` sets the rotation size and
+    ``LLM_JOURNAL_MAX_SEGMENTS`` how many segments are kept.
+    """
+    global _journal
+    if _journal is None:
+        settings = get_settings()
+        _journal = RawResponseJournal(
+            settings.raw_dir,
+            max_segment_bytes=int(settings.journal_segment_mb * 1024**2),
+            compress=settings.journal_compress,
+            max_segments=settings.journal_max_segments,
+        )
+    return _journal
 
 
 def dump_llm_json(text: str, sid: str | None) -> None:
+    """Queue *text* for the raw-reply journal under session *sid*."""
+    get_journal().append(text, sid)
+
+
+def raw_replies(session_id: str) -> list[dict[str, Any]]:
+    """Return every journaled raw reply for *session_id*."""
+    return get_journal().reader().lookup(session_id)
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Return the shared ``AsyncOpenAI`` client, creating it on first use.
+
+    The underlying ``httpx.AsyncClient`` keeps at most
+    ``OPENAI_MAX_CONNECTIONS`` open sockets (``OPENAI_MAX_KEEPALIVE`` of them
+    idle), so concurrent consultations reuse warm connections instead of
+    paying a TLS handshake per request.
+    """
+    global _async_client
+    if _async_client is None:
+        import httpx
+
+        from openai import AsyncOpenAI
+
+        settings = get_settings()
+        _async_client = AsyncOpenAI(
+            api_key=settings.api_key,
+            base_url=settings.base_url,
+            timeout=settings.timeout,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive,
+                ),
+                timeout=settings.timeout,
+                event_hooks={'response': [_amark_first_byte]},
+            ),
+        )
+    return _async_client
+
+
+def get_backend() -> LLMBackend:
+    """Return the active completion backend, creating it on first use.
+
+    ``LLM_BACKEND=openai`` (the default) uses the shared OpenAI clients;
+    ``LLM_BACKEND=fake`` builds a :class:`FakeBackend` from the
+    ``LLM_FAKE_*`` settings.
+    """
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.backend == 'fake':
+            _backend = FakeBackend(
+                latency=settings.fake_latency,
+                tokens=settings.fake_tokens,
+                error_rate=settings.fake_error_rate,
+                invalid_rate=settings.fake_invalid_rate,
+                seed=settings.fake_seed,
+            )
+        elif settings.backend == 'openai':
+            # look the factories up per call so they can be swapped
+            _backend = OpenAIBackend(
+                lambda: get_client(), lambda: get_async_client()
+            )
+        else:
+            raise ValueError(f'Unknown LLM backend {settings.backend!r}')
+    return _backend
+
+
+def set_backend(backend: LLMBackend | None) -> None:
+    """Send every request through *backend*; ``None`` restores settings."""
+    global _backend
+    _backend = backend
+
+
+def _cache_from_settings() -> BaseResponseCache | None:
+    settings = get_settings()
+    if settings.cache == 'memory':
+        return MemoryCache(maxsize=settings.cache_size, ttl=settings.cache_ttl)
+    if settings.cache == 'sqlite':
+        return SQLiteCache(settings.cache_path, ttl=settings.cache_ttl)
+    return None
+
+
+def get_cache() -> BaseResponseCache | None:
+    """Return the active response cache, if any."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        _cache = _cache_from_settings()
+        _cache_configured = True
+    return _cache
+
+
+def set_cache(cache: BaseResponseCache | None) -> None:
+    """Install *cache* in front of ``chat``/``achat``; ``None`` disables."""
+    global _cache, _cache_configured
+    _cache = cache
+    _cache_configured = True
+
+
+def _cached(key: str, schema: Type[LLMDiagnosis]) -> LLMDiagnosis | None:
+    cache = get_cache()
+    if cache is None:
+        return None
+    raw = cache.get(key)
+    if raw is None:
+        return None
+    return schema.from_llm(raw)
+
+
+def get_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker for the provider."""
+    global _breaker
+    if _breaker is None:
+        settings = get_settings()
+        _breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_threshold,
+            reset_timeout=settings.breaker_reset,
+        )
+    return _breaker
+
+
+def _retry_policy() -> RetryPolicy:
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.max_attempts,
+        base_delay=settings.retry_base_delay,
+        max_delay=settings.retry_max_delay,
+    )
+
+
+def _messages(system: str, user: str) -> list[ChatCompletionMessageParam]:
+    return [
+        {'role': 'system', 'content': system},
+        {'role': 'user', 'content': user},
+    ]
+
+
+def _corrective(
+    messages: list[ChatCompletionMessageParam],
+    raw: str,
+    exc: ValidationError,
+    schema: Type[LLMDiagnosis],
+) -> list[ChatCompletionMessageParam]:
+    """Return *messages* extended with a one-off re-ask after *raw*."""
+    return [
+        *messages,
+        {'role': 'assistant', 'content': raw},
+        {
+            'role': 'user',
+            'content': (
+                f'Your reply did not match the {schema.__name__} schema '
+                f'({exc.error_count()} errors: {exc.errors()[0]["msg"]}). '
+                'Reply again with only the corrected JSON object.'
+            ),
+        },
+    ]
+
+
+def _invalid_reply(exc: ValidationError, schema: Type[LLMDiagnosis]) -> Any:
+    from fastapi import HTTPException
+
+    return HTTPException(
+        422, f'LLM response is not valid {schema.__name__}: {exc}'
+    )
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError('LLM call exceeded its deadline')
+    return remaining
+
+
+def _retry_delay(
+    exc: Exception, attempt: int, deadline: float
+) -> float | None:
+    """Return how long to wait before retrying, or None to give up.
+
+    Raises ``DeadlineExceededError`` when a retry could not finish in time.
     """
-    Save *text* to data/llm_raw/<timestamp>_<sid>.json.
+    if not is_retryable(exc):
+        return None
+    get_breaker().record_failure()
+    policy = _retry_policy()
+    if attempt + 1 >= policy.max_attempts:
+        return None
+    delay = policy.backoff(attempt)
+    if time.monotonic() + delay >= deadline:
+        raise DeadlineExceededError(
+            'LLM call exceeded its deadline while retrying'
+        ) from exc
+    return delay
+
+
+@contextmanager
+def _track(
+    language: str | None, session_id: str | None, tokens_saved: int = 0
+) -> Iterator[CallMetrics]:
+    """Time one ``chat``/``achat`` call and emit its metrics on exit."""
+    metrics = CallMetrics(
+        model=get_settings().model,
+        language=language,
+        session_id=session_id,
+        prompt_tokens_saved=tokens_saved,
+    )
+    start = time.perf_counter()
+    try:
+        yield metrics
+    except BaseException as exc:
+        metrics.ok = False
+        metrics.error = type(exc).__name__
+        raise
+    finally:
+        metrics.wall_time = time.perf_counter() - start
+        emit(metrics)
 
-    If *sid* is None, a random 8-char token is used instead.
+
+@contextmanager
+def _first_byte_timer(metrics: CallMetrics) -> Iterator[None]:
+    """Record the time to first byte of the request made in the block."""
+    sent = time.perf_counter()
+    with first_byte_marks() as marks:
+        try:
+            yield
+        finally:
+            if marks:
+                metrics.ttfb = marks[-1] - sent
+
+
+def _accept(
+    raw: str,
+    session_id: str | None,
+    cache_key: str,
+    schema: Type[LLMDiagnosis],
+) -> LLMDiagnosis:
+    """Journal the raw completion, validate it and cache it.
+
+    Raises ``ValidationError`` when the reply does not match *schema*.
     """
-    ts = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
-    suffix = sid or uuid.uuid4().hex[:8]
-    (_RAW_DIR / f'{ts}_{suffix}.json').write_text(text, encoding='utf-8')
+    dump_llm_json(raw, session_id)
+    result = schema.from_llm(raw)
+    cache = get_cache()
+    if cache is not None:
+        cache.set(cache_key, raw)
+    return result
+
+
+def _create(
+    messages: list[ChatCompletionMessageParam],
+    metrics: CallMetrics,
+    deadline: float,
+    **extra: Any,
+) -> Any:
+    """Send one completion request, retrying transient errors."""
+    settings = get_settings()
+    while True:
+        get_breaker().before_call()
+        try:
+            with _first_byte_timer(metrics):
+                rsp = get_backend().complete(
+                    messages,
+                    model=settings.model,
+                    timeout=min(settings.timeout, _remaining(deadline)),
+                    **extra,
+                )
+        except Exception as exc:
+            delay = _retry_delay(exc, metrics.retries, deadline)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            metrics.retries += 1
+            continue
+        get_breaker().record_success()
+        return rsp
+
+
+async def _acreate(
+    messages: list[ChatCompletionMessageParam],
+    metrics: CallMetrics,
+    deadline: float,
+    per_request: float,
+    **extra: Any,
+) -> Any:
+    """Async counterpart of :func:`_create`."""
+    settings = get_settings()
+    while True:
+        get_breaker().before_call()
+        remaining = _remaining(deadline)
+        try:
+            with _first_byte_timer(metrics):
+                rsp = await asyncio.wait_for(
+                    get_backend().acomplete(
+                        messages,
+                        model=settings.model,
+                        timeout=min(per_request, remaining),
+                        **extra,
+                    ),
+                    remaining,
+                )
+        except asyncio.TimeoutError as exc:
+            get_breaker().record_failure()
+            raise DeadlineExceededError(
+                'LLM call exceeded its deadline'
+            ) from exc
+        except Exception as exc:
+            delay = _retry_delay(exc, metrics.retries, deadline)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            metrics.retries += 1
+            continue
+        get_breaker().record_success()
+        return rsp
+
+
+def _content(rsp: Any, metrics: CallMetrics) -> str:
+    metrics.add_usage(getattr(rsp, 'usage', None))
+    return rsp.choices[0].message.content or '{}'
+
+
+def _chunk_delta(chunk: Any, metrics: CallMetrics) -> str:
+    """Return the text carried by a streamed chunk, recording usage."""
+    metrics.add_usage(getattr(chunk, 'usage', None))
+    if not chunk.choices:
+        return ''
+    return chunk.choices[0].delta.content or ''
 
 
 def chat(
@@ -46,23 +501,224 @@ def chat(
     user: str,
     *,
     session_id: str | None = None,
+    language: str | None = None,
+    schema: Type[LLMDiagnosis] = LLMDiagnosis,
+    tokens_saved: int = 0,
+    refresh: bool = False,
 ) -> LLMDiagnosis:
-    """Send system / user prompts and return a validated ``LLMDiagnosis``."""
-    rsp = _client.chat.completions.create(
-        model=_MODEL_NAME,
-        response_format={'type': 'json_object'},
-        messages=[
-            {'role': 'system', 'content': system},
-            {'role': 'user', 'content': user},
-        ],
-    )
+    """Send system / user prompts and return a validated ``LLMDiagnosis``.
 
-    raw: str = rsp.choices[0].message.content or '{}'
-    dump_llm_json(raw, session_id)
+    *schema* may be any ``LLMDiagnosis`` subclass the reply should be
+    validated against. Transient provider errors are retried with jittered
+    backoff, an invalid reply is re-asked once, and the whole call is
+    bounded by ``LLM_DEADLINE`` seconds. *language* and *tokens_saved*
+    (prompt tokens removed by the caller's prompt assembly) are only
+    recorded in the call metrics. With *refresh*, a cached reply is not
+    served; the new reply replaces it in the cache.
+    """
+    settings = get_settings()
+    with _track(language, session_id, tokens_saved) as metrics:
+        key = make_cache_key(settings.model, system, user)
+        hit = None if refresh else _cached(key, schema)
+        if hit is not None:
+            metrics.cache_hit = True
+            return hit
 
-    try:
-        return LLMDiagnosis.from_llm(raw)
-    except ValidationError as exc:
-        raise HTTPException(
-            422, f'LLM response is not valid LLMDiagnosis: {exc}'
-        ) from exc
+        deadline = time.monotonic() + settings.deadline
+        messages = _messages(system, user)
+        while True:
+            raw = _content(_create(messages, metrics, deadline), metrics)
+            try:
+                return _accept(raw, session_id, key, schema)
+            except ValidationError as exc:
+                if metrics.reasked:
+                    raise _invalid_reply(exc, schema) from exc
+                metrics.reasked = True
+                messages = _corrective(messages, raw, exc, schema)
+
+
+async def achat(
+    system: str,
+    user: str,
+    *,
+    session_id: str | None = None,
+    language: str | None = None,
+    timeout: float | None = None,
+    schema: Type[LLMDiagnosis] = LLMDiagnosis,
+    tokens_saved: int = 0,
+    refresh: bool = False,
+) -> LLMDiagnosis:
+    """Async counterpart of :func:`chat` backed by the pooled client.
+
+    Parameters
+    ----------
+    system, user : str
+        System and user prompts.
+    session_id : str, optional
+        Identifier used when persisting the raw reply.
+    language : str, optional
+        Consultation language, recorded in the call metrics.
+    timeout : float, optional
+        Per-request timeout in seconds; defaults to ``OPENAI_TIMEOUT``.
+        The call as a whole, retries included, is still bounded by
+        ``LLM_DEADLINE``.
+    schema : type[LLMDiagnosis], optional
+        ``LLMDiagnosis`` subclass used to validate the reply.
+    tokens_saved : int, optional
+        Prompt tokens removed by the caller's prompt assembly, recorded in
+        the call metrics.
+    refresh : bool, optional
+        Skip the cached reply, if any, and cache the new one instead.
+    """
+    settings = get_settings()
+    with _track(language, session_id, tokens_saved) as metrics:
+        key = make_cache_key(settings.model, system, user)
+        hit = None if refresh else _cached(key, schema)
+        if hit is not None:
+            metrics.cache_hit = True
+            return hit
+
+        per_request = timeout if timeout is not None else settings.timeout
+        deadline = time.monotonic() + settings.deadline
+        messages = _messages(system, user)
+        while True:
+            rsp = await _acreate(messages, metrics, deadline, per_request)
+            raw = _content(rsp, metrics)
+            try:
+                return _accept(raw, session_id, key, schema)
+            except ValidationError as exc:
+                if metrics.reasked:
+                    raise _invalid_reply(exc, schema) from exc
+                metrics.reasked = True
+                messages = _corrective(messages, raw, exc, schema)
+
+
+def chat_stream(
+    system: str,
+    user: str,
+    *,
+    session_id: str | None = None,
+    language: str | None = None,
+    schema: Type[LLMDiagnosis] = LLMDiagnosis,
+    tokens_saved: int = 0,
+    refresh: bool = False,
+) -> Iterator[str | LLMDiagnosis]:
+    """Stream the reply of :func:`chat` while it is being generated.
+
+    Yields text deltas as they arrive and, as the last item, the validated
+    ``LLMDiagnosis``. Transient errors are only retried before the first
+    delta; an invalid reply is re-asked once without streaming.
+    """
+    settings = get_settings()
+    with _track(language, session_id, tokens_saved) as metrics:
+        key = make_cache_key(settings.model, system, user)
+        hit = None if refresh else _cached(key, schema)
+        if hit is not None:
+            metrics.cache_hit = True
+            yield hit.model_dump_json()
+            yield hit
+            return
+
+        deadline = time.monotonic() + settings.deadline
+        messages = _messages(system, user)
+        stream = _create(
+            messages,
+            metrics,
+            deadline,
+            stream=True,
+            stream_options={'include_usage': True},
+        )
+        parts: list[str] = []
+        try:
+            for chunk in stream:
+                delta = _chunk_delta(chunk, metrics)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+                _remaining(deadline)
+        finally:
+            stream.close()
+
+        raw = ''.join(parts) or '{}'
+        try:
+            yield _accept(raw, session_id, key, schema)
+        except ValidationError as exc:
+            metrics.reasked = True
+            messages = _corrective(messages, raw, exc, schema)
+            raw = _content(_create(messages, metrics, deadline), metrics)
+            try:
+                yield _accept(raw, session_id, key, schema)
+            except ValidationError as exc:
+                raise _invalid_reply(exc, schema) from exc
+
+
+async def achat_stream(
+    system: str,
+    user: str,
+    *,
+    session_id: str | None = None,
+    language: str | None = None,
+    schema: Type[LLMDiagnosis] = LLMDiagnosis,
+    tokens_saved: int = 0,
+    refresh: bool = False,
+) -> AsyncIterator[str | LLMDiagnosis]:
+    """Async counterpart of :func:`chat_stream`.
+
+    Every chunk must arrive before ``LLM_DEADLINE`` expires, otherwise
+    ``DeadlineExceededError`` is raised mid-stream.
+    """
+    settings = get_settings()
+    with _track(language, session_id, tokens_saved) as metrics:
+        key = make_cache_key(settings.model, system, user)
+        hit = None if refresh else _cached(key, schema)
+        if hit is not None:
+            metrics.cache_hit = True
+            yield hit.model_dump_json()
+            yield hit
+            return
+
+        deadline = time.monotonic() + settings.deadline
+        messages = _messages(system, user)
+        stream = await _acreate(
+            messages,
+            metrics,
+            deadline,
+            settings.timeout,
+            stream=True,
+            stream_options={'include_usage': True},
+        )
+        parts: list[str] = []
+        chunks = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        chunks.__anext__(), _remaining(deadline)
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError as exc:
+                    get_breaker().record_failure()
+                    raise DeadlineExceededError(
+                        'LLM stream exceeded its deadline'
+                    ) from exc
+                delta = _chunk_delta(chunk, metrics)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            await stream.close()
+
+        raw = ''.join(parts) or '{}'
+        try:
+            result = _accept(raw, session_id, key, schema)
+        except ValidationError as exc:
+            metrics.reasked = True
+            messages = _corrective(messages, raw, exc, schema)
+            rsp = await _acreate(messages, metrics, deadline, settings.timeout)
+            raw = _content(rsp, metrics)
+            try:
+                result = _accept(raw, session_id, key, schema)
+            except ValidationError as exc:
+                raise _invalid_reply(exc, schema) from exc
+        yield result
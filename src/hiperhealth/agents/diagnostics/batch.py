@@ -0,0 +1,224 @@
+"""Run the differential over a whole cohort for offline evaluation.
+
+Records are processed by ``concurrency`` workers pulling from the record
+iterator, so a cohort is never held in memory as pending calls, and
+throttled by requests- and tokens-per-minute budgets. Each result is
+appended to a JSONL file as soon as it completes, so an interrupted run
+resumes by skipping the record ids already written successfully.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+
+from hiperhealth.agents.diagnostics.core import adifferential
+from hiperhealth.agents.diagnostics.prompt import assemble_patient
+from hiperhealth.schema.clinical_outputs import LLMDiagnosis
+
+Backend = Callable[..., Awaitable[LLMDiagnosis]]
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+class RateLimiter:
+    """Async token bucket refilled continuously over one minute."""
+
+    def __init__(self, per_minute: Optional[float]) -> None:
+        """Allow *per_minute* units per minute; ``None`` means unlimited."""
+        self.per_minute = per_minute
+        self._tokens = per_minute or 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until *amount* units are available and consume them."""
+        if not self.per_minute:
+            return
+        amount = min(amount, self.per_minute)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.per_minute,
+                    self._tokens
+                    + (now - self._updated) * self.per_minute / 60,
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                missing = amount - self._tokens
+                await asyncio.sleep(missing * 60 / self.per_minute)
+
+
+async def stub_differential(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    session_id: Optional[str] = None,
+) -> LLMDiagnosis:
+    """Offline backend returning a deterministic, schema-valid result."""
+    payload = json.dumps(patient, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:8]
+    symptoms = str(patient.get('symptoms') or 'unspecified symptoms')
+    return LLMDiagnosis(
+        summary=f'Stub differential ({language}) for {symptoms[:120]}.',
+        options=[f'Stub diagnosis {digest}-{i}' for i in range(1, 4)],
+    )
+
+
+def load_records(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Load patient records from a JSON list or a JSONL file."""
+    text = Path(path).read_text(encoding='utf-8')
+    if Path(path).suffix == '.jsonl':
+        return [json.loads(line) for line in text.splitlines() if line]
+    records: List[Dict[str, Any]] = json.loads(text)
+    return records
+
+
+def record_id(record: Dict[str, Any], position: int) -> str:
+    """Return the record uuid, or its position when it has none."""
+    return str(record.get('meta', {}).get('uuid') or position)
+
+
+def completed_ids(output: Union[str, Path]) -> Set[str]:
+    """Return ids that already have a successful result in *output*."""
+    done: Set[str] = set()
+    path = Path(output)
+    if not path.exists():
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # a line cut short by an interrupted run
+                continue
+            if row.get('ok'):
+                done.add(row['id'])
+    return done
+
+
+async def arun_cohort(
+    records: Iterable[Dict[str, Any]],
+    output: Union[str, Path],
+    *,
+    backend: Backend = adifferential,
+    concurrency: int = 8,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    resume: bool = True,
+    progress: Optional[ProgressFn] = None,
+    label: Optional[str] = None,
+) -> Dict[str, int]:
+    """Run *backend* over *records*, streaming results to *output*.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        Records shaped like ``tests/data/patients/patients.json``
+        (``meta.uuid``, ``meta.lang`` and ``patient``).
+    output : str or Path
+        JSONL file; one line per processed record.
+    backend : callable
+        Coroutine ``(patient, language=, session_id=)`` returning an
+        ``LLMDiagnosis``; use :func:`stub_differential` to run offline.
+    concurrency : int
+        Number of workers, i.e. the maximum of in-flight requests.
+    requests_per_minute, tokens_per_minute : float, optional
+        Throttling budgets; prompt tokens are estimated from the payload.
+    resume : bool
+        Skip records that already succeeded in *output*.
+    progress : callable, optional
+        Called with every output row as it is written.
+    label : str, optional
+        Stored on every row, e.g. the model name under evaluation.
+
+    Returns
+    -------
+    dict
+        Counts of ``ok``, ``failed`` and ``skipped`` records.
+    """
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    done = completed_ids(path) if resume else set()
+    rpm = RateLimiter(requests_per_minute)
+    tpm = RateLimiter(tokens_per_minute)
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+
+    with open(path, 'a' if resume else 'w', encoding='utf-8') as out:
+
+        async def _one(position: int, record: Dict[str, Any]) -> None:
+            rid = record_id(record, position)
+            patient = record.get('patient', {})
+            language = record.get('meta', {}).get('lang') or 'en'
+            # what the differential actually sends, after summarising
+            tokens = assemble_patient(patient).tokens
+            await rpm.acquire()
+            await tpm.acquire(tokens)
+            start = time.perf_counter()
+            row: Dict[str, Any] = {'id': rid, 'language': language}
+            if label is not None:
+                row['label'] = label
+            try:
+                result = await backend(
+                    patient, language=language, session_id=rid
+                )
+                row.update(ok=True, result=result.model_dump())
+                counts['ok'] += 1
+            except Exception as exc:
+                row.update(ok=False, error=f'{type(exc).__name__}: {exc}')
+                counts['failed'] += 1
+            row['prompt_tokens_est'] = tokens
+            row['elapsed'] = round(time.perf_counter() - start, 4)
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+            out.flush()
+            if progress is not None:
+                progress(row)
+
+        # shared by the workers; next() never awaits, so no lock is needed
+        pending = enumerate(records)
+
+        async def _worker() -> None:
+            for position, record in pending:
+                if record_id(record, position) in done:
+                    counts['skipped'] += 1
+                    continue
+                await _one(position, record)
+
+        await asyncio.gather(*(_worker() for _ in range(max(concurrency, 1))))
+
+    return counts
+
+
+def run_cohort(
+    records: Iterable[Dict[str, Any]],
+    output: Union[str, Path],
+    **kwargs: Any,
+) -> Dict[str, int]:
+    """Blocking wrapper around :func:`arun_cohort`."""
+    return asyncio.run(arun_cohort(records, output, **kwargs))
+
+
+__all__ = [
+    'RateLimiter',
+    'arun_cohort',
+    'completed_ids',
+    'load_records',
+    'run_cohort',
+    'stub_differential',
+]
@@ -1,13 +1,25 @@
-"""Diagnostic-related LLM utilities."""
+"""Diagnostic-related LLM utilities.
+
+The differential functions send the patient payload built by
+:func:`hiperhealth.agents.diagnostics.prompt.assemble_patient`: wearable
+series and FHIR reports are summarised to fit ``token_budget`` (default
+``LLM_PROMPT_TOKEN_BUDGET``) and the tokens saved are recorded in the
+call metrics.
+"""
 
 from __future__ import annotations
 
 import json
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, cast
 
-from hiperhealth.agents.client import chat
-from hiperhealth.schema.clinical_outputs import LLMDiagnosis
+from hiperhealth.agents.cache import make_cache_key
+from hiperhealth.agents.client import achat, achat_stream, chat, get_settings
+from hiperhealth.agents.diagnostics.prompt import assemble_patient
+from hiperhealth.schema.clinical_outputs import (
+    LLMDiagnosis,
+    LLMDiagnosisWithExams,
+)
 
 _DIAG_PROMPTS = {
     'en': (
@@ -72,23 +84,78 @@ _EXAM_PROMPTS = {
     ),
 }
 
+_COMBINED_PROMPTS = {
+    'en': (
+        'You are an experienced physician assistant. '
+        "Given the patient data, return a JSON object with keys 'summary' "
+        "(two sentences), 'options' (array of differential diagnoses), "
+        "'exams' (object mapping every option to at most 5 exam/procedure "
+        "names) and 'exams_summary' (one sentence about the exams)."
+    ),
+    'pt': (
+        'Você é um assistente médico experiente. '
+        'Com base nos dados do paciente, retorne um objeto JSON com as '
+        "chaves 'summary' (duas frases), 'options' (lista de diagnósticos "
+        "diferenciais), 'exams' (objeto que associa cada opção a no máximo "
+        "5 nomes de exames/procedimentos) e 'exams_summary' (uma frase "
+        'sobre os exames).'
+    ),
+    'es': (
+        'Eres un asistente médico experimentado. '
+        'A partir de los datos del paciente, devuelve un objeto JSON con '
+        "las claves 'summary' (dos frases), 'options' (lista de "
+        "diagnósticos diferenciales), 'exams' (objeto que asocia cada "
+        'opción con máx. 5 nombres de exámenes/procedimientos) y '
+        "'exams_summary' (una frase sobre los exámenes)."
+    ),
+    'fr': (
+        'Vous êtes un assistant médical expérimenté. '
+        'À partir des données du patient, retournez un objet JSON avec les '
+        "clés 'summary' (deux phrases), 'options' (liste des diagnostics "
+        "différentiels), 'exams' (objet associant chaque option à au "
+        "maximum 5 noms d'examens/procédures) et 'exams_summary' (une "
+        'phrase sur les examens).'
+    ),
+    'it': (
+        'Sei un assistente medico esperto. '
+        'In base ai dati del paziente, restituisci un oggetto JSON con le '
+        "chiavi 'summary' (due frasi), 'options' (elenco delle diagnosi "
+        "differenziali), 'exams' (oggetto che associa ogni opzione a "
+        "massimo 5 nomi di esami/procedure) e 'exams_summary' (una frase "
+        'sugli esami).'
+    ),
+}
+
 
 def differential(
     patient: Dict[str, Any],
     language: str = 'en',
     session_id: str | None = None,
+    token_budget: int | None = None,
+    refresh: bool = False,
 ) -> LLMDiagnosis:
-    """Return summary + list of differential diagnoses."""
+    """Return summary + list of differential diagnoses.
+
+    *refresh* asks the model again even if the reply is cached, e.g. when
+    the physician regenerates the suggestions.
+    """
     prompt = _DIAG_PROMPTS.get(language, _DIAG_PROMPTS['en'])
+    payload = assemble_patient(patient, token_budget)
     return chat(
         prompt,
-        json.dumps(patient, ensure_ascii=False),
+        payload.text,
         session_id=session_id,
+        language=language,
+        refresh=refresh,
+        tokens_saved=payload.tokens_saved,
     )
 
 
 def exams(
-    selected_dx: List[str], language: str = 'en', session_id: str | None = None
+    selected_dx: List[str],
+    language: str = 'en',
+    session_id: str | None = None,
+    refresh: bool = False,
 ) -> LLMDiagnosis:
     """Return summary + list of suggested examinations."""
     prompt = _EXAM_PROMPTS.get(language, _EXAM_PROMPTS['en'])
@@ -96,7 +163,175 @@ def exams(
         prompt,
         json.dumps(selected_dx, ensure_ascii=False),
         session_id=session_id,
+        language=language,
+        refresh=refresh,
+    )
+
+
+async def adifferential(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    session_id: str | None = None,
+    token_budget: int | None = None,
+    refresh: bool = False,
+) -> LLMDiagnosis:
+    """Async variant of :func:`differential`."""
+    prompt = _DIAG_PROMPTS.get(language, _DIAG_PROMPTS['en'])
+    payload = assemble_patient(patient, token_budget)
+    return await achat(
+        prompt,
+        payload.text,
+        session_id=session_id,
+        language=language,
+        refresh=refresh,
+        tokens_saved=payload.tokens_saved,
+    )
+
+
+async def aexams(
+    selected_dx: List[str],
+    language: str = 'en',
+    session_id: str | None = None,
+    refresh: bool = False,
+) -> LLMDiagnosis:
+    """Async variant of :func:`exams`."""
+    prompt = _EXAM_PROMPTS.get(language, _EXAM_PROMPTS['en'])
+    return await achat(
+        prompt,
+        json.dumps(selected_dx, ensure_ascii=False),
+        session_id=session_id,
+        language=language,
+        refresh=refresh,
+    )
+
+
+def differential_with_exams(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    session_id: str | None = None,
+    token_budget: int | None = None,
+    refresh: bool = False,
+) -> LLMDiagnosisWithExams:
+    """Return the differential and candidate exams in one round-trip.
+
+    Use :meth:`LLMDiagnosisWithExams.exams_for` on the result to serve the
+    exams step without a second call when the physician only selects AI
+    suggested diagnoses.
+    """
+    prompt = _COMBINED_PROMPTS.get(language, _COMBINED_PROMPTS['en'])
+    payload = assemble_patient(patient, token_budget)
+    return cast(
+        LLMDiagnosisWithExams,
+        chat(
+            prompt,
+            payload.text,
+            session_id=session_id,
+            language=language,
+            refresh=refresh,
+            tokens_saved=payload.tokens_saved,
+            schema=LLMDiagnosisWithExams,
+        ),
+    )
+
+
+async def adifferential_with_exams(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    session_id: str | None = None,
+    token_budget: int | None = None,
+    refresh: bool = False,
+) -> LLMDiagnosisWithExams:
+    """Async variant of :func:`differential_with_exams`."""
+    prompt = _COMBINED_PROMPTS.get(language, _COMBINED_PROMPTS['en'])
+    payload = assemble_patient(patient, token_budget)
+    return cast(
+        LLMDiagnosisWithExams,
+        await achat(
+            prompt,
+            payload.text,
+            session_id=session_id,
+            language=language,
+            refresh=refresh,
+            tokens_saved=payload.tokens_saved,
+            schema=LLMDiagnosisWithExams,
+        ),
+    )
+
+
+def astream_differential_with_exams(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    session_id: str | None = None,
+    token_budget: int | None = None,
+    refresh: bool = False,
+) -> AsyncIterator[str | LLMDiagnosis]:
+    """Stream :func:`differential_with_exams` as it is generated.
+
+    Yields text deltas and, last, the validated ``LLMDiagnosisWithExams``.
+    """
+    prompt = _COMBINED_PROMPTS.get(language, _COMBINED_PROMPTS['en'])
+    payload = assemble_patient(patient, token_budget)
+    return achat_stream(
+        prompt,
+        payload.text,
+        session_id=session_id,
+        language=language,
+        refresh=refresh,
+        tokens_saved=payload.tokens_saved,
+        schema=LLMDiagnosisWithExams,
     )
 
 
-__all__ = ['differential', 'exams']
+def _fingerprint(prompts: Dict[str, str], user: str, language: str) -> str:
+    prompt = prompts.get(language, prompts['en'])
+    return make_cache_key(get_settings().model, prompt, user)
+
+
+def differential_fingerprint(
+    patient: Dict[str, Any],
+    language: str = 'en',
+    token_budget: int | None = None,
+) -> str:
+    """Return a digest of everything that shapes the differential.
+
+    Covers the model, the prompt for *language* and the assembled patient
+    payload (so the token budget too), so a stored result can be served
+    again while none of them changed.
+    """
+    payload = assemble_patient(patient, token_budget)
+    return _fingerprint(_COMBINED_PROMPTS, payload.text, language)
+
+
+def exams_fingerprint(selected_dx: List[str], language: str = 'en') -> str:
+    """Return a digest of everything that shapes the exam suggestions."""
+    return _fingerprint(
+        _EXAM_PROMPTS, json.dumps(selected_dx, ensure_ascii=False), language
+    )
+
+
+def precomputed_exams(
+    ai_diag: Dict[str, Any] | None, selected_dx: List[str]
+) -> LLMDiagnosis | None:
+    """Return exams for *selected_dx* from a stored combined differential.
+
+    *ai_diag* is the dumped result of :func:`differential_with_exams` (or a
+    plain differential, in which case ``None`` is returned).
+    """
+    if not ai_diag or not ai_diag.get('exams'):
+        return None
+    combined = LLMDiagnosisWithExams.model_validate(ai_diag)
+    return combined.exams_for(selected_dx)
+
+
+__all__ = [
+    'adifferential',
+    'adifferential_with_exams',
+    'aexams',
+    'astream_differential_with_exams',
+    'differential',
+    'differential_fingerprint',
+    'differential_with_exams',
+    'exams',
+    'exams_fingerprint',
+    'precomputed_exams',
+]
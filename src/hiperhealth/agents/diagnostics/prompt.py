@@ -0,0 +1,477 @@
+"""Token-budgeted patient payloads for the differential prompt.
+
+The consultation record carries ``wearable_data`` (raw rows, or the
+stored series reference with its summary and daily windows) and
+``previous_tests`` (FHIR resources per uploaded report) verbatim; a month
+of samples alone can add tens of thousands of tokens to every call.
+:func:`assemble_patient` replaces both with compact statistics and key
+findings, then coarsens the larger of the two, one step at a time, until
+the payload fits the token budget (``LLM_PROMPT_TOKEN_BUDGET``). Every
+other field is sent unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from hiperhealth.agents.client import get_settings
+from hiperhealth.agents.extraction.columnar import WearableTable
+from hiperhealth.agents.extraction.rollup import rollup_table
+
+WEARABLE_FIELD = 'wearable_data'
+TESTS_FIELD = 'previous_tests'
+
+# days of daily values kept at each wearable detail level
+_WEARABLE_DAYS = (31, 14, 7)
+# metrics reported as daily totals rather than means
+_CUMULATIVE = re.compile(r'steps|calories|distance|floors', re.IGNORECASE)
+# stage durations, reported once as sleep_per_day
+_SLEEP_COLUMN = re.compile(r'^sleep_(\w+_)?duration$')
+# change of the last week against the whole period worth reporting
+TREND_THRESHOLD = 0.15
+# FHIR ObservationInterpretation codes meaning "outside normal"
+_ABNORMAL_FLAGS = {
+    'A',
+    'AA',
+    'DET',
+    'H',
+    'HH',
+    'HU',
+    'L',
+    'LL',
+    'LU',
+    'POS',
+}
+_SKIPPED_RESOURCES = {'Patient', 'Practitioner', 'Organization', 'Bundle'}
+_MAX_TEXT = 300
+# rows serialised to estimate what a raw series would cost verbatim
+_SAMPLE_ROWS = 64
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of *text* (~4 chars per token)."""
+    return len(text) // 4 + 1
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _verbatim_tokens(value: Any) -> int:
+    """Estimate the tokens *value* costs verbatim, sampling long row lists.
+
+    Rollups kept in older series references are left out: they are never
+    part of the record sent to the model.
+    """
+    if isinstance(value, Mapping) and 'rollups' in value:
+        value = {k: v for k, v in value.items() if k != 'rollups'}
+    if isinstance(value, list) and len(value) > _SAMPLE_ROWS:
+        step = len(value) / _SAMPLE_ROWS
+        sample = [value[int(i * step)] for i in range(_SAMPLE_ROWS)]
+        size = len(_dumps(sample)) * len(value) // _SAMPLE_ROWS
+        return size // 4 + 1
+    return estimate_tokens(_dumps(value))
+
+
+def _round(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def _clip(text: str, limit: int = _MAX_TEXT) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + '...'
+
+
+@dataclass(frozen=True)
+class PromptAssembly:
+    """The user payload sent to the LLM and what assembling it saved."""
+
+    text: str
+    tokens: int
+    original_tokens: int
+    over_budget: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        """Return the estimated prompt tokens removed by summarising."""
+        return max(self.original_tokens - self.tokens, 0)
+
+
+# --- wearable data ---
+
+
+def _wearable_parts(
+    data: Any,
+) -> Optional[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]]:
+    """Return (rows, per-column stats, daily windows), or None if raw."""
+    if isinstance(data, Mapping) and 'summary' in data:
+        days = data.get('daily') or []
+        return int(data.get('rows') or 0), dict(data['summary']), days
+    if isinstance(data, list) and data:
+        records = [row for row in data if isinstance(row, Mapping)]
+        if len(records) != len(data):
+            return None
+        table = WearableTable.from_records(records)
+        days = rollup_table(table, ['day'])['windows'].get('day', [])
+        return len(table), table.describe(), days
+    return None
+
+
+def _wearable_trends(
+    days: List[Dict[str, Any]], metrics: Mapping[str, Any]
+) -> List[str]:
+    """Describe metrics whose last week differs from the whole period."""
+    if len(days) <= 7:
+        return []
+    findings = []
+    for name, stats in metrics.items():
+        recent = [
+            d['metrics'][name]['mean']
+            for d in days[-7:]
+            if name in d.get('metrics', {})
+        ]
+        overall = stats.get('mean')
+        if not recent or not overall:
+            continue
+        mean = sum(recent) / len(recent)
+        change = (mean - overall) / abs(overall)
+        if abs(change) >= TREND_THRESHOLD:
+            findings.append(
+                f'{name}: last 7 days mean {_round(mean)} vs '
+                f'{_round(overall)} overall ({change:+.0%})'
+            )
+    return findings
+
+
+def _render_wearable(
+    parts: Tuple[int, Dict[str, Any], List[Dict[str, Any]]], level: int
+) -> Dict[str, Any]:
+    """Render the wearable summary at *level* (0 is the most detailed)."""
+    rows, stats, days = parts
+    summary: Dict[str, Any] = {'rows': rows}
+    if days:
+        summary['period'] = f'{days[0]["start"]} to {days[-1]["start"]}'
+        summary['days'] = len(days)
+    if level >= len(_WEARABLE_DAYS) + 1:
+        return summary
+
+    sleep: Dict[str, float] = {}
+    nights = [d['sleep'] for d in days if d.get('sleep')]
+    for night in nights:
+        for stage, total in night.items():
+            sleep[stage] = sleep.get(stage, 0) + (total or 0)
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for name, column in stats.items():
+        if column.get('kind') not in ('int', 'float'):
+            continue
+        if not column.get('count') or (sleep and _SLEEP_COLUMN.match(name)):
+            continue
+        metrics[name] = {
+            key: _round(column[key])
+            for key in ('mean', 'min', 'max')
+            if key in column
+        }
+        if days and _CUMULATIVE.search(name):
+            total = column['mean'] * column['count']
+            metrics[name]['per_day'] = _round(total / len(days))
+    summary['metrics'] = metrics
+    if sleep:
+        summary['sleep_per_day'] = {
+            stage: _round(total / len(nights))
+            for stage, total in sleep.items()
+        }
+    findings = _wearable_trends(days, metrics)
+    if findings:
+        summary['findings'] = findings
+    if level >= len(_WEARABLE_DAYS):
+        return summary
+
+    daily = []
+    for day in days[-_WEARABLE_DAYS[level] :]:
+        values: Dict[str, Any] = {'date': day['start']}
+        for name, found in day.get('metrics', {}).items():
+            if name in metrics:
+                value = found['mean']
+                if _CUMULATIVE.search(name):
+                    value *= found['count']
+                values[name] = _round(value)
+        values.update(day.get('sleep') or {})
+        daily.append(values)
+    summary['daily'] = daily
+    return summary
+
+
+# --- FHIR reports ---
+
+
+def _concept(value: Any) -> Optional[str]:
+    """Return the readable text of a CodeableConcept-like value."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, Mapping):
+        return None
+    if value.get('text'):
+        return str(value['text'])
+    for coding in value.get('coding') or []:
+        if isinstance(coding, Mapping):
+            label = coding.get('display') or coding.get('code')
+            if label:
+                return str(label)
+    return None
+
+
+def _quantity(value: Any) -> Optional[str]:
+    if not isinstance(value, Mapping) or value.get('value') is None:
+        return None
+    unit = value.get('unit') or value.get('code') or ''
+    return f'{_round(value["value"])} {unit}'.strip()
+
+
+def _observation_value(resource: Mapping[str, Any]) -> Optional[str]:
+    for key in ('valueQuantity', 'valueString', 'valueCodeableConcept'):
+        if key in resource:
+            found = resource[key]
+            return _quantity(found) or _concept(found)
+    for key in ('valueBoolean', 'valueInteger', 'valueDecimal'):
+        if key in resource:
+            return str(resource[key])
+    return None
+
+
+def _reference_range(
+    resource: Mapping[str, Any],
+) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    ranges = resource.get('referenceRange') or []
+    first = ranges[0] if isinstance(ranges, list) and ranges else None
+    if not isinstance(first, Mapping):
+        return None, None, None
+    bounds = [
+        first.get(side, {}).get('value')
+        if isinstance(first.get(side), Mapping)
+        else None
+        for side in ('low', 'high')
+    ]
+    low, high = (
+        float(b) if isinstance(b, (int, float)) else None for b in bounds
+    )
+    if first.get('text'):
+        label = str(first['text'])
+    elif low is not None or high is not None:
+        label = f'{_round(low) if low is not None else ""}-' + (
+            f'{_round(high)}' if high is not None else ''
+        )
+    else:
+        label = None
+    return low, high, label
+
+
+def _observation(resource: Mapping[str, Any]) -> Tuple[str, bool]:
+    """Return a one-line finding and whether it is abnormal."""
+    name = _concept(resource.get('code')) or 'Observation'
+    value = _observation_value(resource)
+    flag = _concept(resource.get('interpretation'))
+    low, high, reference = _reference_range(resource)
+    number = (resource.get('valueQuantity') or {}).get('value')
+    if flag is None and isinstance(number, (int, float)):
+        if low is not None and number < low:
+            flag = 'L'
+        elif high is not None and number > high:
+            flag = 'H'
+    abnormal = flag is not None and (
+        flag.upper() in _ABNORMAL_FLAGS
+        or flag.lower() in {'abnormal', 'high', 'low', 'positive'}
+    )
+    details = [d for d in (flag, f'ref {reference}' if reference else '') if d]
+    line = f'{name}: {value if value is not None else "n/a"}'
+    if details:
+        line += f' ({", ".join(details)})'
+    when = resource.get('effectiveDateTime') or resource.get('issued')
+    if isinstance(when, str):
+        line += f' [{when[:10]}]'
+    return _clip(line, 160), abnormal
+
+
+def _resources(reports: List[Any]) -> List[Tuple[str, Mapping[str, Any]]]:
+    """Flatten stored reports into (resource type, resource) pairs."""
+    found: List[Tuple[str, Mapping[str, Any]]] = []
+
+    def visit(name: str, value: Any) -> None:
+        for item in value if isinstance(value, list) else [value]:
+            if not isinstance(item, Mapping):
+                continue
+            kind = str(item.get('resourceType') or name)
+            if kind == 'Bundle':
+                for entry in item.get('entry') or []:
+                    if isinstance(entry, Mapping):
+                        visit('', entry.get('resource'))
+            else:
+                found.append((kind, item))
+
+    for report in reports:
+        if not isinstance(report, Mapping):
+            continue
+        if report.get('resourceType'):
+            visit('', report)
+            continue
+        for key, value in report.items():
+            if key != 'filename':
+                visit(key, value)
+    return found
+
+
+def _fhir_parts(reports: Any) -> Optional[Dict[str, Any]]:
+    """Return the findings of stored FHIR reports, or None if raw."""
+    if not isinstance(reports, list) or not reports:
+        return None
+    abnormal: List[str] = []
+    normal: List[str] = []
+    conclusions: List[str] = []
+    conditions: List[str] = []
+    other: List[str] = []
+    for kind, resource in _resources(reports):
+        if kind in _SKIPPED_RESOURCES:
+            continue
+        if kind == 'Observation':
+            line, is_abnormal = _observation(resource)
+            (abnormal if is_abnormal else normal).append(line)
+            continue
+        if kind == 'DiagnosticReport':
+            title = _concept(resource.get('code')) or 'Report'
+            text = resource.get('conclusion') or _concept(
+                resource.get('conclusionCode')
+            )
+            if text:
+                conclusions.append(_clip(f'{title}: {text}'))
+            continue
+        name = _concept(
+            resource.get('code') or resource.get('medicationCodeableConcept')
+        )
+        if name is None:
+            continue
+        if kind == 'Condition':
+            conditions.append(_clip(name, 120))
+        else:
+            other.append(_clip(f'{kind}: {name}', 120))
+    return {
+        'reports': sum(isinstance(r, Mapping) for r in reports),
+        'abnormal': abnormal,
+        'normal': normal,
+        'conclusions': conclusions,
+        'conditions': conditions,
+        'other': other,
+    }
+
+
+def _render_fhir(parts: Dict[str, Any], level: int) -> Dict[str, Any]:
+    """Render the report findings at *level* (0 is the most detailed)."""
+    summary: Dict[str, Any] = {'reports': parts['reports']}
+    if level >= 3:
+        summary['abnormal_results'] = len(parts['abnormal'])
+        if parts['conditions']:
+            summary['conditions'] = parts['conditions'][:5]
+        return summary
+    limit = None if level < 2 else 10
+    for key in ('abnormal', 'conclusions', 'conditions'):
+        if parts[key]:
+            summary[key] = parts[key][:limit]
+    if level >= 2:
+        summary['conclusions'] = [
+            _clip(c, 120) for c in summary.get('conclusions', [])
+        ]
+        omitted = len(parts['abnormal']) - len(summary.get('abnormal', []))
+        if omitted:
+            summary['abnormal_omitted'] = omitted
+    if level == 0:
+        if parts['normal']:
+            summary['normal'] = parts['normal']
+        if parts['other']:
+            summary['other'] = parts['other']
+    elif parts['normal']:
+        summary['normal_results'] = len(parts['normal'])
+    return summary
+
+
+# --- assembly ---
+
+_Renderer = Callable[[Any, int], Dict[str, Any]]
+_FIELDS: Dict[str, Tuple[Callable[[Any], Any], _Renderer, int]] = {
+    WEARABLE_FIELD: (
+        _wearable_parts,
+        _render_wearable,
+        len(_WEARABLE_DAYS) + 1,
+    ),
+    TESTS_FIELD: (_fhir_parts, _render_fhir, 3),
+}
+
+
+def assemble_patient(
+    patient: Mapping[str, Any], token_budget: Optional[int] = None
+) -> PromptAssembly:
+    """Return the differential's user payload for *patient*.
+
+    ``wearable_data`` and ``previous_tests`` are summarised; while the
+    payload exceeds *token_budget* (default ``LLM_PROMPT_TOKEN_BUDGET``;
+    0 disables trimming) the field currently costing the most tokens is
+    rendered one level coarser. The budget is best effort: once both are
+    at their coarsest the payload is sent with ``over_budget`` set. The
+    raw fields are never serialised whole; long series are sized from a
+    sample of rows.
+    """
+    budget = (
+        get_settings().prompt_token_budget
+        if token_budget is None
+        else token_budget
+    )
+    payload = dict(patient)
+    parts: Dict[str, Any] = {}
+    levels: Dict[str, int] = {}
+    for field, (extract, _, _) in _FIELDS.items():
+        found = extract(patient.get(field))
+        if found is not None:
+            parts[field] = found
+            levels[field] = 0
+    # the raw fields are sized separately instead of dumping the record
+    rest = {k: v for k, v in patient.items() if k not in parts}
+    original_tokens = estimate_tokens(_dumps(rest)) + sum(
+        _verbatim_tokens(patient[field]) for field in parts
+    )
+
+    def render(field: str) -> Dict[str, Any]:
+        return _FIELDS[field][1](parts[field], levels[field])
+
+    for field in parts:
+        payload[field] = render(field)
+    text = _dumps(payload)
+    while budget and estimate_tokens(text) > budget:
+        open_fields = [f for f in parts if levels[f] < _FIELDS[f][2]]
+        if not open_fields:
+            break
+        field = max(open_fields, key=lambda f: len(_dumps(payload[f])))
+        levels[field] += 1
+        payload[field] = render(field)
+        text = _dumps(payload)
+
+    tokens = estimate_tokens(text)
+    return PromptAssembly(
+        text=text,
+        tokens=tokens,
+        original_tokens=original_tokens,
+        over_budget=bool(budget) and tokens > budget,
+    )
+
+
+__all__ = [
+    'TESTS_FIELD',
+    'WEARABLE_FIELD',
+    'PromptAssembly',
+    'assemble_patient',
+    'estimate_tokens',
+]
@@ -0,0 +1,707 @@
+"""Column-oriented tables for wearable exports.
+
+Each column's type is inferred once from a sample of its values and the
+whole column is then converted in bulk into a NumPy array:
+
+* ``int`` / ``float``: ``int64`` / ``float64``;
+* ``datetime``: ISO 8601 timestamps as ``datetime64`` in UTC, with the
+  original UTC offsets (minutes) kept alongside so they round-trip;
+* ``date``: ``datetime64[D]``;
+* ``category``: low-cardinality strings (``os``, ``timezone``) as small
+  integer codes into a sorted array of categories;
+* ``string`` / ``object``: everything else, as an object array.
+
+A value that contradicts the inferred type demotes the column to the next
+looser type (``int`` -> ``float`` -> ``string``), so inference never
+fails a parse.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import json
+import re
+
+from dataclasses import dataclass, replace
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+import numpy as np
+
+from numpy.typing import NDArray
+
+ColumnKind = Literal[
+    'int', 'float', 'datetime', 'date', 'category', 'string', 'object'
+]
+
+# non-empty values per column used to infer its type
+SAMPLE_SIZE = 1000
+# most distinct values a string column may have to be categorical
+MAX_CATEGORIES = 1024
+
+_INT = re.compile(r'^[+-]?\d+$')
+_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME = re.compile(
+    r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?'
+    r'(Z|[+-]\d{2}:\d{2})?$'
+)
+_ZERO, _PLUS, _MINUS, _COLON, _ZULU = (ord(c) for c in '0+-:Z')
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def infer_kind(sample: Sequence[str]) -> ColumnKind:
+    """Return the narrowest column type that fits every value in *sample*.
+
+    *sample* holds stripped, non-empty strings.
+    """
+    if not sample:
+        return 'string'
+    if all(_INT.match(v) for v in sample):
+        return 'int'
+    if all(_is_number(v) for v in sample):
+        return 'float'
+    if all(_DATE.match(v) for v in sample):
+        return 'date'
+    if all(_DATETIME.match(v) for v in sample):
+        return 'datetime'
+    distinct = len(set(sample))
+    if distinct <= MAX_CATEGORIES and distinct * 2 <= len(sample):
+        return 'category'
+    return 'string'
+
+
+def _smallest_codes(codes: NDArray[Any], count: int) -> NDArray[Any]:
+    for dtype in (np.uint8, np.uint16, np.int32):
+        if count <= np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes.astype(np.int64)
+
+
+def _split_offsets(
+    raw: NDArray[np.str_],
+) -> Tuple[NDArray[np.str_], Optional[NDArray[np.int16]]]:
+    """Split ``±HH:MM`` / ``Z`` suffixes off ISO timestamps, vectorised.
+
+    Returns the local timestamps and the offsets in minutes east of UTC,
+    or ``None`` when no value carries an offset. Mixing aware and naive
+    values raises ``ValueError``.
+    """
+    n = len(raw)
+    width = raw.dtype.itemsize // 4
+    if n == 0 or width == 0:
+        return raw, None
+    lengths = np.char.str_len(raw)
+    codes = raw.view(np.uint32).reshape(n, width)
+    rows = np.arange(n)
+
+    def at(back: int) -> NDArray[np.uint32]:
+        found: NDArray[np.uint32] = codes[rows, np.maximum(lengths - back, 0)]
+        return found
+
+    present = lengths > 0
+    zulu = present & (at(1) == _ZULU)
+    signed = (
+        (lengths > 16)
+        & ((at(6) == _PLUS) | (at(6) == _MINUS))
+        & (at(3) == _COLON)
+    )
+    aware = zulu | signed
+    if not aware[present].any():
+        return raw, None
+    if not aware[present].all():
+        raise ValueError('Mixed timezone-aware and naive timestamps')
+
+    digits = codes.astype(np.int32) - _ZERO
+    hours = digits[rows, lengths - 5] * 10 + digits[rows, lengths - 4]
+    minutes = digits[rows, lengths - 2] * 10 + digits[rows, lengths - 1]
+    sign = np.where(at(6) == _MINUS, -1, 1)
+    offsets = np.where(signed, sign * (hours * 60 + minutes), 0)
+
+    cut = lengths - np.where(signed, 6, np.where(zulu, 1, 0))
+    local = codes.copy()
+    local[np.arange(width) >= cut[:, None]] = 0
+    return local.view(raw.dtype).ravel(), offsets.astype(np.int16)
+
+
+def _datetime_unit(lengths: NDArray[Any]) -> str:
+    """Return the precision timestamps of these lengths were written in.
+
+    ``auto`` means minutes and seconds are mixed: seconds are rendered
+    only where they are not zero.
+    """
+    longest = int(lengths.max(initial=0))
+    if longest <= 16:
+        return 'm'
+    if longest <= 19:
+        return 'auto' if (lengths == 16).any() else 's'
+    return 'us'
+
+
+@dataclass(frozen=True)
+class Column:
+    """One typed column of a :class:`WearableTable`.
+
+    ``mask`` marks missing values. Categorical columns keep their codes in
+    ``values`` and the labels in ``categories``; timestamp columns keep the
+    UTC instants in ``values`` and per-row UTC offsets in ``offsets``.
+    """
+
+    name: str
+    kind: ColumnKind
+    values: NDArray[Any]
+    mask: Optional[NDArray[np.bool_]] = None
+    categories: Optional[NDArray[Any]] = None
+    offsets: Optional[NDArray[np.int16]] = None
+    unit: str = 's'
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the column's arrays."""
+        arrays = (self.values, self.mask, self.categories, self.offsets)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    @classmethod
+    def from_strings(cls, name: str, raw: Sequence[str]) -> Column:
+        """Infer the type of string cells *raw* and convert them in bulk."""
+        present = (v.strip() for v in raw if v and not v.isspace())
+        kind = infer_kind(list(itertools.islice(present, SAMPLE_SIZE)))
+        if kind in ('int', 'float'):
+            # complete numeric columns convert straight from the cells
+            dtype = np.int64 if kind == 'int' else np.float64
+            try:
+                return cls(name, kind, np.array(raw, dtype=dtype))
+            except (ValueError, OverflowError):
+                pass
+        strings = np.char.strip(np.asarray(raw, dtype=str))
+        missing = strings == ''
+        mask = missing if missing.any() else None
+        filled = np.where(missing, '0', strings)
+        if kind == 'int':
+            try:
+                return cls(name, 'int', filled.astype(np.int64), mask)
+            except (ValueError, OverflowError):
+                kind = 'float'
+        if kind == 'float':
+            try:
+                values = filled.astype(np.float64)
+            except ValueError:
+                kind = 'string'
+            else:
+                values[missing] = np.nan
+                return cls(name, 'float', values, mask)
+        if kind in ('date', 'datetime'):
+            try:
+                return cls._timestamps(name, strings, missing, mask)
+            except ValueError:
+                kind = 'string'
+        if kind == 'category':
+            labels, codes = np.unique(strings, return_inverse=True)
+            return cls(
+                name,
+                'category',
+                _smallest_codes(codes, len(labels)),
+                mask,
+                categories=labels.astype(object),
+            )
+        return cls(name, 'string', strings.astype(object), mask)
+
+    @classmethod
+    def _timestamps(
+        cls,
+        name: str,
+        strings: NDArray[np.str_],
+        missing: NDArray[np.bool_],
+        mask: Optional[NDArray[np.bool_]],
+    ) -> Column:
+        local, offsets = _split_offsets(strings)
+        lengths = np.char.str_len(local)
+        if offsets is None and not (lengths[~missing] > 10).any():
+            return cls(name, 'date', local.astype('datetime64[D]'), mask)
+        unit = _datetime_unit(lengths)
+        storage = 'datetime64[us]' if unit == 'us' else 'datetime64[s]'
+        values = np.where(missing, 'NaT', local).astype(storage)
+        if offsets is not None:
+            values = values - offsets.astype('timedelta64[m]')
+        return cls(name, 'datetime', values, mask, offsets=offsets, unit=unit)
+
+    @classmethod
+    def from_values(cls, name: str, raw: Sequence[Any]) -> Column:
+        """Build a column from already-typed values, e.g. parsed JSON."""
+        present = [v for v in raw if v is not None]
+        if all(isinstance(v, str) for v in present):
+            return cls.from_strings(
+                name, ['' if v is None else v for v in raw]
+            )
+        mask_list = [v is None for v in raw]
+        mask = np.array(mask_list) if any(mask_list) else None
+        numbers = all(
+            isinstance(v, (int, float)) and not isinstance(v, bool)
+            for v in present
+        )
+        if numbers and all(isinstance(v, int) for v in present):
+            try:
+                values = np.array(
+                    [0 if v is None else v for v in raw], dtype=np.int64
+                )
+                return cls(name, 'int', values, mask)
+            except OverflowError:
+                pass
+        if numbers:
+            values = np.array(
+                [np.nan if v is None else v for v in raw], dtype=np.float64
+            )
+            return cls(name, 'float', values, mask)
+        if all(
+            isinstance(v, (str, int, float)) and not isinstance(v, bool)
+            for v in present
+        ):
+            # e.g. numbers mixed with strings such as '-5' or 'n/a'
+            cells = ['' if v is None else str(v) for v in raw]
+            return cls.from_strings(name, cells)
+        values = np.empty(len(raw), dtype=object)
+        values[:] = list(raw)
+        return cls(name, 'object', values, mask)
+
+    def take(self, index: NDArray[Any]) -> Column:
+        """Return the rows selected by *index* (positions or a mask)."""
+
+        def pick(array: Optional[NDArray[Any]]) -> Optional[NDArray[Any]]:
+            return None if array is None else array[index]
+
+        return replace(
+            self,
+            values=self.values[index],
+            mask=pick(self.mask),
+            offsets=pick(self.offsets),
+        )
+
+    def present(self) -> NDArray[np.bool_]:
+        """Return a mask of the rows holding a value."""
+        if self.mask is None:
+            return np.ones(len(self), dtype=bool)
+        return ~self.mask
+
+    def describe(self) -> Dict[str, Any]:
+        """Return JSON-safe summary statistics of the column."""
+        present = self.present()
+        count = int(present.sum())
+        stats: Dict[str, Any] = {'kind': self.kind, 'count': count}
+        if not count:
+            return stats
+        if self.kind in ('int', 'float'):
+            values = self.values[present]
+            scalar = int if self.kind == 'int' else float
+            stats.update(
+                min=scalar(values.min()),
+                max=scalar(values.max()),
+                mean=round(float(values.mean()), 6),
+            )
+        elif self.kind in ('date', 'datetime'):
+            rows = np.flatnonzero(present)
+            order = np.argsort(self.values[rows], kind='stable')
+            ends = self.take(rows[order[[0, -1]]]).to_list()
+            stats.update(first=ends[0], last=ends[1])
+        elif self.kind == 'category' and self.categories is not None:
+            counts = np.bincount(
+                self.values[present], minlength=len(self.categories)
+            )
+            top = np.argsort(-counts, kind='stable')[:5]
+            stats['top'] = {
+                str(self.categories[i]): int(counts[i])
+                for i in top
+                if counts[i]
+            }
+        return stats
+
+    def decode(self) -> NDArray[Any]:
+        """Return the values as an array of their natural type.
+
+        Categories are expanded to labels and timestamps shifted to their
+        local wall-clock time.
+        """
+        values: NDArray[Any] = self.values
+        if self.kind == 'category' and self.categories is not None:
+            values = self.categories[values]
+        elif self.kind == 'datetime' and self.offsets is not None:
+            values = values + self.offsets.astype('timedelta64[m]')
+        return values
+
+    def _render_timestamps(self) -> NDArray[Any]:
+        unit = 'D' if self.kind == 'date' else self.unit
+        local = self.decode()
+        text: NDArray[Any] = np.datetime_as_string(
+            local, unit=cast(Any, 's' if unit == 'auto' else unit)
+        )
+        if unit == 'auto':
+            whole = local.astype('datetime64[m]') == local
+            # 'YYYY-MM-DDTHH:MM' is the first 16 characters
+            text = np.where(whole, text.astype('U16'), text)
+        if self.offsets is None:
+            return text
+        found, index = np.unique(self.offsets, return_inverse=True)
+        suffixes = np.array(
+            [
+                f'{"-" if o < 0 else "+"}{abs(o) // 60:02d}:{abs(o) % 60:02d}'
+                for o in found.tolist()
+            ]
+        )
+        rendered: NDArray[Any] = np.char.add(text, suffixes[index])
+        return rendered
+
+    def to_list(self) -> List[Any]:
+        """Return the column as Python values, ``None`` where missing.
+
+        Timestamps are rendered back to ISO strings with their original
+        offsets (``Z`` is rendered as ``+00:00``).
+        """
+        if self.kind in ('date', 'datetime'):
+            values = self._render_timestamps().astype(object)
+        else:
+            values = self.decode()
+        if self.mask is not None:
+            values = values.astype(object)
+            values[self.mask] = None
+        return list(values.tolist())
+
+
+class WearableTable:
+    """A column-oriented wearable export.
+
+    Columns are reached by name (``table['heart_rate']``) and
+    :meth:`to_records` gives the row dicts returned by
+    ``WearableDataFileExtractor.extract_wearable_data``.
+    """
+
+    def __init__(self, columns: Iterable[Column]) -> None:
+        """Initialize from columns of equal length."""
+        self.columns: Dict[str, Column] = {c.name: c for c in columns}
+        lengths = {len(c) for c in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('Columns must have the same length')
+        self._rows = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(
+        cls, header: Sequence[str], rows: Iterable[Sequence[str]]
+    ) -> WearableTable:
+        """Build a table from CSV *rows* of string cells under *header*."""
+        data = list(rows)
+        width = len(header)
+        if any(len(row) != width for row in data):
+            data = [(list(row) + [''] * width)[:width] for row in data]
+        cells = list(zip(*data)) if data else [()] * width
+        return cls(
+            Column.from_strings(name, values)
+            for name, values in zip(header, cells)
+        )
+
+    @classmethod
+    def from_csv(cls, text: str) -> WearableTable:
+        """Build a table from the full text of a CSV export.
+
+        Files without quoting (the usual device export) are split with a
+        single ``str.split`` and sliced into columns; anything else goes
+        through :mod:`csv`.
+        """
+        if '"' not in text:
+            lines = [line for line in text.splitlines() if line]
+            header = lines[0].split(',') if lines else []
+            width = len(header)
+            fields = ','.join(lines[1:]).split(',') if len(lines) > 1 else []
+            if width and len(fields) == (len(lines) - 1) * width:
+                return cls(
+                    Column.from_strings(name, fields[i::width])
+                    for i, name in enumerate(header)
+                )
+        reader = csv.reader(io.StringIO(text, newline=''))
+        return cls.from_rows(next(reader, []), reader)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Mapping[str, Any]]
+    ) -> WearableTable:
+        """Build a table from row dicts such as a parsed JSON export."""
+        builder = TableBuilder()
+        builder.add(records)
+        return builder.build()
+
+    @classmethod
+    def from_npz(cls, blob: bytes) -> WearableTable:
+        """Load a table written by :meth:`to_npz`."""
+        with np.load(io.BytesIO(blob), allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            columns = []
+            for i, spec in enumerate(meta['columns']):
+
+                def get(part: str, i: int = i) -> Optional[NDArray[Any]]:
+                    key = f'{i}.{part}'
+                    return arrays[key] if key in arrays.files else None
+
+                values = cast(NDArray[Any], get('values'))
+                categories = get('categories')
+                if spec['kind'] == 'object':
+                    decoded = [json.loads(v) for v in values.tolist()]
+                    values = np.empty(len(decoded), dtype=object)
+                    values[:] = decoded
+                elif spec['kind'] == 'string':
+                    values = values.astype(object)
+                if categories is not None:
+                    categories = categories.astype(object)
+                columns.append(
+                    Column(
+                        spec['name'],
+                        spec['kind'],
+                        values,
+                        mask=get('mask'),
+                        categories=categories,
+                        offsets=get('offsets'),
+                        unit=spec['unit'],
+                    )
+                )
+        return cls(columns)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self._rows
+
+    def __getitem__(self, name: str) -> Column:
+        """Return the column called *name*."""
+        return self.columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether the table has a column called *name*."""
+        return name in self.columns
+
+    @property
+    def names(self) -> List[str]:
+        """Return the column names in file order."""
+        return list(self.columns)
+
+    @property
+    def schema(self) -> Dict[str, ColumnKind]:
+        """Return the inferred type of every column."""
+        return {name: c.kind for name, c in self.columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by all column arrays."""
+        return sum(c.nbytes for c in self.columns.values())
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Return JSON-safe summary statistics for every column."""
+        return {name: c.describe() for name, c in self.columns.items()}
+
+    def to_npz(self) -> bytes:
+        """Serialise the table as a compressed NumPy ``.npz`` archive.
+
+        Only plain arrays are written, so loading never unpickles.
+        """
+        arrays: Dict[str, NDArray[Any]] = {}
+        specs = []
+        for i, column in enumerate(self.columns.values()):
+            values = column.values
+            if column.kind == 'object':
+                values = np.array([json.dumps(v) for v in values.tolist()])
+            elif column.kind == 'string':
+                values = values.astype(str)
+            arrays[f'{i}.values'] = values
+            if column.mask is not None:
+                arrays[f'{i}.mask'] = column.mask
+            if column.categories is not None:
+                arrays[f'{i}.categories'] = column.categories.astype(str)
+            if column.offsets is not None:
+                arrays[f'{i}.offsets'] = column.offsets
+            specs.append(
+                {'name': column.name, 'kind': column.kind, 'unit': column.unit}
+            )
+        arrays['meta'] = np.array(json.dumps({'version': 1, 'columns': specs}))
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Return the rows as dicts, for callers expecting the row API."""
+        names = self.names
+        columns = [self.columns[name].to_list() for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _fill(kind: ColumnKind, values: NDArray[Any], rows: int) -> NDArray[Any]:
+    """Return *rows* missing-value placeholders like *values*."""
+    if kind in ('date', 'datetime'):
+        return np.full(rows, 'NaT', dtype=values.dtype)
+    if kind == 'float':
+        return np.full(rows, np.nan)
+    if kind in ('string', 'object'):
+        return np.full(rows, '' if kind == 'string' else None, dtype=object)
+    return np.zeros(rows, dtype=values.dtype)
+
+
+def _merge_kind(chunks: Sequence[Column]) -> Optional[ColumnKind]:
+    """Return the kind that holds every chunk, ``None`` to re-infer."""
+    kinds = {c.kind for c in chunks}
+    if kinds <= {'int', 'float'}:
+        return 'float' if 'float' in kinds else 'int'
+    if kinds <= {'category', 'string'}:
+        # strings are re-coded onto the labels while they stay few
+        return 'category' if 'category' in kinds else 'string'
+    aware = {c.offsets is not None for c in chunks}
+    if len(kinds) == 1 and len(aware) == 1:
+        return chunks[0].kind
+    return None
+
+
+def _concat(name: str, parts: Sequence[Any]) -> Column:
+    """Join typed chunks and gap lengths (``int``) into one column.
+
+    Chunks of compatible kinds are joined as arrays (``int`` with
+    ``float`` gives ``float``, categories are re-coded onto the union of
+    their labels, taking in the values of string chunks while there are
+    at most ``MAX_CATEGORIES``). Anything else, e.g. dates mixed with
+    strings, is rendered back to values and inferred again.
+    """
+    chunks = [p for p in parts if isinstance(p, Column)]
+    kind = _merge_kind(chunks) if chunks else None
+    labels: Optional[NDArray[Any]] = None
+    if kind == 'category':
+        labels = np.unique(
+            np.concatenate(
+                [
+                    cast(NDArray[Any], c.categories)
+                    if c.kind == 'category'
+                    else c.values
+                    for c in chunks
+                ]
+            )
+        )
+        if len(labels) > MAX_CATEGORIES:
+            kind, labels = 'string', None
+    if kind is None:
+        cells: List[Any] = []
+        for part in parts:
+            cells.extend(
+                part.to_list() if isinstance(part, Column) else [None] * part
+            )
+        return Column.from_values(name, cells)
+
+    def convert(chunk: Column) -> NDArray[Any]:
+        if kind == 'float':
+            values = chunk.values.astype(np.float64)
+            values[~chunk.present()] = np.nan
+            return values
+        if kind == 'string' and chunk.kind == 'category':
+            return chunk.decode().astype(object)
+        if labels is not None and chunk.kind == 'string':
+            return cast(NDArray[Any], np.searchsorted(labels, chunk.values))
+        if labels is not None:
+            found = np.searchsorted(labels, cast(Any, chunk.categories))
+            return cast(NDArray[Any], found[chunk.values])
+        return chunk.values
+
+    template = convert(chunks[0])
+    values, masks, offsets = [], [], []
+    for part in parts:
+        if isinstance(part, Column):
+            values.append(convert(part))
+            masks.append(~part.present())
+            offsets.append(part.offsets)
+        else:
+            values.append(_fill(kind, template, part))
+            masks.append(np.ones(part, dtype=bool))
+            offsets.append(np.zeros(part, dtype=np.int16))
+    mask = np.concatenate(masks)
+    units = {c.unit for c in chunks}
+    if 'us' in units:
+        unit = 'us'
+    else:
+        unit = units.pop() if len(units) == 1 else 'auto'
+    joined = np.concatenate(values)
+    return Column(
+        name,
+        kind,
+        joined if labels is None else _smallest_codes(joined, len(labels)),
+        mask if mask.any() else None,
+        categories=labels,
+        offsets=(
+            None
+            if chunks[0].offsets is None
+            else np.concatenate(cast(List[NDArray[Any]], offsets))
+        ),
+        unit=unit,
+    )
+
+
+class TableBuilder:
+    """Collect row batches column by column into a :class:`WearableTable`.
+
+    Each batch is converted to typed column chunks as it is added, so
+    memory holds NumPy arrays rather than one Python object per cell;
+    :meth:`build` joins the chunks once.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty builder."""
+        # typed chunks per column; an int is a run of rows without it
+        self._parts: Dict[str, List[Any]] = {}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        """Return the number of rows added so far."""
+        return self._rows
+
+    def add(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """Append *records*; keys missing from a row become ``None``."""
+        batch = list(records)
+        if not batch:
+            return
+        names = dict.fromkeys(itertools.chain(self._parts, *batch))
+        for name in names:
+            parts = self._parts.setdefault(
+                name, [self._rows] if self._rows else []
+            )
+            chunk = Column.from_values(name, [r.get(name) for r in batch])
+            if chunk.mask is None or not chunk.mask.all():
+                parts.append(chunk)
+            elif parts and isinstance(parts[-1], int):
+                parts[-1] += len(batch)
+            else:
+                parts.append(len(batch))
+        self._rows += len(batch)
+
+    def build(self) -> WearableTable:
+        """Join the chunks collected for every column."""
+        return WearableTable(
+            _concat(name, parts) for name, parts in self._parts.items()
+        )
+
+
+__all__ = [
+    'Column',
+    'ColumnKind',
+    'TableBuilder',
+    'WearableTable',
+    'infer_kind',
+]
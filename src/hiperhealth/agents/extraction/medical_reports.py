@@ -1,18 +1,37 @@
-"""Module for extracting FHIR data from PDF documents and images."""
+"""Module for extracting FHIR data from PDF documents and images.
+
+Extraction results are cached by the SHA-256 of the file bytes, so a
+re-uploaded report skips OCR and the FHIR conversion. MIME types and
+text live in bounded in-process LRUs; text and FHIR output can also be
+kept in an on-disk SQLite tier (``REPORT_CACHE_PATH``) that survives
+restarts.
+"""
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import io
+import itertools
+import json
+import logging
 import os
+import re
+import threading
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from pathlib import Path
 from typing import (
     IO,
     Any,
+    Callable,
     ClassVar,
     Dict,
     Generic,
+    Iterable,
     List,
     Literal,
     Optional,
@@ -21,16 +40,19 @@ from typing import (
     cast,
 )
 
-import magic
-import pytesseract
-
 from anamnesisai import AnamnesisAI
-from PIL import Image
-from pypdf import PdfReader
-from pypdf.errors import EmptyFileError, PdfStreamError
-
+from pypdf.errors import PdfReadError
+
+from hiperhealth.agents.cache import MemoryCache, SQLiteCache
+from hiperhealth.agents.client import get_settings
+from hiperhealth.agents.extraction.mime import detect_mime
+from hiperhealth.agents.extraction.ocr import OCRConfig, ocr_bytes
+from hiperhealth.agents.extraction.pdf import extract_pdf_pages
+from hiperhealth.agents.extraction.pool import default_workers, run_in_pool
 from hiperhealth.utils import make_json_serializable
 
+logger = logging.getLogger(__name__)
+
 
 # Exceptions
 class MedicalReportExtractorError(Exception):
@@ -61,6 +83,178 @@ FileExtension = Literal['pdf', 'png', 'jpg', 'jpeg']
 MimeType = Literal['application/pdf', 'image/png', 'image/jpeg']
 
 
+def _sha256(stream: IO[bytes]) -> str:
+    """Return the hex SHA-256 of the rest of *stream*."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+PAGE_BREAK = '\n\f\n'
+
+# section headings: short upper-case lines or lines ending with a colon
+_HEADING = re.compile(
+    r'^(?:[A-Z][A-Z0-9 /&(),.\-]{2,60}|[^\n:]{1,60}:)[ \t]*$', re.MULTILINE
+)
+
+
+def _split_at(text: str, pattern: re.Pattern[str]) -> List[str]:
+    """Split *text* before every match of *pattern*."""
+    starts = [m.start() for m in pattern.finditer(text) if m.start() > 0]
+    bounds = [0, *starts, len(text)]
+    return [text[a:b] for a, b in itertools.pairwise(bounds) if text[a:b]]
+
+
+def _units(text: str, max_chars: int) -> List[str]:
+    """Break *text* into pieces of at most *max_chars* characters.
+
+    Page breaks are preferred, then section headings, then blank lines,
+    then line breaks; only a single over-long line is cut mid-text.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    for split in (
+        lambda t: t.split('\f'),
+        lambda t: _split_at(t, _HEADING),
+        lambda t: re.split(r'\n[ \t]*\n', t),
+        lambda t: t.split('\n'),
+    ):
+        pieces = [p for p in split(text) if p.strip()]
+        if len(pieces) > 1:
+            return [u for piece in pieces for u in _units(piece, max_chars)]
+    return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def split_report_text(text: str, max_chars: int = 12_000) -> List[str]:
+    """Split report *text* into chunks of at most *max_chars* characters.
+
+    Chunks end on page or section boundaries whenever possible and are
+    packed greedily from the start, so appending pages to a report leaves
+    the earlier chunks, and their cache entries, unchanged.
+    """
+    chunks: List[str] = []
+    current = ''
+    for unit in _units(text, max_chars):
+        unit = unit.strip()
+        if not unit:
+            continue
+        if current and len(current) + 1 + len(unit) > max_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current = f'{current}\n{unit}' if current else unit
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+def _identity(resource: Any) -> str:
+    """Return a canonical form of *resource* ignoring generated ids."""
+    if isinstance(resource, dict):
+        resource = {
+            k: v for k, v in resource.items() if k not in ('id', 'meta')
+        }
+    return json.dumps(resource, sort_keys=True, default=str)
+
+
+def merge_fhir(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-chunk FHIR output, dropping duplicate resources.
+
+    A resource type found once keeps the single-resource shape of
+    unchunked output; several distinct resources become a list.
+    """
+    merged: Dict[str, List[Any]] = {}
+    seen = set()
+    for part in parts:
+        for name, value in part.items():
+            for resource in value if isinstance(value, list) else [value]:
+                key = (name, _identity(resource))
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.setdefault(name, []).append(resource)
+    return {
+        name: items[0] if len(items) == 1 else items
+        for name, items in merged.items()
+    }
+
+
+_anamnesis: Dict[str, AnamnesisAI] = {}
+_anamnesis_lock = threading.Lock()
+
+
+def get_anamnesis(api_key: str) -> AnamnesisAI:
+    """Return the shared ``AnamnesisAI`` instance for *api_key*."""
+    digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _anamnesis_lock:
+        anaai = _anamnesis.get(digest)
+        if anaai is None:
+            anaai = AnamnesisAI(backend='openai', api_key=api_key)
+            _anamnesis[digest] = anaai
+        return anaai
+
+
+class ExtractionCache:
+    """Bounded in-memory LRU with an optional on-disk tier.
+
+    Values found on disk are promoted to memory. The disk tier holds
+    extracted report text, so it must live on storage fit for patient
+    data.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """Keep *maxsize* entries in memory and, with *path*, on disk."""
+        self.memory = MemoryCache(maxsize=maxsize)
+        self.disk = SQLiteCache(path) if path else None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for *key* from memory or disk."""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str, persist: bool = True) -> None:
+        """Store *value*; *persist* also writes it to the disk tier."""
+        self.memory.set(key, value)
+        if persist and self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+@dataclass
+class ReportResult:
+    """Outcome of extracting one file in :meth:`extract_many`."""
+
+    source: Any
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True when FHIR data was extracted."""
+        return self.error is None and self.data is not None
+
+    @property
+    def name(self) -> str:
+        """Return a printable name for the source."""
+        if isinstance(self.source, (str, Path)):
+            return str(self.source)
+        return str(getattr(self.source, 'name', None) or '<stream>')
+
+
 class BaseMedicalReportExtractor(ABC, Generic[T]):
     """Base class for medical report extraction."""
 
@@ -84,11 +278,56 @@ class MedicalReportFileExtractor(BaseMedicalReportExtractor[FileInput]):
         'jpeg': 'image/jpeg',
     }
 
-    def __init__(self) -> None:
-        """Initialize extractor with caches and mimetype detector."""
-        self._mimetype_cache: Dict[str, MimeType] = {}
-        self._text_cache: Dict[str, str] = {}
-        self.mime = magic.Magic(mime=True)
+    def __init__(
+        self,
+        cache_size: int = 256,
+        cache_path: Optional[Union[str, Path]] = None,
+        pdf_workers: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        ocr_fallback: bool = True,
+        ocr_workers: Optional[int] = None,
+        ocr_config: Optional[OCRConfig] = None,
+        chunk_chars: int = 12_000,
+        chunk_workers: int = 4,
+    ) -> None:
+        """Initialize extractor with its caches.
+
+        Parameters
+        ----------
+        cache_size : int
+            Entries kept in memory for file digests, MIME types, text and
+            FHIR output.
+        cache_path : str or Path, optional
+            SQLite file persisting extracted text and FHIR output.
+        pdf_workers : int, optional
+            Processes extracting PDF pages in parallel; ``1`` disables the
+            pool.
+        max_pages : int, optional
+            Only the first *max_pages* pages of a PDF are extracted.
+        ocr_fallback : bool
+            OCR the images of PDF pages without a text layer.
+        ocr_workers : int, optional
+            Processes running OCR for image reports; ``1`` runs it in the
+            calling thread.
+        ocr_config : OCRConfig, optional
+            Image preprocessing and Tesseract options.
+        chunk_chars : int
+            Longer report text is split on page or section boundaries into
+            chunks of at most this many characters, converted
+            concurrently and merged; ``0`` sends the whole text at once.
+        chunk_workers : int
+            Chunks of one report converted concurrently.
+        """
+        self._cache = ExtractionCache(cache_size, cache_path)
+        # path digests are reused while the file is unchanged
+        self._digest_cache = MemoryCache(maxsize=cache_size)
+        self.pdf_workers = pdf_workers
+        self.max_pages = max_pages
+        self.ocr_fallback = ocr_fallback
+        self.ocr_workers = ocr_workers
+        self.ocr_config = ocr_config or OCRConfig()
+        self.chunk_chars = chunk_chars
+        self.chunk_workers = chunk_workers
 
     @property
     def allowed_extensions(self) -> List[FileExtension]:
@@ -104,11 +343,113 @@ class MedicalReportFileExtractor(BaseMedicalReportExtractor[FileInput]):
         self, source: FileInput, api_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Validate and process input to extract FHIR-compliant report data."""
-        self._validate_or_raise(source)
-        return self._process_file(source, api_key)
-
-    def _validate_or_raise(self, source: FileInput) -> None:
-        """Check existence, type support, and non-empty streams."""
+        digest, cached, text = self._prepare(source)
+        if cached is not None:
+            return cached
+        return self._convert_and_store(digest, text, api_key)
+
+    def extract_many(
+        self,
+        sources: Iterable[FileInput],
+        api_key: Optional[str] = None,
+        max_workers: int = 4,
+        text_workers: Optional[int] = None,
+        progress: Optional[Callable[[ReportResult], None]] = None,
+    ) -> List[ReportResult]:
+        """Extract FHIR data from many files concurrently.
+
+        Validation and text extraction (MIME sniffing, PDF parsing, OCR)
+        run on *text_workers* threads; every file whose text is ready is
+        handed to one of *max_workers* threads for the FHIR conversion, so
+        both stages overlap. A failing file is reported in its
+        :class:`ReportResult` and never stops the batch.
+
+        Parameters
+        ----------
+        sources : iterable of FileInput
+            Paths or binary streams.
+        api_key : str, optional
+            OpenAI key for the FHIR conversion.
+        max_workers : int
+            Concurrent FHIR conversions (LLM calls).
+        text_workers : int, optional
+            Concurrent text extractions; defaults to the number of
+            extraction worker processes.
+        progress : callable, optional
+            Called with each finished result, in completion order.
+
+        Returns
+        -------
+        list of ReportResult
+            One result per source, in input order.
+        """
+        results = [ReportResult(source=source) for source in sources]
+
+        def _finish(result: ReportResult) -> None:
+            if not result.ok:
+                logger.warning(
+                    'Report %s failed: %s', result.name, result.error
+                )
+            if progress is not None:
+                progress(result)
+
+        with (
+            ThreadPoolExecutor(
+                text_workers or default_workers(),
+                thread_name_prefix='report-text',
+            ) as text_pool,
+            ThreadPoolExecutor(
+                max_workers, thread_name_prefix='report-fhir'
+            ) as fhir_pool,
+        ):
+            texts: Dict[Future[Any], ReportResult] = {
+                text_pool.submit(self._prepare, r.source): r for r in results
+            }
+            conversions: Dict[Future[Any], ReportResult] = {}
+            for future in as_completed(texts):
+                result = texts[future]
+                try:
+                    digest, cached, text = future.result()
+                except Exception as exc:
+                    result.error = exc
+                    _finish(result)
+                    continue
+                if cached is not None:
+                    result.data = cached
+                    _finish(result)
+                    continue
+                conversion = fhir_pool.submit(
+                    self._convert_and_store, digest, text, api_key
+                )
+                conversions[conversion] = result
+            for future in as_completed(conversions):
+                result = conversions[future]
+                try:
+                    result.data = future.result()
+                except Exception as exc:
+                    result.error = exc
+                _finish(result)
+        return results
+
+    def _prepare(
+        self, source: FileInput
+    ) -> tuple[str, Optional[Dict[str, Any]], str]:
+        """Validate *source*; return its digest, cached FHIR or its text.
+
+        The content is hashed once here and the digest reused as the key
+        of every cache the file goes through.
+        """
+        digest = self._validate_or_raise(source)
+        cached = self._cached_fhir(digest)
+        if cached is not None:
+            return digest, cached, ''
+        return digest, None, self._extract_text(source, digest)
+
+    def _validate_or_raise(self, source: FileInput) -> str:
+        """Check existence, type support, and non-empty streams.
+
+        Returns the content digest computed for the MIME lookup.
+        """
         if isinstance(source, io.BytesIO):
             data = source.read(10)
             source.seek(0)
@@ -118,88 +459,135 @@ class MedicalReportFileExtractor(BaseMedicalReportExtractor[FileInput]):
             if not Path(source).exists():
                 raise FileNotFoundError(f'File not found: {source}')
 
-        mime = self._get_mime_type(source)
+        digest = self._get_cache_key(source)
+        mime = self._get_mime_type(source, digest)
         if mime not in self.allowed_mimetypes:
             raise MedicalReportExtractorError(f'Unsupported MIME type: {mime}')
+        return digest
 
-    def _process_file(
-        self, source: FileInput, api_key: Optional[str] = None
+    def _cached_fhir(self, digest: str) -> Optional[Dict[str, Any]]:
+        cached = self._cache.get(f'fhir:{digest}')
+        if cached is None:
+            return None
+        result: Dict[str, Any] = json.loads(cached)
+        return result
+
+    def _convert_and_store(
+        self, digest: str, text: str, api_key: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Extract text and convert to FHIR."""
-        text = self._extract_text(source)
-        return self._convert_to_fhir(text, api_key)
+        """Convert *text* to FHIR and cache it under the file *digest*."""
+        fhir = self._convert_to_fhir(text, api_key)
+        self._cache.set(f'fhir:{digest}', json.dumps(fhir))
+        return fhir
 
     def _get_cache_key(self, source: FileInput) -> str:
-        """Return cache key for the source object."""
-        if isinstance(source, (Path, str)):
-            return str(Path(source).resolve())
-        return str(id(source))
-
-    def _get_mime_type(self, source: FileInput) -> MimeType:
-        """Detect MIME type and cache for the source."""
-        key = self._get_cache_key(source)
-        if key in self._mimetype_cache:
-            return self._mimetype_cache[key]
+        """Return the SHA-256 of the source bytes.
 
+        Streams are hashed and rewound; file digests are remembered per
+        path, size and modification time.
+        """
         if isinstance(source, (Path, str)):
-            mime = self.mime.from_file(str(source))
-        else:
-            head = source.read(2048)
-            source.seek(0)
-            mime = self.mime.from_buffer(head)
-
+            path = Path(source).resolve()
+            stat = path.stat()
+            stamp = f'{path}:{stat.st_size}:{stat.st_mtime_ns}'
+            digest = self._digest_cache.get(stamp)
+            if digest is None:
+                with path.open('rb') as f:
+                    digest = _sha256(f)
+                self._digest_cache.set(stamp, digest)
+            return digest
+        position = source.tell()
+        digest = _sha256(source)
+        source.seek(position)
+        return digest
+
+    def _get_mime_type(
+        self, source: FileInput, digest: Optional[str] = None
+    ) -> MimeType:
+        """Detect MIME type and cache it by content *digest*."""
+        key = f'mime:{digest or self._get_cache_key(source)}'
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cast(MimeType, cached)
+
+        mime = detect_mime(source)
         # Cast mime string to Literal MIME type for type safety
         mime_literal = cast(MimeType, mime)
-        self._mimetype_cache[key] = mime_literal
+        self._cache.set(key, mime_literal, persist=False)
         return mime_literal
 
-    def _extract_text(self, source: FileInput) -> str:
+    def _extract_text(
+        self, source: FileInput, digest: Optional[str] = None
+    ) -> str:
         """Extract cached raw text from source."""
-        key = self._get_cache_key(source)
-        if key in self._text_cache:
-            return self._text_cache[key]
+        digest = digest or self._get_cache_key(source)
+        key = f'text:{digest}'
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
 
-        mime = self._get_mime_type(source)
+        mime = self._get_mime_type(source, digest)
         if mime == 'application/pdf':
             text = self._extract_text_from_pdf(source)
         else:
             text = self._extract_text_from_image(source)
 
-        self._text_cache[key] = text
+        self._cache.set(key, text)
         return text
 
+    @staticmethod
+    def _read_bytes(source: FileInput) -> bytes:
+        """Return the content of *source*, rewinding streams."""
+        if isinstance(source, (str, Path)):
+            return Path(source).read_bytes()
+        data = source.read()
+        source.seek(0)
+        return data
+
     def _extract_text_from_pdf(self, pdf_source: FileInput) -> str:
-        """Extract text content from a PDF file or in-memory stream."""
+        """Extract text content from a PDF file or in-memory stream.
+
+        Pages are extracted in parallel and scanned pages are OCR'd, see
+        :func:`~hiperhealth.agents.extraction.pdf.extract_pdf_pages`.
+        """
+        data = self._read_bytes(pdf_source)
         try:
-            if isinstance(pdf_source, io.BytesIO):
-                data = pdf_source.read()
-                pdf_source.seek(0)
-                reader = PdfReader(io.BytesIO(data))
-            else:
-                reader = PdfReader(pdf_source)
-        except (PdfStreamError, EmptyFileError) as e:
+            pages = extract_pdf_pages(
+                data,
+                max_workers=self.pdf_workers,
+                max_pages=self.max_pages,
+                ocr=self.ocr_fallback,
+                ocr_config=self.ocr_config,
+            )
+        except PdfReadError as e:
             raise TextExtractionError(f'Failed to parse PDF: {e}') from e
+        except BrokenProcessPool as e:
+            raise TextExtractionError(f'PDF extraction crashed: {e}') from e
 
-        text_pages: List[str] = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_pages.append(page_text)
-
+        text_pages = [page for page in pages if page]
         if not text_pages:
             raise TextExtractionError('No extractable text in PDF')
 
-        return '\n'.join(text_pages)
+        return PAGE_BREAK.join(text_pages)
 
     def _extract_text_from_image(self, img_source: FileInput) -> str:
-        """Extract text from images using OCR."""
-        if isinstance(img_source, (str, Path)):
-            img = Image.open(img_source)
+        """Extract text from images using OCR.
+
+        The image is preprocessed (see
+        :func:`~hiperhealth.agents.extraction.ocr.preprocess`) and, with
+        more than one OCR worker, recognised in the shared process pool.
+        """
+        data = self._read_bytes(img_source)
+        workers = self.ocr_workers or default_workers()
+        if workers > 1:
+            try:
+                (text,) = run_in_pool(
+                    workers, ocr_bytes, [(data, self.ocr_config)]
+                )
+            except BrokenProcessPool as e:
+                raise TextExtractionError(f'Image OCR crashed: {e}') from e
         else:
-            data = io.BytesIO(img_source.read())
-            img = Image.open(data)
-
-        text: str = pytesseract.image_to_string(img)
+            text = ocr_bytes(data, self.ocr_config)
         if not text.strip():
             raise TextExtractionError('No extractable text in image')
         return text
@@ -208,18 +596,76 @@ class MedicalReportFileExtractor(BaseMedicalReportExtractor[FileInput]):
         self, text_content: str, api_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Convert extracted text to FHIR resources using Anamnesisai."""
-        key = api_key or os.environ.get('OPENAI_API_KEY')
+        key = (
+            api_key
+            or os.environ.get('OPENAI_API_KEY')
+            or get_settings().api_key
+        )
         if not key:
             raise EnvironmentError('Missing OpenAI API key')
 
-        anaai = AnamnesisAI(backend='openai', api_key=key)
-        resources = anaai.extract_fhir(text_content)
+        chunks = (
+            split_report_text(text_content, self.chunk_chars)
+            if self.chunk_chars
+            else [text_content]
+        )
+        if len(chunks) == 1:
+            return self._convert_chunk(chunks[0], key)
+        workers = min(self.chunk_workers, len(chunks))
+        with ThreadPoolExecutor(
+            workers, thread_name_prefix='report-chunk'
+        ) as pool:
+            parts = list(
+                pool.map(lambda chunk: self._convert_chunk(chunk, key), chunks)
+            )
+        return merge_fhir(parts)
+
+    def _convert_chunk(self, text: str, api_key: str) -> Dict[str, Any]:
+        """Convert one chunk of text, cached by the hash of the chunk."""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        cache_key = f'chunk:{digest}'
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            hit: Dict[str, Any] = json.loads(cached)
+            return hit
+        resources = get_anamnesis(api_key).extract_fhir(text)
         result: Dict[str, Any] = make_json_serializable(
             {res.__class__.__name__: res.model_dump() for res in resources[0]}
         )
+        self._cache.set(cache_key, json.dumps(result))
         return result
 
 
+@functools.lru_cache(maxsize=1)
 def get_medical_report_extractor() -> MedicalReportFileExtractor:
-    """Create and return an instance of MedicalReportFileExtractor."""
-    return MedicalReportFileExtractor()
+    """Return the process-wide MedicalReportFileExtractor.
+
+    The extractor is thread-safe and built once, so its caches are shared
+    by every request; call ``get_medical_report_extractor.cache_clear()``
+    to pick up changed settings.
+
+    ``REPORT_CACHE_SIZE`` bounds the in-memory caches,
+    ``REPORT_CACHE_PATH`` enables the on-disk tier, and
+    ``REPORT_PDF_WORKERS`` / ``REPORT_MAX_PAGES`` tune PDF extraction,
+    ``REPORT_OCR_WORKERS``, ``REPORT_OCR_LANG`` and
+    ``REPORT_OCR_BINARIZE`` tune OCR, and ``REPORT_CHUNK_CHARS`` sets the
+    chunk size of the FHIR conversion.
+    """
+
+    def _int(name: str) -> Optional[int]:
+        value = os.environ.get(name)
+        return int(value) if value else None
+
+    return MedicalReportFileExtractor(
+        cache_size=int(os.environ.get('REPORT_CACHE_SIZE', '256')),
+        cache_path=os.environ.get('REPORT_CACHE_PATH') or None,
+        pdf_workers=_int('REPORT_PDF_WORKERS'),
+        max_pages=_int('REPORT_MAX_PAGES'),
+        ocr_workers=_int('REPORT_OCR_WORKERS'),
+        chunk_chars=int(os.environ.get('REPORT_CHUNK_CHARS', '12000')),
+        ocr_config=OCRConfig(
+            lang=os.environ.get('REPORT_OCR_LANG', 'eng'),
+            binarize=os.environ.get('REPORT_OCR_BINARIZE', '').lower()
+            in ('1', 'true', 'yes'),
+        ),
+    )
@@ -0,0 +1,109 @@
+"""Process-wide MIME type detection for uploaded files.
+
+Loading the libmagic database takes milliseconds, so one handle is opened
+lazily per process and shared by every extractor. A libmagic handle is
+not thread-safe, hence the lock around it. The binary formats we accept
+(PDF, PNG, JPEG) are recognised from their leading bytes without touching
+libmagic at all; text formats such as JSON and CSV still need its content
+analysis.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+
+from pathlib import Path
+from typing import IO, Optional, Tuple, Union
+
+import magic
+
+# bytes read from a stream for detection
+HEAD_BYTES = 2048
+
+SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+)
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """Return the MIME type of a known file signature in *head*, if any."""
+    for signature, mime in SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    return None
+
+
+class MimeDetector:
+    """Thread-safe MIME detector sharing one lazily loaded libmagic handle."""
+
+    def __init__(self) -> None:
+        """Initialize without loading the libmagic database."""
+        self._magic: Optional[magic.Magic] = None
+        self._lock = threading.Lock()
+        # number of lookups that needed libmagic
+        self.magic_calls = 0
+
+    def _libmagic(self) -> magic.Magic:
+        # callers hold self._lock
+        if self._magic is None:
+            self._magic = magic.Magic(mime=True)
+        self.magic_calls += 1
+        return self._magic
+
+    def from_buffer(self, head: bytes) -> str:
+        """Return the MIME type of the leading bytes *head*."""
+        mime = sniff(head)
+        if mime is not None:
+            return mime
+        with self._lock:
+            return str(self._libmagic().from_buffer(head))
+
+    def from_file(self, path: Union[str, Path]) -> str:
+        """Return the MIME type of the file at *path*.
+
+        libmagic reads the file itself when the header is not enough, so
+        whole-document checks (e.g. JSON validity) still apply.
+        """
+        with open(path, 'rb') as f:
+            mime = sniff(f.read(HEAD_BYTES))
+        if mime is not None:
+            return mime
+        with self._lock:
+            return str(self._libmagic().from_file(os.fspath(path)))
+
+    def from_stream(self, stream: IO[bytes]) -> str:
+        """Return the MIME type of *stream*, restoring its position."""
+        position = stream.tell()
+        head = stream.read(HEAD_BYTES)
+        stream.seek(position)
+        return self.from_buffer(head)
+
+    def detect(self, source: Union[str, Path, IO[bytes]]) -> str:
+        """Return the MIME type of a path or a binary stream."""
+        if isinstance(source, (str, Path)):
+            return self.from_file(source)
+        return self.from_stream(source)
+
+
+@functools.lru_cache(maxsize=1)
+def get_mime_detector() -> MimeDetector:
+    """Return the detector shared by the whole process."""
+    return MimeDetector()
+
+
+def detect_mime(source: Union[str, Path, IO[bytes]]) -> str:
+    """Return the MIME type of *source* using the shared detector."""
+    return get_mime_detector().detect(source)
+
+
+__all__ = [
+    'HEAD_BYTES',
+    'MimeDetector',
+    'detect_mime',
+    'get_mime_detector',
+    'sniff',
+]
@@ -0,0 +1,154 @@
+"""OCR with image preprocessing for scanned and photographed reports.
+
+Tesseract is fastest and most accurate on upright, grayscale text scanned
+at roughly 300 DPI. Phone photos are usually rotated through EXIF tags,
+in colour and far larger than that, so every image goes through
+:func:`preprocess` before OCR:
+
+1. rotate according to the EXIF orientation;
+2. flatten transparency onto white and convert to grayscale;
+3. downscale to ``target_dpi`` (or to ``max_side`` pixels when the image
+   carries no DPI information);
+4. optionally binarise with an Otsu threshold.
+
+:func:`ocr_bytes` is the entry point for worker processes.
+"""
+
+from __future__ import annotations
+
+import functools
+import io
+import logging
+
+from dataclasses import dataclass
+from typing import Optional
+
+import pytesseract
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OCRConfig:
+    """Preprocessing and Tesseract options.
+
+    Parameters
+    ----------
+    target_dpi : int
+        Resolution images are downscaled to when they declare a higher one.
+    max_side : int
+        Longest side, in pixels, of images without DPI information (A4 at
+        300 DPI by default).
+    binarize : bool
+        Threshold the grayscale image before OCR.
+    lang : str
+        Tesseract language(s), e.g. ``'eng+por'``.
+    psm : int
+        Tesseract page segmentation mode.
+    """
+
+    target_dpi: int = 300
+    max_side: int = 3508
+    binarize: bool = False
+    lang: str = 'eng'
+    psm: int = 3
+
+    @property
+    def tesseract_args(self) -> str:
+        """Return the command-line options passed to Tesseract."""
+        return f'--psm {self.psm}'
+
+
+def _scale(image: Image.Image, config: OCRConfig) -> float:
+    dpi = image.info.get('dpi')
+    if dpi and dpi[0] and float(dpi[0]) > config.target_dpi:
+        return config.target_dpi / float(dpi[0])
+    longest = max(image.size)
+    if not dpi and longest > config.max_side:
+        return config.max_side / longest
+    return 1.0
+
+
+def otsu_threshold(image: Image.Image) -> int:
+    """Return the Otsu threshold of grayscale *image*."""
+    histogram = image.histogram()[:256]
+    total = sum(histogram)
+    weighted = sum(i * count for i, count in enumerate(histogram))
+    background = 0
+    background_sum = 0.0
+    best, threshold = -1.0, 127
+    for level, count in enumerate(histogram):
+        background += count
+        if not background or background == total:
+            continue
+        background_sum += level * count
+        mean_bg = background_sum / background
+        mean_fg = (weighted - background_sum) / (total - background)
+        between = background * (total - background) * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, level
+    return threshold
+
+
+def preprocess(
+    image: Image.Image, config: Optional[OCRConfig] = None
+) -> Image.Image:
+    """Return *image* prepared for OCR according to *config*."""
+    config = config or OCRConfig()
+    dpi = image.info.get('dpi')
+    image = ImageOps.exif_transpose(image) or image
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        rgba = image.convert('RGBA')
+        canvas = Image.new('RGBA', rgba.size, 'white')
+        image = Image.alpha_composite(canvas, rgba)
+    gray = image.convert('L')
+    if dpi:
+        gray.info['dpi'] = dpi
+    scale = _scale(gray, config)
+    if scale < 1.0:
+        size = (
+            max(1, round(gray.width * scale)),
+            max(1, round(gray.height * scale)),
+        )
+        gray = gray.resize(size, Image.Resampling.LANCZOS)
+    if config.binarize:
+        cutoff = otsu_threshold(gray)
+        gray = gray.point(lambda v: 255 if v > cutoff else 0)
+    return gray
+
+
+@functools.lru_cache(maxsize=1)
+def _warm_up() -> str:
+    """Resolve the Tesseract binary once per process."""
+    version = str(pytesseract.get_tesseract_version())
+    logger.debug('Using Tesseract %s', version)
+    return version
+
+
+def ocr_image(image: Image.Image, config: Optional[OCRConfig] = None) -> str:
+    """Preprocess *image* and return the text Tesseract finds in it."""
+    config = config or OCRConfig()
+    _warm_up()
+    text: str = pytesseract.image_to_string(
+        preprocess(image, config),
+        lang=config.lang,
+        config=config.tesseract_args,
+    )
+    return text
+
+
+def ocr_bytes(data: bytes, config: Optional[OCRConfig] = None) -> str:
+    """OCR the encoded image in *data*; picklable for worker processes."""
+    with Image.open(io.BytesIO(data)) as image:
+        return ocr_image(image, config)
+
+
+__all__ = [
+    'OCRConfig',
+    'ocr_bytes',
+    'ocr_image',
+    'otsu_threshold',
+    'preprocess',
+]
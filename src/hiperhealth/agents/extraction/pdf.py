@@ -0,0 +1,140 @@
+"""Page-parallel text extraction for PDF reports.
+
+Pages are split into contiguous ranges that worker processes extract
+independently, so a long discharge summary uses every core. A page whose
+text layer is empty is treated as scanned: the images embedded in it are
+preprocessed and OCR'd instead (see :mod:`hiperhealth.agents.extraction.
+ocr`).
+
+This module only depends on pypdf, Pillow and pytesseract so that worker
+processes start quickly.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+
+from typing import List, Optional, Tuple
+
+import pytesseract
+
+from pypdf import PageObject, PdfReader
+
+from hiperhealth.agents.extraction.ocr import OCRConfig, ocr_image
+from hiperhealth.agents.extraction.pool import default_workers, run_in_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _ocr_page(page: PageObject, config: Optional[OCRConfig]) -> str:
+    """OCR the images embedded in a scanned *page*."""
+    texts: List[str] = []
+    for image in page.images:
+        if image.image is None:
+            continue
+        try:
+            text = ocr_image(image.image, config)
+        except (pytesseract.TesseractError, OSError, ValueError) as exc:
+            # includes a missing tesseract binary
+            logger.warning('OCR failed on %s: %s', image.name, exc)
+            continue
+        if text.strip():
+            texts.append(text.strip())
+    return '\n'.join(texts)
+
+
+def _page_text(
+    page: PageObject, ocr: bool, config: Optional[OCRConfig]
+) -> str:
+    text = page.extract_text() or ''
+    if not text.strip() and ocr:
+        text = _ocr_page(page, config)
+    return text
+
+
+def extract_page_range(
+    data: bytes,
+    start: int,
+    stop: int,
+    ocr: bool = True,
+    ocr_config: Optional[OCRConfig] = None,
+) -> List[str]:
+    """Return the text of pages ``start``..``stop - 1`` of PDF *data*.
+
+    Runs in worker processes, hence the plain bytes argument.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    return [
+        _page_text(reader.pages[i], ocr, ocr_config)
+        for i in range(start, stop)
+    ]
+
+
+def _ranges(pages: int, parts: int) -> List[Tuple[int, int]]:
+    """Split ``range(pages)`` into at most *parts* contiguous ranges."""
+    parts = max(1, min(parts, pages))
+    size, extra = divmod(pages, parts)
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (i < extra)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def extract_pdf_pages(
+    data: bytes,
+    *,
+    max_workers: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    ocr: bool = True,
+    ocr_config: Optional[OCRConfig] = None,
+) -> List[str]:
+    """Return the text of every page of the PDF in *data*.
+
+    Parameters
+    ----------
+    data : bytes
+        The PDF file.
+    max_workers : int, optional
+        Worker processes; ``1`` extracts in the calling process. Defaults
+        to :func:`default_workers`.
+    max_pages : int, optional
+        Only the first *max_pages* pages are extracted.
+    ocr : bool
+        OCR the images of pages without a text layer.
+    ocr_config : OCRConfig, optional
+        Preprocessing and Tesseract options for those pages.
+
+    A pool broken by a crashed worker is replaced and the pages retried
+    once, see :func:`~hiperhealth.agents.extraction.pool.run_in_pool`.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    pages = len(reader.pages)
+    if max_pages is not None and pages > max_pages:
+        logger.warning(
+            'PDF has %d pages; only the first %d are extracted',
+            pages,
+            max_pages,
+        )
+        pages = max_pages
+    workers = max_workers or default_workers()
+    if workers <= 1 or pages <= 1:
+        return [
+            _page_text(reader.pages[i], ocr, ocr_config) for i in range(pages)
+        ]
+
+    ranges = run_in_pool(
+        workers,
+        extract_page_range,
+        [
+            (data, start, stop, ocr, ocr_config)
+            for start, stop in _ranges(pages, workers)
+        ],
+    )
+    return [text for texts in ranges for text in texts]
+
+
+__all__ = ['extract_page_range', 'extract_pdf_pages']
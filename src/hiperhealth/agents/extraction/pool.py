@@ -0,0 +1,99 @@
+"""Shared process pools for CPU-bound report extraction."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """Return the default number of extraction worker processes."""
+    return min(4, os.cpu_count() or 1)
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared pool with *workers* processes."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: forking a threaded web server is unsafe
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _pools[workers] = pool
+        return pool
+
+
+def discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop sharing *pool* and shut it down.
+
+    Only this exact pool is evicted, so a replacement another thread
+    already started is kept.
+    """
+    with _pools_lock:
+        for workers, shared in list(_pools.items()):
+            if shared is pool:
+                del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_pool(
+    workers: int, fn: Callable[..., T], calls: Sequence[Tuple[Any, ...]]
+) -> List[T]:
+    """Return ``fn(*args)`` for every *args* in *calls*, in order.
+
+    A worker that dies (a crash or an OOM kill) breaks its whole pool.
+    The broken pool is discarded and the calls are retried once in a
+    fresh one; if that breaks too, it is discarded as well and
+    ``BrokenProcessPool`` is raised.
+    """
+
+    def run(pool: ProcessPoolExecutor) -> List[T]:
+        futures = [pool.submit(fn, *args) for args in calls]
+        return [future.result() for future in futures]
+
+    pool = get_process_pool(workers)
+    try:
+        return run(pool)
+    except BrokenProcessPool as exc:
+        discard_pool(pool)
+        logger.warning('Extraction pool broke, retrying: %s', exc)
+    pool = get_process_pool(workers)
+    try:
+        return run(pool)
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    """Stop every pool started by :func:`get_process_pool`."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+__all__ = [
+    'default_workers',
+    'discard_pool',
+    'get_process_pool',
+    'run_in_pool',
+    'shutdown_pools',
+]
@@ -0,0 +1,377 @@
+"""Hourly and daily rollups of wearable series.
+
+Rows are bucketed into local-time windows and every numeric column is
+reduced per window (count, min, max, mean and percentiles) with sorted
+NumPy arrays, so the cost is a couple of sorts per column however many
+windows there are. Sleep-stage durations are summed per window instead.
+
+Local time comes from the ``timezone`` column when the export has one,
+holding fixed offsets (``-03:00``, ``UTC+5``) or IANA names
+(``America/Sao_Paulo``), falling back to the offset written in each
+timestamp. Naive timestamps are taken as local wall-clock time.
+"""
+
+from __future__ import annotations
+
+import re
+
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from numpy.typing import NDArray
+
+from hiperhealth.agents.extraction.columnar import Column, WearableTable
+
+Frequency = Literal['hour', 'day']
+
+FREQUENCIES: Tuple[Frequency, ...] = ('hour', 'day')
+DEFAULT_PERCENTILES: Tuple[float, ...] = (10, 50, 90)
+# preferred names for the time axis, before any other timestamp column
+TIME_COLUMNS = ('timestamp', 'time', 'datetime', 'start_time', 'date')
+TIMEZONE_COLUMN = 'timezone'
+
+_UNITS: Dict[Frequency, str] = {'hour': 'h', 'day': 'D'}
+_RENDER_UNITS: Dict[Frequency, str] = {'hour': 'm', 'day': 'D'}
+_FIXED_OFFSET = re.compile(
+    r'^(?:UTC|GMT)?\s*(?P<sign>[+-])(?P<hours>\d{1,2})'
+    r'(?::?(?P<minutes>\d{2}))?$'
+)
+_UTC_NAMES = {'z', 'utc', 'gmt'}
+# wide exports: sleep_deep_duration, sleep_rem_duration, ...
+_SLEEP_STAGE = re.compile(r'^sleep_(?P<stage>[a-z]+)_duration$')
+# long exports: one row per stage segment
+_STAGE_COLUMNS = ('sleep_stage', 'stage')
+_DURATION_COLUMNS = ('duration', 'sleep_duration')
+
+
+def find_time_column(table: WearableTable) -> Optional[str]:
+    """Return the column used as the time axis, or None if there is none.
+
+    A timestamp column with a conventional name wins, then the first
+    timestamp column in file order.
+    """
+    timed = [
+        name
+        for name in table.names
+        if table[name].kind in ('datetime', 'date')
+    ]
+    for name in TIME_COLUMNS:
+        if name in timed:
+            return name
+    return timed[0] if timed else None
+
+
+def _fixed_offset(label: str) -> Optional[int]:
+    """Return the offset in minutes of a fixed-offset zone label."""
+    if label.lower() in _UTC_NAMES:
+        return 0
+    match = _FIXED_OFFSET.match(label)
+    if match is None:
+        return None
+    minutes = int(match['hours']) * 60 + int(match['minutes'] or 0)
+    return -minutes if match['sign'] == '-' else minutes
+
+
+def _zone_offsets(
+    column: Column, instants: NDArray[Any]
+) -> Tuple[NDArray[np.int64], NDArray[np.bool_]]:
+    """Return per-row UTC offsets (minutes) named by a timezone column.
+
+    IANA zones are resolved once per distinct UTC hour rather than per
+    row, which keeps DST changes exact at a fraction of the cost. The
+    second array marks the rows whose zone could be resolved.
+    """
+    if column.kind == 'category' and column.categories is not None:
+        labels = [str(c).strip() for c in column.categories.tolist()]
+        codes = column.values.astype(np.int64)
+    else:
+        found, codes = np.unique(column.to_list(), return_inverse=True)
+        labels = [str(c).strip() for c in found.tolist()]
+    offsets = np.zeros(len(instants), dtype=np.int64)
+    known = np.zeros(len(instants), dtype=bool)
+    hours = instants.astype('datetime64[h]')
+    for code, label in enumerate(labels):
+        rows = (codes == code) & column.present() & ~np.isnat(instants)
+        if not rows.any():
+            continue
+        fixed = _fixed_offset(label)
+        if fixed is not None:
+            offsets[rows] = fixed
+            known[rows] = True
+            continue
+        try:
+            zone = ZoneInfo(label)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+        distinct, index = np.unique(hours[rows], return_inverse=True)
+        zone_offsets = np.array(
+            [
+                _utcoffset_minutes(zone, hour)
+                for hour in distinct.astype('datetime64[s]').astype(np.int64)
+            ],
+            dtype=np.int64,
+        )
+        offsets[rows] = zone_offsets[index]
+        known[rows] = True
+    return offsets, known
+
+
+def _utcoffset_minutes(zone: ZoneInfo, seconds: int) -> int:
+    offset = datetime.fromtimestamp(seconds, timezone.utc).astimezone(zone)
+    delta = offset.utcoffset()
+    return 0 if delta is None else int(delta.total_seconds()) // 60
+
+
+def local_times(
+    table: WearableTable,
+    time_column: str,
+    timezone_column: Optional[str] = TIMEZONE_COLUMN,
+) -> NDArray[Any]:
+    """Return the local wall-clock time of every row, ``NaT`` if missing."""
+    column = table[time_column]
+    values: NDArray[Any] = column.values
+    if column.mask is not None:
+        values = values.copy()
+        values[column.mask] = np.datetime64('NaT')
+    if column.kind == 'date' or column.offsets is None:
+        return values
+    offsets = column.offsets.astype(np.int64)
+    if timezone_column is not None and timezone_column in table:
+        zone_offsets, known = _zone_offsets(table[timezone_column], values)
+        offsets = np.where(known, zone_offsets, offsets)
+    local: NDArray[Any] = values + offsets.astype('timedelta64[m]')
+    return local
+
+
+def _grouped_stats(
+    values: NDArray[Any],
+    groups: NDArray[np.int64],
+    windows: int,
+    percentiles: Sequence[float],
+) -> Dict[str, NDArray[Any]]:
+    """Reduce *values* per group with one sort.
+
+    Percentiles interpolate linearly between ranks, like
+    ``numpy.percentile``. Empty groups get a zero count and NaN stats.
+    """
+    order = np.lexsort((values, groups))
+    ordered = values[order].astype(np.float64)
+    counts = np.bincount(groups, minlength=windows)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    filled = counts > 0
+    first = starts[filled]
+    last = first + counts[filled] - 1
+
+    def per_window(found: NDArray[Any]) -> NDArray[np.float64]:
+        out = np.full(windows, np.nan)
+        out[filled] = found
+        return out
+
+    sums = np.bincount(groups, weights=values, minlength=windows)
+    stats: Dict[str, NDArray[Any]] = {
+        'count': counts,
+        'min': per_window(ordered[first]),
+        'max': per_window(ordered[last]),
+        'mean': np.divide(
+            sums, counts, out=np.full(windows, np.nan), where=filled
+        ),
+    }
+    for q in percentiles:
+        rank = first + (counts[filled] - 1) * (q / 100)
+        low = np.floor(rank).astype(np.int64)
+        high = np.ceil(rank).astype(np.int64)
+        found = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+        stats[f'p{q:g}'] = per_window(found)
+    return stats
+
+
+def _numeric(column: Column) -> Tuple[NDArray[Any], NDArray[np.bool_]]:
+    present = column.present()
+    if column.kind == 'float':
+        present = present & ~np.isnan(column.values)
+    return column.values, present
+
+
+def _sleep_stages(
+    table: WearableTable,
+) -> Tuple[Dict[str, str], Optional[Tuple[str, str]]]:
+    """Return the wide stage columns and the long (stage, duration) pair."""
+    wide = {}
+    for name in table.names:
+        if table[name].kind not in ('int', 'float'):
+            continue
+        match = _SLEEP_STAGE.match(name)
+        if match:
+            wide[name] = match['stage']
+    long = None
+    stage = next((c for c in _STAGE_COLUMNS if c in table), None)
+    duration = next(
+        (
+            c
+            for c in _DURATION_COLUMNS
+            if c in table and table[c].kind in ('int', 'float')
+        ),
+        None,
+    )
+    if stage is not None and duration is not None:
+        long = (stage, duration)
+    elif 'sleep_duration' in table and 'sleep_duration' not in wide:
+        if table['sleep_duration'].kind in ('int', 'float'):
+            wide['sleep_duration'] = 'total'
+    return wide, long
+
+
+def _long_stage_totals(
+    table: WearableTable,
+    columns: Tuple[str, str],
+    dated: NDArray[np.bool_],
+    groups: NDArray[np.int64],
+    size: int,
+) -> Dict[str, Tuple[NDArray[Any], str]]:
+    """Sum segment durations per (window, stage) with one bincount."""
+    labels = table[columns[0]]
+    duration = table[columns[1]]
+    values, present = _numeric(duration)
+    keep = (present & labels.present())[dated]
+    names = np.char.lower(
+        np.char.strip(np.asarray(labels.decode()[dated][keep], dtype=str))
+    )
+    stages, stage_index = np.unique(names, return_inverse=True)
+    totals = np.bincount(
+        groups[keep] * len(stages) + stage_index,
+        weights=values[dated][keep],
+        minlength=size * len(stages),
+    ).reshape(size, len(stages))
+    return {
+        str(stage): (totals[:, i], duration.kind)
+        for i, stage in enumerate(stages.tolist())
+    }
+
+
+def _scalar(value: Any, kind: str) -> Any:
+    if value != value:  # NaN
+        return None
+    if kind == 'int' and float(value).is_integer():
+        return int(value)
+    return round(float(value), 6)
+
+
+def rollup_table(
+    table: WearableTable,
+    frequencies: Sequence[Frequency] = FREQUENCIES,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    time_column: Optional[str] = None,
+    timezone_column: Optional[str] = TIMEZONE_COLUMN,
+) -> Dict[str, Any]:
+    """Aggregate *table* into local-time windows.
+
+    Returns a JSON-safe dict::
+
+        {'time_column': 'timestamp',
+         'windows': {'day': [{'start': '2025-05-08', 'rows': 1440,
+                              'metrics': {'heart_rate': {'count': ...,
+                                          'min': ..., 'p50': ...}},
+                              'sleep': {'deep': 27, ...}}, ...],
+                     'hour': [...]}}
+
+    Date-only series have daily windows only. Tables without a timestamp
+    column have no windows.
+    """
+    time_column = time_column or find_time_column(table)
+    result: Dict[str, Any] = {'time_column': time_column, 'windows': {}}
+    if time_column is None:
+        return result
+    if any(q < 0 or q > 100 for q in percentiles):
+        raise ValueError('Percentiles must be between 0 and 100')
+
+    local = local_times(table, time_column, timezone_column)
+    dated = ~np.isnat(local)
+    wide, long = _sleep_stages(table)
+    stage_columns = set(wide) | set(long or ())
+    metrics = [
+        name
+        for name in table.names
+        if table[name].kind in ('int', 'float') and name not in stage_columns
+    ]
+
+    for frequency in frequencies:
+        if frequency not in _UNITS:
+            raise ValueError(f'Unknown rollup frequency: {frequency!r}')
+        if frequency == 'hour' and table[time_column].kind == 'date':
+            continue
+        buckets = local[dated].astype(f'datetime64[{_UNITS[frequency]}]')
+        starts, groups = np.unique(buckets, return_inverse=True)
+        groups = groups.astype(np.int64)
+        size = len(starts)
+        columns: Dict[str, Dict[str, List[Any]]] = {}
+        for name in metrics:
+            column = table[name]
+            values, present = _numeric(column)
+            keep = present[dated]
+            stats = _grouped_stats(
+                values[dated][keep], groups[keep], size, percentiles
+            )
+            columns[name] = {
+                key: [
+                    int(v) if key == 'count' else _scalar(v, column.kind)
+                    for v in array.tolist()
+                ]
+                for key, array in stats.items()
+            }
+        sleep: Dict[str, Tuple[NDArray[Any], str]] = {}
+        for name, stage in wide.items():
+            column = table[name]
+            values, present = _numeric(column)
+            keep = present[dated]
+            totals = np.bincount(
+                groups[keep], weights=values[dated][keep], minlength=size
+            )
+            sleep[stage] = (totals, column.kind)
+        if long is not None:
+            sleep.update(_long_stage_totals(table, long, dated, groups, size))
+
+        rows_per_window = np.bincount(groups, minlength=size).tolist()
+        rendered = np.datetime_as_string(
+            starts, unit=cast(Any, _RENDER_UNITS[frequency])
+        ).tolist()
+        windows = []
+        for i, start in enumerate(rendered):
+            window: Dict[str, Any] = {
+                'start': start,
+                'rows': rows_per_window[i],
+                'metrics': {
+                    name: {key: found[i] for key, found in stats.items()}
+                    for name, stats in columns.items()
+                    if stats['count'][i]
+                },
+            }
+            if sleep:
+                window['sleep'] = {
+                    stage: _scalar(totals[i], kind)
+                    for stage, (totals, kind) in sleep.items()
+                }
+            windows.append(window)
+        result['windows'][frequency] = windows
+    return result
+
+
+__all__ = [
+    'DEFAULT_PERCENTILES',
+    'FREQUENCIES',
+    'Frequency',
+    'find_time_column',
+    'local_times',
+    'rollup_table',
+]
@@ -1,18 +1,59 @@
-"""Wearable data module for extracting wearable data."""
+"""Wearable data module for extracting wearable data.
+
+In-memory uploads are classified from a bounded prefix (``SNIFF_BYTES``)
+and then parsed once, straight from the byte stream, so a large export is
+never decoded or parsed more than once.
+
+``iter_wearable_records`` and ``aiter_wearable_records`` go further and
+parse the file incrementally, yielding batches of rows: CSV line by line
+and JSON arrays element by element, so memory stays bounded by the batch
+size rather than the file size.
+
+``rollup_wearable_data`` reduces an export to hourly and daily
+aggregates (see :mod:`hiperhealth.agents.extraction.rollup`), cached per
+upload so dashboards and prompts never rescan the raw rows.
+"""
 
 from __future__ import annotations
 
+import codecs
+import contextlib
 import csv
+import functools
+import hashlib
 import io
 import json
+import re
 import tempfile
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import IO, Any, ClassVar, Generic, Literal, TypeVar, Union, cast
-
-import magic
-
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Generic,
+    Iterator,
+    Literal,
+    Optional,
+    Protocol,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from hiperhealth.agents.cache import MemoryCache
+from hiperhealth.agents.extraction.columnar import WearableTable
+from hiperhealth.agents.extraction.mime import detect_mime
+from hiperhealth.agents.extraction.rollup import (
+    DEFAULT_PERCENTILES,
+    FREQUENCIES,
+    Frequency,
+    rollup_table,
+)
 from hiperhealth.utils import is_float
 
 
@@ -28,11 +69,330 @@ class FileProcessingError(WearableDataExtractorError):
     ...
 
 
+class RecordTooLongError(FileProcessingError, ValueError):
+    """A single record is longer than ``MAX_RECORD_CHARS``."""
+
+    ...
+
+
 T = TypeVar('T')
 FileInput = Union[str, Path, IO[bytes], tempfile.SpooledTemporaryFile[bytes]]
 FileExtension = Literal['json', 'csv']
 MimeType = Literal['application/json', 'text/csv', 'application/vnd.ms-excel']
 
+# bytes of an in-memory upload inspected to tell JSON from CSV
+SNIFF_BYTES = 64 * 1024
+
+
+# bytes read per step by the streaming parsers
+READ_BYTES = 64 * 1024
+# longest single CSV record or JSON array element the streaming parsers
+# buffer before giving up on the file
+MAX_RECORD_CHARS = 16 * 1024 * 1024
+
+Record = dict[str, object]
+
+# characters that open or close JSON strings and containers
+_JSON_STRUCTURE = re.compile(r'["\\\[\]{}]')
+# characters that end a JSON number or literal
+_JSON_SCALAR_END = re.compile(r'[\s,\]]')
+
+
+class AsyncByteReader(Protocol):
+    """An object with an async ``read``, such as FastAPI's ``UploadFile``."""
+
+    async def read(self, size: int = -1) -> bytes:
+        """Return at most *size* bytes; ``b''`` at the end."""
+        ...
+
+
+def _sniff(head: bytes, truncated: bool) -> Optional[FileExtension]:
+    """Classify a file as JSON or CSV from its first bytes *head*."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        # a multi-byte character split at the boundary is held back
+        text = decoder.decode(head, final=False).lstrip()
+    except UnicodeDecodeError:
+        return None
+    if not text:
+        return None
+    if text[0] in '[{':
+        return 'json'
+    return 'csv' if _looks_like_csv(text, truncated) else None
+
+
+def _looks_like_csv(text: str, truncated: bool) -> bool:
+    """Check for a non-empty header followed by at least one row."""
+    lines = text.splitlines()
+    if truncated:
+        # the last line may be incomplete
+        lines = lines[:-1]
+    try:
+        rows = (row for row in csv.reader(lines) if row)
+        header = next(rows, None)
+        if not header or any(not name.strip() for name in header):
+            return False
+        return next(rows, None) is not None
+    except csv.Error:
+        return False
+
+
+@contextlib.contextmanager
+def _text_stream(file: FileInput) -> Iterator[IO[str]]:
+    """Decode *file* lazily, leaving caller streams open when done."""
+    if isinstance(file, (str, Path)):
+        with open(file, 'r', encoding='utf-8-sig', newline='') as f:
+            yield f
+        return
+    file.seek(0)
+    wrapper = io.TextIOWrapper(
+        cast(Any, file), encoding='utf-8-sig', newline=''
+    )
+    try:
+        yield wrapper
+    finally:
+        # detach so the wrapper does not close the caller's stream
+        wrapper.detach()
+
+
+@contextlib.contextmanager
+def _processing_errors() -> Iterator[None]:
+    """Report parse failures as :class:`FileProcessingError`."""
+    try:
+        yield
+    except (json.JSONDecodeError, UnicodeDecodeError, csv.Error) as e:
+        raise FileProcessingError(f'File could not be processed: {e}') from e
+
+
+@contextlib.contextmanager
+def _byte_stream(file: FileInput) -> Iterator[IO[bytes]]:
+    """Open *file* for binary reads from its start."""
+    if isinstance(file, (str, Path)):
+        with open(file, 'rb') as f:
+            yield f
+        return
+    file.seek(0)
+    yield file
+
+
+def _keep_row(row: dict[str, Any]) -> Record:
+    return row
+
+
+class _RecordParser:
+    """Turn byte chunks of a CSV or JSON export into rows, incrementally.
+
+    CSV is split into records at newlines outside quotes; a JSON array is
+    decoded one element at a time with ``raw_decode``. Only the unparsed
+    tail of the input is buffered, and never more than
+    ``MAX_RECORD_CHARS`` of it.
+
+    A JSON element that spans chunks is held as a list of pieces and its
+    brackets and quotes are tracked as they arrive, so it is joined and
+    decoded once, when its closing delimiter has been read.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(
+        self,
+        file_format: FileExtension,
+        process_row: Callable[[dict[str, Any]], Record],
+    ) -> None:
+        self.file_format = file_format
+        self.process_row = process_row
+        self._text = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buffer = ''
+        # CSV state
+        self._header: Optional[list[str]] = None
+        self._pending: list[str] = []
+        self._quotes = 0
+        # JSON state: start, value, value_or_end, comma_or_end, end or
+        # document (a root that is not an array, parsed at the end)
+        self._state = 'start'
+        # pieces of an incomplete element (or of a document) and the scan
+        # of its nesting so far
+        self._parts: list[str] = []
+        self._size = 0
+        self._opener = ''
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, data: bytes, final: bool = False) -> list[Record]:
+        """Parse *data*; *final* marks the end of the input."""
+        text = self._text.decode(data, final)
+        if self.file_format == 'csv':
+            return self._feed_csv(text, final)
+        return self._feed_json(text, final)
+
+    def _feed_csv(self, text: str, final: bool) -> list[Record]:
+        lines = (self._buffer + text).split('\n')
+        self._buffer = '' if final else lines.pop()
+        records: list[str] = []
+        for line in lines:
+            self._pending.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                # the newline was not inside a quoted field
+                records.append('\n'.join(self._pending))
+                self._pending = []
+                self._quotes = 0
+        if final and self._pending:
+            records.append('\n'.join(self._pending))
+        elif (
+            len(self._buffer) + sum(map(len, self._pending)) > MAX_RECORD_CHARS
+        ):
+            raise RecordTooLongError(
+                f'CSV record is too long (over {MAX_RECORD_CHARS} characters)'
+            )
+        rows: list[Record] = []
+        for row in csv.reader(records):
+            if not row:
+                continue
+            if self._header is None:
+                self._header = row
+                continue
+            width = len(self._header)
+            cells = (row + [''] * width)[:width]
+            rows.append(self.process_row(dict(zip(self._header, cells))))
+        return rows
+
+    def _feed_json(self, text: str, final: bool) -> list[Record]:
+        if self._state == 'document':
+            self._hold(text)
+            return self._finish_document() if final else []
+        if self._parts:
+            # an element is still open: decode only once it can be whole
+            self._hold(text)
+            if not final and not self._closes(text):
+                return []
+            buffer = ''.join(self._parts)
+            self._parts, self._size = [], 0
+        else:
+            buffer = text
+        pos = 0
+        records: list[Record] = []
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if self._state == 'start':
+                if char != '[':
+                    self._state = 'document'
+                    break
+                self._state = 'value_or_end'
+                pos += 1
+            elif self._state in ('value_or_end', 'comma_or_end') and (
+                char == ']'
+            ):
+                self._state = 'end'
+                pos += 1
+            elif self._state == 'comma_or_end':
+                if char != ',':
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", buffer, pos
+                    )
+                self._state = 'value'
+                pos += 1
+            elif self._state in ('value', 'value_or_end'):
+                try:
+                    value, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    self._open(char, buffer[pos:])
+                    break  # wait for the rest of the element
+                if (
+                    not final
+                    and char not in '{["'
+                    and not _JSON_SCALAR_END.search(buffer, end)
+                ):
+                    # a number may continue in the next chunk, e.g. '12.'
+                    self._open(char, buffer[pos:])
+                    break
+                records.append(cast(Record, value))
+                self._state = 'comma_or_end'
+                pos = end
+            else:
+                raise json.JSONDecodeError('Extra data', buffer, pos)
+        if self._state == 'document':
+            self._hold(buffer[pos:])
+            return self._finish_document() if final else []
+        if final and self._state != 'end':
+            raise json.JSONDecodeError(
+                'Unterminated array', buffer, len(buffer)
+            )
+        return records
+
+    def _hold(self, text: str) -> None:
+        """Buffer *text* of an open element, within ``MAX_RECORD_CHARS``."""
+        self._size += len(text)
+        if self._size > MAX_RECORD_CHARS:
+            what = 'document' if self._state == 'document' else 'element'
+            raise RecordTooLongError(
+                f'JSON {what} is too long to stream '
+                f'(over {MAX_RECORD_CHARS} characters)'
+            )
+        self._parts.append(text)
+
+    def _open(self, char: str, tail: str) -> None:
+        """Start holding the element *tail* that failed to decode."""
+        self._opener = char
+        self._depth = 0
+        self._in_string = self._escaped = False
+        if self._closes(tail):
+            # the element is complete, so it did not fail for lack of input
+            self._decoder.raw_decode(tail)
+        self._hold(tail)
+
+    def _closes(self, text: str) -> bool:
+        """Scan *text* and return whether the open element ends in it."""
+        if self._opener not in '{["':
+            return _JSON_SCALAR_END.search(text) is not None
+        pos = 0
+        if self._escaped and text:
+            self._escaped = False
+            pos = 1
+        while match := _JSON_STRUCTURE.search(text, pos):
+            char, pos = match.group(), match.end()
+            if self._in_string:
+                if char == '\\':
+                    if pos == len(text):
+                        self._escaped = True
+                    pos += 1
+                elif char == '"':
+                    self._in_string = False
+                    if not self._depth:
+                        return True
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    return True
+        return False
+
+    def _finish_document(self) -> list[Record]:
+        document = json.loads(''.join(self._parts))
+        self._parts, self._size = [], 0
+        if isinstance(document, list):
+            return cast(list[Record], document)
+        return [cast(Record, document)]
+
+
+def _split_batches(
+    rows: list[Record], chunk_rows: int
+) -> tuple[list[list[Record]], list[Record]]:
+    """Return the full batches of *rows* and the remainder."""
+    full = len(rows) - len(rows) % chunk_rows
+    batches = [rows[i : i + chunk_rows] for i in range(0, full, chunk_rows)]
+    return batches, rows[full:]
+
 
 class BaseWearableDataExtractor(ABC, Generic[T]):
     """Base class for wearable data extraction."""
@@ -54,10 +414,10 @@ class WearableDataFileExtractor(BaseWearableDataExtractor[FileInput]):
         'csv': 'text/csv',
     }
 
-    def __init__(self) -> None:
-        """Initialize caching an magic-python object."""
-        self._mimetype_cache: dict[str, MimeType] = {}
-        self.mime: magic.Magic = magic.Magic(mime=True)
+    def __init__(self, cache_size: int = 256) -> None:
+        """Initialize the MIME type and rollup caches."""
+        self._mimetype_cache = MemoryCache(maxsize=cache_size)
+        self._rollup_cache = MemoryCache(maxsize=cache_size)
 
     @property
     def allowed_extensions(self) -> list[FileExtension]:
@@ -80,16 +440,149 @@ class WearableDataFileExtractor(BaseWearableDataExtractor[FileInput]):
         self._validate_or_raise(file)
         return self._process_file(file)
 
+    def extract_wearable_table(self, file: FileInput) -> WearableTable:
+        """Extract wearable data from file into a typed columnar table.
+
+        Column types are inferred once per column and converted in bulk,
+        which is much faster and smaller than per-row dicts for long
+        exports. Use ``WearableTable.to_records()`` for the row view.
+        """
+        self._validate_or_raise(file)
+        file_format = self._detect_format(file)
+        with _processing_errors():
+            if file_format == 'json':
+                return WearableTable.from_records(
+                    self._process_json_file(file)
+                )
+            if file_format == 'csv':
+                with _text_stream(file) as text:
+                    return WearableTable.from_csv(text.read())
+        raise self._unprocessable()
+
+    def rollup_wearable_data(
+        self,
+        file: FileInput,
+        frequencies: Sequence[Frequency] = FREQUENCIES,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> dict[str, Any]:
+        """Return hourly and daily aggregates of *file*.
+
+        Results are cached per upload: files on disk by path, size and
+        modification time, in-memory uploads by a hash of their content,
+        so the same export is only parsed and reduced once.
+        """
+        options = json.dumps([list(frequencies), list(percentiles)])
+        cache_key = f'{self._get_content_key(file)}:{options}'
+        cached = self._rollup_cache.get(cache_key)
+        if cached is not None:
+            return cast(dict[str, Any], json.loads(cached))
+        result = rollup_table(
+            self.extract_wearable_table(file), frequencies, percentiles
+        )
+        self._rollup_cache.set(cache_key, json.dumps(result))
+        return result
+
+    def iter_wearable_records(
+        self, file: FileInput, chunk_rows: int = 10_000, raw: bool = False
+    ) -> Iterator[list[Record]]:
+        """Yield the rows of *file* in batches of at most *chunk_rows*.
+
+        The file is read ``READ_BYTES`` at a time, so memory is bounded by
+        the batch size instead of the file size. With *raw*, CSV cells are
+        left as strings for :class:`TableBuilder` to convert per column.
+        """
+        self._validate_or_raise(file)
+        file_format = self._detect_format(file)
+        if file_format is None:
+            raise self._unprocessable()
+        parser = _RecordParser(
+            file_format, _keep_row if raw else self._process_row
+        )
+        pending: list[Record] = []
+        with _processing_errors(), _byte_stream(file) as stream:
+            while True:
+                data = stream.read(READ_BYTES)
+                pending.extend(parser.feed(data, final=not data))
+                batches, pending = _split_batches(pending, chunk_rows)
+                yield from batches
+                if not data:
+                    break
+        if pending:
+            yield pending
+
+    async def aiter_wearable_records(
+        self,
+        upload: AsyncByteReader,
+        chunk_rows: int = 10_000,
+        raw: bool = False,
+    ) -> AsyncIterator[list[Record]]:
+        """Yield the rows of an upload in batches, reading it in chunks.
+
+        *upload* is read from its current position, e.g. a FastAPI
+        ``UploadFile`` that has not been read yet; the format is sniffed
+        from the first ``SNIFF_BYTES``. *raw* is as for
+        :meth:`iter_wearable_records`.
+        """
+        head = b''
+        while len(head) < SNIFF_BYTES:
+            data = await upload.read(READ_BYTES)
+            if not data:
+                break
+            head += data
+        if not head:
+            raise WearableDataExtractorError('File is not valid. It is empty.')
+        file_format = _sniff(head[:SNIFF_BYTES], len(head) >= SNIFF_BYTES)
+        if file_format is None:
+            raise self._unprocessable()
+        parser = _RecordParser(
+            file_format, _keep_row if raw else self._process_row
+        )
+        with _processing_errors():
+            pending = parser.feed(head)
+            while True:
+                data = await upload.read(READ_BYTES)
+                pending.extend(parser.feed(data, final=not data))
+                batches, pending = _split_batches(pending, chunk_rows)
+                for batch in batches:
+                    yield batch
+                if not data:
+                    break
+        if pending:
+            yield pending
+
     def _process_file(self, file: FileInput) -> list[dict[str, object]]:
-        if self._is_json(file):
-            return self._process_json_file(file)
-        elif self._is_csv(file):
-            return self._process_csv_file(file)
-        else:
-            raise FileProcessingError(
-                'File could not be processed. '
-                'It can be a malformed or corrupted file.'
-            )
+        file_format = self._detect_format(file)
+        with _processing_errors():
+            if file_format == 'json':
+                return self._process_json_file(file)
+            if file_format == 'csv':
+                return self._process_csv_file(file)
+        raise self._unprocessable()
+
+    @staticmethod
+    def _unprocessable() -> FileProcessingError:
+        return FileProcessingError(
+            'File could not be processed. '
+            'It can be a malformed or corrupted file.'
+        )
+
+    def _detect_format(self, file: FileInput) -> Optional[FileExtension]:
+        """Return ``json``, ``csv`` or ``None`` for an unknown format."""
+        if isinstance(file, (tempfile.SpooledTemporaryFile, io.BytesIO)):
+            return self._sniff_format(file)
+        mime = self._get_mime_type(file)
+        if mime == self.allowed_extensions_mimetypes_map['json']:
+            return 'json'
+        if mime in self.allowed_extensions_mimetypes_map['csv']:
+            return 'csv'
+        return None
+
+    def _sniff_format(self, file: IO[bytes]) -> Optional[FileExtension]:
+        """Classify an in-memory file from its first ``SNIFF_BYTES``."""
+        file.seek(0)
+        head = file.read(SNIFF_BYTES)
+        file.seek(0)
+        return _sniff(head, len(head) == SNIFF_BYTES)
 
     def is_supported(self, file: FileInput) -> bool:
         """Check if file is supported."""
@@ -122,84 +615,56 @@ class WearableDataFileExtractor(BaseWearableDataExtractor[FileInput]):
 
     def _get_mime_type(self, file: FileInput) -> str:
         """Get MIME type of a given file input."""
-        cache_key = self._get_cache_key(file)
-
-        if cache_key in self._mimetype_cache:
-            # Return cached mimetype
-            return self._mimetype_cache[cache_key]
-
-        if isinstance(file, Path):
-            self._mimetype_cache[cache_key] = cast(
-                MimeType, self.mime.from_file(file)
-            )
-            return self._mimetype_cache[cache_key]
-        elif isinstance(file, IO):  # Generic IO[bytes]
-            head = file.read(2048)
-            file.seek(0)
-            self._mimetype_cache[cache_key] = cast(
-                MimeType, self.mime.from_buffer(head)
-            )
-            return self._mimetype_cache[cache_key]
-        else:
+        if not isinstance(file, (str, Path)) and not hasattr(file, 'read'):
             raise TypeError(
                 'Unsupported file type: must be Path or file-like object.'
             )
-
-    def _get_cache_key(self, file: FileInput) -> str:
-        cache_key: str
-        if isinstance(file, Path):
-            cache_key = str(file.resolve())
-        else:
-            cache_key = str(id(file))  # Usar o id do objeto em memória
-        return cache_key
+        cache_key = self._get_cache_key(file)
+        if cache_key is not None:
+            cached = self._mimetype_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        mime = detect_mime(file)
+        if cache_key is not None:
+            self._mimetype_cache.set(cache_key, mime)
+        return mime
+
+    def _get_cache_key(self, file: FileInput) -> Optional[str]:
+        """Return a cache key for files on disk, ``None`` for streams.
+
+        Paths are keyed by size and modification time so an edited file is
+        detected again. Streams are not cached: object ids are reused once
+        a stream is garbage collected, and sniffing their header is cheap.
+        """
+        if not isinstance(file, (str, Path)):
+            return None
+        path = Path(file).resolve()
+        stat = path.stat()
+        return f'{path}:{stat.st_size}:{stat.st_mtime_ns}'
+
+    def _get_content_key(self, file: FileInput) -> str:
+        """Return a cache key identifying the content of *file*."""
+        key = self._get_cache_key(file)
+        if key is not None:
+            return key
+        digest = hashlib.sha256()
+        with _byte_stream(file) as stream:
+            for chunk in iter(lambda: stream.read(READ_BYTES), b''):
+                digest.update(chunk)
+            stream.seek(0)
+        return digest.hexdigest()
 
     def _is_json(self, file: FileInput) -> bool:
-        if isinstance(file, (tempfile.SpooledTemporaryFile, io.BytesIO)):
-            try:
-                file.seek(0)
-                json.loads(file.read().decode('utf-8'))
-                file.seek(0)
-                return True
-            except json.JSONDecodeError:
-                file.seek(0)
-                return False
-        return (
-            self._get_mime_type(file)
-            == self.allowed_extensions_mimetypes_map['json']
-        )
+        return self._detect_format(file) == 'json'
 
     def _is_csv(self, file: FileInput) -> bool:
-        if isinstance(file, (tempfile.SpooledTemporaryFile, io.BytesIO)):
-            try:
-                file.seek(0)
-                content = file.read().decode('utf-8')
-                file.seek(0)
-
-                reader = csv.DictReader(io.StringIO(content))
-
-                # Check if header exists and is valid (non-empty strings)
-                if not reader.fieldnames or any(
-                    name is None or name.strip() == ''
-                    for name in reader.fieldnames
-                ):
-                    return False
-
-                # Try reading at least one row and see if it's consistent
-                first_row = next(reader, None)
-                if first_row is None:
-                    return False
-
-                return True
-            except csv.Error:
-                file.seek(0)
-                return False
-        return (
-            self._get_mime_type(file)
-            in self.allowed_extensions_mimetypes_map['csv']
-        )
+        return self._detect_format(file) == 'csv'
 
     def _process_row(self, row: dict[str, Any]) -> dict[str, object]:
         for key, value in row.items():
+            if not isinstance(value, str):
+                continue
             if value.isnumeric():
                 row[key] = int(value)
             elif is_float(value):
@@ -210,22 +675,15 @@ class WearableDataFileExtractor(BaseWearableDataExtractor[FileInput]):
         return row
 
     def _process_json_file(self, file: FileInput) -> list[dict[str, object]]:
-        if isinstance(file, (str, Path)):
-            with open(file, 'r', encoding='utf-8') as f:
-                return cast(list[dict[str, object]], json.load(f))
-        else:
-            file.seek(0)
-            return cast(
-                list[dict[str, object]],
-                json.load(io.TextIOWrapper(file, encoding='utf-8')),
-            )
+        with _text_stream(file) as text:
+            return cast(list[dict[str, object]], json.load(text))
 
     def _process_csv_file(self, file: FileInput) -> list[dict[str, object]]:
-        if isinstance(file, (str, Path)):
-            with open(file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                return [self._process_row(row) for row in reader]
-        else:
-            file.seek(0)
-            reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8'))
-            return [self._process_row(row) for row in reader]
+        with _text_stream(file) as text:
+            return [self._process_row(row) for row in csv.DictReader(text)]
+
+
+@functools.lru_cache(maxsize=1)
+def get_wearable_data_extractor() -> WearableDataFileExtractor:
+    """Return the process-wide WearableDataFileExtractor."""
+    return WearableDataFileExtractor()
@@ -0,0 +1,333 @@
+"""Append-only journal for raw LLM replies.
+
+Replies are queued in memory and a background thread appends them in
+batches to rotating JSONL segments (optionally gzip-compressed) under a
+single directory. A small ``index.jsonl`` maps each session id to the
+segments that hold its replies, so lookups only open the relevant files.
+With ``max_segments`` set, the oldest segments are deleted as new ones
+are started and their entries are dropped from the index.
+
+Several processes may write to the same directory: each batch, and the
+rotation that may precede it, is written under an exclusive lock on
+``journal.lock`` (``fcntl.flock``; on platforms without it only the
+writers of one process are serialised).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Union,
+    cast,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.jsonl'
+LOCK_FILE = 'journal.lock'
+SEGMENT_PREFIX = 'segment-'
+
+
+def _open_segment(path: Path, mode: str) -> IO[str]:
+    if path.suffix == '.gz':
+        return cast(IO[str], gzip.open(path, mode + 't', encoding='utf-8'))
+    return open(path, mode, encoding='utf-8')
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.name[len(SEGMENT_PREFIX) :].split('.')[0])
+
+
+def _list_segments(directory: Path) -> List[Path]:
+    return sorted(
+        directory.glob(f'{SEGMENT_PREFIX}*.jsonl*'), key=_segment_number
+    )
+
+
+@contextlib.contextmanager
+def _exclusive(directory: Path) -> Iterator[None]:
+    """Hold the journal's cross-process write lock."""
+    with open(directory / LOCK_FILE, 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _index_entries(path: Path) -> List[Dict[str, str]]:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class JournalReader:
+    """Read records back from a journal directory.
+
+    The index is loaded once and then only the lines appended since the
+    previous lookup are read.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """Initialize the reader for *directory*."""
+        self.directory = Path(directory)
+        self._index: Dict[str, List[str]] = {}
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def index(self) -> Dict[str, List[str]]:
+        """Return a mapping of session id to segment file names."""
+        with self._lock:
+            self._refresh()
+            return {sid: list(names) for sid, names in self._index.items()}
+
+    def _refresh(self) -> None:
+        """Read index lines appended since the last call."""
+        path = self.directory / INDEX_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._index, self._offset, self._inode = {}, 0, None
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # first read, or the index was compacted by a pruning writer
+            self._index, self._offset, self._inode = {}, 0, stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # a line still being written; read it next time
+                    break
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                segments = self._index.setdefault(entry['session_id'], [])
+                if entry['segment'] not in segments:
+                    segments.append(entry['segment'])
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield every record in write order."""
+        for segment in _list_segments(self.directory):
+            yield from self._iter_segment(segment)
+
+    def lookup(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return all records written for *session_id*."""
+        records: List[Dict[str, Any]] = []
+        with self._lock:
+            self._refresh()
+            names = list(self._index.get(session_id, []))
+        for name in names:
+            records.extend(
+                record
+                for record in self._iter_segment(self.directory / name)
+                if record.get('session_id') == session_id
+            )
+        return records
+
+    def _iter_segment(self, path: Path) -> Iterator[Dict[str, Any]]:
+        if not path.exists():
+            return
+        with _open_segment(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class RawResponseJournal:
+    """Batching, rotating writer for raw LLM replies."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compress: bool = False,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_segments: Optional[int] = None,
+    ) -> None:
+        """Create the journal directory and start the writer thread.
+
+        *max_segments* bounds the segments (and index entries) kept on
+        disk; ``None`` keeps every segment.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+
+        self._queue: queue.Queue[Optional[Dict[str, Any]]] = queue.Queue()
+        self._reader = JournalReader(self.directory)
+        # sessions indexed for the segment being written; reset on rotation
+        self._indexed_segment: Optional[str] = None
+        self._indexed: Set[str] = set()
+        segments = _list_segments(self.directory)
+        self._segment_no = _segment_number(segments[-1]) if segments else 1
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name='llm-journal', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def reader(self) -> JournalReader:
+        """Return the reader over this journal's directory."""
+        return self._reader
+
+    def append(self, text: str, session_id: Optional[str] = None) -> None:
+        """Queue a raw reply; it is written by the background thread."""
+        self._queue.put(
+            {
+                'ts': datetime.now(timezone.utc).isoformat(),
+                'session_id': session_id,
+                'raw': text,
+            }
+        )
+
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _segment_path(self) -> Path:
+        suffix = '.jsonl.gz' if self.compress else '.jsonl'
+        return self.directory / (
+            f'{SEGMENT_PREFIX}{self._segment_no:06d}{suffix}'
+        )
+
+    def _current_segment(self) -> Path:
+        """Return the segment to append to; call with the lock held."""
+        segments = _list_segments(self.directory)
+        if segments:
+            # another process may have rotated since our last batch
+            self._segment_no = max(
+                self._segment_no, _segment_number(segments[-1])
+            )
+        path = self._segment_path()
+        if path.exists() and path.stat().st_size >= self.max_segment_bytes:
+            self._segment_no += 1
+            path = self._segment_path()
+        return path
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with _exclusive(self.directory):
+            self._append(batch)
+            if self.max_segments:
+                self._prune(self.max_segments)
+
+    def _prune(self, keep: int) -> None:
+        """Delete all but the newest *keep* segments; call with the lock."""
+        segments = _list_segments(self.directory)
+        if len(segments) <= keep:
+            return
+        dropped = {path.name for path in segments[:-keep]}
+        index = self.directory / INDEX_FILE
+        entries = [
+            e for e in _index_entries(index) if e['segment'] not in dropped
+        ]
+        # rewrite the index first so no entry points at a missing file
+        tmp = index.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(e) + '\n' for e in entries)
+        os.replace(tmp, index)
+        for path in segments[:-keep]:
+            path.unlink(missing_ok=True)
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        segment = self._current_segment()
+        with _open_segment(segment, 'a') as f:
+            f.writelines(
+                json.dumps(record, ensure_ascii=False) + '\n'
+                for record in batch
+            )
+
+        if segment.name != self._indexed_segment:
+            self._indexed_segment = segment.name
+            self._indexed = {
+                sid
+                for sid, names in self._reader.index().items()
+                if segment.name in names
+            }
+        new_entries = []
+        for record in batch:
+            session_id = record['session_id']
+            if session_id and session_id not in self._indexed:
+                self._indexed.add(session_id)
+                new_entries.append(
+                    {'session_id': session_id, 'segment': segment.name}
+                )
+        if new_entries:
+            with open(self.directory / INDEX_FILE, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(e) + '\n' for e in new_entries)
+
+    def _collect(self) -> List[Optional[Dict[str, Any]]]:
+        """Wait for one record, then gather more for ``flush_interval``."""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while items[-1] is not None and len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            items = self._collect()
+            batch = [item for item in items if item is not None]
+            stop = len(batch) != len(items)
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception:
+                logger.exception('Failed to write LLM journal batch')
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+
+__all__ = ['JournalReader', 'RawResponseJournal']
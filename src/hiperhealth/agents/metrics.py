@@ -0,0 +1,254 @@
+"""Per-call accounting for LLM requests.
+
+Every ``chat``/``achat`` call produces one :class:`CallMetrics` record
+(tokens, tokens saved by prompt assembly, wall time, time to first
+byte, model, language, cache hit and retry count) that is handed to the
+registered sinks:
+
+* :class:`MetricsRegistry` keeps a bounded window of records in process
+  and aggregates them into percentiles or Prometheus text format. The
+  module-level :data:`registry` is always installed.
+* :class:`LogSink` writes one structured log line per call.
+* :class:`CallbackSink` forwards records to any callable.
+
+Use :func:`add_sink` / :func:`remove_sink` to plug in more.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+@dataclass
+class CallMetrics:
+    """Accounting for a single LLM call, retries included."""
+
+    model: str
+    language: Optional[str] = None
+    session_id: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_tokens_saved: int = 0
+    wall_time: float = 0.0
+    ttfb: Optional[float] = None
+    cache_hit: bool = False
+    retries: int = 0
+    reasked: bool = False
+    ok: bool = True
+    error: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        """Return prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def add_usage(self, usage: Any) -> None:
+        """Accumulate the ``usage`` block of a completion, if present."""
+        if usage is None:
+            return
+        self.prompt_tokens += getattr(usage, 'prompt_tokens', 0) or 0
+        self.completion_tokens += getattr(usage, 'completion_tokens', 0) or 0
+
+
+class MetricsSink:
+    """Receives one :class:`CallMetrics` per LLM call."""
+
+    def record(self, metrics: CallMetrics) -> None:
+        """Consume *metrics*."""
+        raise NotImplementedError
+
+
+class LogSink(MetricsSink):
+    """Log every call as a single ``key=value`` line."""
+
+    def __init__(
+        self, log: Optional[logging.Logger] = None, level: int = logging.INFO
+    ) -> None:
+        """Log to *log* (this module's logger by default) at *level*."""
+        self.log = log or logger
+        self.level = level
+
+    def record(self, metrics: CallMetrics) -> None:
+        """Write *metrics* to the log."""
+        fields = ' '.join(f'{k}={v}' for k, v in asdict(metrics).items())
+        self.log.log(self.level, 'llm_call %s', fields)
+
+
+class CallbackSink(MetricsSink):
+    """Forward every record to *callback*."""
+
+    def __init__(self, callback: Callable[[CallMetrics], None]) -> None:
+        """Wrap *callback*."""
+        self.callback = callback
+
+    def record(self, metrics: CallMetrics) -> None:
+        """Call the wrapped callback."""
+        self.callback(metrics)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the *q* quantile of sorted *values* (linear interpolation)."""
+    if not values:
+        return math.nan
+    pos = (len(values) - 1) * q
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def _distribution(values: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    stats = {f'p{round(q * 100)}': percentile(ordered, q) for q in QUANTILES}
+    stats['max'] = ordered[-1]
+    stats['mean'] = sum(ordered) / len(ordered)
+    return stats
+
+
+class MetricsRegistry(MetricsSink):
+    """In-process, Prometheus-style store of LLM call metrics.
+
+    Counters (calls, errors, cache hits, retries, tokens) are cumulative;
+    latency percentiles are computed over the last ``window`` calls.
+    """
+
+    def __init__(self, window: int = 10_000) -> None:
+        """Keep at most *window* recent records for percentiles."""
+        self._records: Deque[CallMetrics] = deque(maxlen=window)
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, metrics: CallMetrics) -> None:
+        """Store *metrics* and update the counters."""
+        with self._lock:
+            self._records.append(metrics)
+            self._counters['calls'] += 1
+            self._counters['errors'] += not metrics.ok
+            self._counters['cache_hits'] += metrics.cache_hit
+            self._counters['retries'] += metrics.retries
+            self._counters['reasks'] += metrics.reasked
+            self._counters['prompt_tokens'] += metrics.prompt_tokens
+            self._counters['completion_tokens'] += metrics.completion_tokens
+            self._counters['prompt_tokens_saved'] += (
+                metrics.prompt_tokens_saved
+            )
+
+    def records(self) -> List[CallMetrics]:
+        """Return a copy of the recent records, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        """Drop every record and reset the counters."""
+        with self._lock:
+            self._records.clear()
+            self._counters.clear()
+
+    @staticmethod
+    def _aggregate(records: List[CallMetrics]) -> Dict[str, Any]:
+        calls = [r for r in records if not r.cache_hit]
+        return {
+            'calls': len(records),
+            'wall_time': _distribution(r.wall_time for r in records),
+            'ttfb': _distribution(r.ttfb for r in calls if r.ttfb is not None),
+            'prompt_tokens': _distribution(r.prompt_tokens for r in calls),
+            'completion_tokens': _distribution(
+                r.completion_tokens for r in calls
+            ),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Return cumulative counters and windowed percentiles.
+
+        Percentiles are reported overall and per ``model`` / ``language``.
+        """
+        with self._lock:
+            records = list(self._records)
+            totals = dict(self._counters)
+        groups: Dict[str, Dict[str, List[CallMetrics]]] = {
+            'model': {},
+            'language': {},
+        }
+        for r in records:
+            groups['model'].setdefault(r.model, []).append(r)
+            groups['language'].setdefault(r.language or '', []).append(r)
+        return {
+            'totals': totals,
+            'window': self._aggregate(records),
+            'by_model': {
+                k: self._aggregate(v) for k, v in groups['model'].items()
+            },
+            'by_language': {
+                k: self._aggregate(v) for k, v in groups['language'].items()
+            },
+        }
+
+    def render_prometheus(self) -> str:
+        """Return the registry in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines: List[str] = []
+        for name, value in sorted(summary['totals'].items()):
+            metric = f'hiperhealth_llm_{name}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+        for field in ('wall_time', 'ttfb'):
+            metric = f'hiperhealth_llm_{field}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for model, agg in sorted(summary['by_model'].items()):
+                for key, value in agg[field].items():
+                    if not key.startswith('p'):
+                        continue
+                    q = int(key[1:]) / 100
+                    lines.append(
+                        f'{metric}{{model="{model}",quantile="{q}"}} {value}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+_sinks: List[MetricsSink] = [registry]
+
+
+def add_sink(sink: MetricsSink) -> MetricsSink:
+    """Register *sink* for every future LLM call and return it."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    """Unregister *sink*; unknown sinks are ignored."""
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def emit(metrics: CallMetrics) -> None:
+    """Hand *metrics* to every sink; a failing sink never breaks a call."""
+    for sink in list(_sinks):
+        try:
+            sink.record(metrics)
+        except Exception:
+            logger.exception('metrics sink %r failed', sink)
+
+
+__all__ = [
+    'CallMetrics',
+    'CallbackSink',
+    'LogSink',
+    'MetricsRegistry',
+    'MetricsSink',
+    'add_sink',
+    'emit',
+    'percentile',
+    'registry',
+    'remove_sink',
+]
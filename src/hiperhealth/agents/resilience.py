@@ -0,0 +1,138 @@
+"""Retry, deadline and circuit-breaker primitives for LLM calls."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when a completion cannot be obtained in time."""
+
+    ...
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the provider while the breaker is open."""
+
+    ...
+
+
+class DeadlineExceededError(LLMUnavailableError):
+    """Raised when the per-call deadline elapses."""
+
+    ...
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for transient provider errors."""
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return the sleep before retry number *attempt* (0-based).
+
+        Uses "full jitter": a uniform draw between zero and the capped
+        exponential delay, which spreads retries from many workers.
+        """
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0, cap)  # nosec B311
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for rate limits, 5xx replies, timeouts and disconnects."""
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):
+        # also covers APITimeoutError
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Fail fast after repeated provider failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call raises :class:`CircuitOpenError` until ``reset_timeout``
+    seconds have passed. The next call is then let through as a trial: a
+    success closes the breaker, a failure opens it again. Other calls are
+    rejected while the trial is in flight; a trial that never reports back
+    frees its slot after another ``reset_timeout``.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return ``'closed'``, ``'open'`` or ``'half_open'``."""
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` if calls are currently blocked."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(
+                    'LLM provider is failing; circuit breaker is open'
+                )
+            if (
+                self._trial_at is not None
+                and now - self._trial_at < self.reset_timeout
+            ):
+                raise CircuitOpenError(
+                    'LLM provider is failing; a trial call is in progress'
+                )
+            self._trial_at = now
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if (
+                self._opened_at is not None
+                or self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+__all__ = [
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'DeadlineExceededError',
+    'LLMUnavailableError',
+    'RetryPolicy',
+    'is_retryable',
+]
@@ -0,0 +1,142 @@
+"""Runtime settings for the shared LLM client.
+
+Nothing here touches the environment at import time; ``get_settings``
+loads ``.envs/.env`` and reads the ``OPENAI_*`` / ``LLM_*`` variables the
+first time a value is actually needed.
+"""
+
+from __future__ import annotations
+
+import os
+
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Optional
+
+ENV_FILE = Path(__file__).parents[3] / '.envs' / '.env'
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str) -> bool:
+    return os.getenv(name, '').lower() in {'1', 'true', 'yes'}
+
+
+@dataclass(frozen=True)
+class LLMSettings:
+    """Configuration consumed by :mod:`hiperhealth.agents.client`."""
+
+    api_key: str = ''
+    base_url: Optional[str] = None
+    model: str = 'o4-mini'
+    timeout: float = 120.0
+    max_connections: int = 100
+    max_keepalive: int = 20
+    raw_dir: Path = field(default_factory=lambda: Path('data') / 'llm_raw')
+    journal_compress: bool = False
+    journal_segment_mb: float = 64.0
+    journal_max_segments: Optional[int] = None
+    cache: str = ''
+    cache_path: Path = field(
+        default_factory=lambda: Path('data') / 'llm_cache.sqlite'
+    )
+    cache_ttl: Optional[float] = None
+    cache_size: int = 1024
+    max_attempts: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    deadline: float = 180.0
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    backend: str = 'openai'
+    fake_latency: str = 'lognormal:1.5,0.4'
+    fake_tokens: str = ''
+    fake_error_rate: float = 0.0
+    fake_invalid_rate: float = 0.0
+    fake_seed: Optional[int] = None
+    prompt_token_budget: int = 4000
+
+    @classmethod
+    def from_env(cls, env_file: Optional[Path] = ENV_FILE) -> LLMSettings:
+        """Build settings from the process environment and *env_file*."""
+        if env_file is not None:
+            from dotenv import load_dotenv
+
+            load_dotenv(env_file)
+
+        defaults = cls()
+        return cls(
+            api_key=os.getenv('OPENAI_API_KEY', ''),
+            base_url=os.getenv('OPENAI_BASE_URL') or None,
+            model=os.getenv('OPENAI_MODEL', defaults.model),
+            timeout=float(os.getenv('OPENAI_TIMEOUT', defaults.timeout)),
+            max_connections=int(
+                os.getenv('OPENAI_MAX_CONNECTIONS', defaults.max_connections)
+            ),
+            max_keepalive=int(
+                os.getenv('OPENAI_MAX_KEEPALIVE', defaults.max_keepalive)
+            ),
+            raw_dir=Path(os.getenv('LLM_RAW_DIR', str(defaults.raw_dir))),
+            journal_compress=_env_bool('LLM_JOURNAL_COMPRESS'),
+            journal_segment_mb=float(
+                os.getenv(
+                    'LLM_JOURNAL_SEGMENT_MB', defaults.journal_segment_mb
+                )
+            ),
+            journal_max_segments=(
+                int(os.environ['LLM_JOURNAL_MAX_SEGMENTS'])
+                if os.getenv('LLM_JOURNAL_MAX_SEGMENTS')
+                else None
+            ),
+            cache=os.getenv('LLM_CACHE', '').lower(),
+            cache_path=Path(
+                os.getenv('LLM_CACHE_PATH', str(defaults.cache_path))
+            ),
+            cache_ttl=_env_float('LLM_CACHE_TTL', None),
+            cache_size=int(os.getenv('LLM_CACHE_SIZE', defaults.cache_size)),
+            max_attempts=int(
+                os.getenv('LLM_MAX_ATTEMPTS', defaults.max_attempts)
+            ),
+            retry_base_delay=float(
+                os.getenv('LLM_RETRY_BASE_DELAY', defaults.retry_base_delay)
+            ),
+            retry_max_delay=float(
+                os.getenv('LLM_RETRY_MAX_DELAY', defaults.retry_max_delay)
+            ),
+            deadline=float(os.getenv('LLM_DEADLINE', defaults.deadline)),
+            breaker_threshold=int(
+                os.getenv('LLM_BREAKER_THRESHOLD', defaults.breaker_threshold)
+            ),
+            breaker_reset=float(
+                os.getenv('LLM_BREAKER_RESET', defaults.breaker_reset)
+            ),
+            backend=os.getenv('LLM_BACKEND', defaults.backend).lower(),
+            fake_latency=os.getenv('LLM_FAKE_LATENCY', defaults.fake_latency),
+            fake_tokens=os.getenv('LLM_FAKE_TOKENS', defaults.fake_tokens),
+            fake_error_rate=float(
+                os.getenv('LLM_FAKE_ERROR_RATE', defaults.fake_error_rate)
+            ),
+            fake_invalid_rate=float(
+                os.getenv('LLM_FAKE_INVALID_RATE', defaults.fake_invalid_rate)
+            ),
+            fake_seed=(
+                int(os.environ['LLM_FAKE_SEED'])
+                if os.getenv('LLM_FAKE_SEED')
+                else None
+            ),
+            prompt_token_budget=int(
+                os.getenv(
+                    'LLM_PROMPT_TOKEN_BUDGET', defaults.prompt_token_budget
+                )
+            ),
+        )
+
+    def with_overrides(self, **overrides: Any) -> LLMSettings:
+        """Return a copy with *overrides* applied."""
+        return replace(self, **overrides)
+
+
+__all__ = ['ENV_FILE', 'LLMSettings']
@@ -0,0 +1,153 @@
+"""Read structured fields out of a JSON reply that is still streaming."""
+
+from __future__ import annotations
+
+import json
+
+from typing import List, Tuple
+
+_LENIENT = json.JSONDecoder(strict=False)
+
+
+def _decode_prefix(raw: str) -> str:
+    """Decode the body of a JSON string, dropping a cut-off escape."""
+    for cut in range(len(raw), max(len(raw) - 6, 0) - 1, -1):
+        try:
+            return str(_LENIENT.decode(f'"{raw[:cut]}"'))
+        except json.JSONDecodeError:
+            continue
+    return ''
+
+
+class PartialDiagnosis:
+    """Accumulate streamed deltas and report newly readable fields.
+
+    :meth:`feed` returns ``('summary', text)`` whenever the summary grows
+    and ``('option', name)`` once per completed differential option.
+
+    Each delta is scanned once: the scanner keeps its place in the reply
+    (nesting, strings, the current key) between calls, and stops looking
+    once the summary and the options list have both been closed.
+    """
+
+    def __init__(self) -> None:
+        """Start with an empty reply."""
+        self.text = ''
+        self.summary = ''
+        self.options: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # what the current string is read into: key, summary, option
+        self._target = ''
+        self._raw: List[str] = []
+        # at the top level: key, colon, value or comma
+        self._expect = 'key'
+        self._key = ''
+        self._summary_raw = ''
+        self._summary_done = False
+        self._in_options = False
+        self._options_done = False
+
+    @property
+    def complete(self) -> bool:
+        """Return whether the summary and options have both been read."""
+        return self._summary_done and self._options_done
+
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        """Append *delta* and return the events it made available."""
+        self.text += delta
+        if self.complete:
+            return []
+        events: List[Tuple[str, str]] = []
+        for ch in delta:
+            if self.complete:
+                break
+            self._step(ch, events)
+        if self._target == 'summary':
+            self._summary_raw = ''.join(self._raw)
+        summary = _decode_prefix(self._summary_raw)
+        if summary != self.summary:
+            self.summary = summary
+            events.insert(0, ('summary', summary))
+        return events
+
+    def _step(self, ch: str, events: List[Tuple[str, str]]) -> None:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif ch == '\\':
+                self._escaped = True
+            elif ch == '"':
+                self._in_string = False
+                self._end_string(events)
+                return
+            if self._target:
+                self._raw.append(ch)
+            return
+        if ch.isspace():
+            return
+        if self._depth == 0:
+            if ch == '{':
+                self._depth = 1
+            return
+        if ch == '"':
+            self._in_string = True
+            self._raw = []
+            self._target = self._string_target()
+            return
+        if ch in '{[':
+            if self._depth == 1:
+                self._in_options = self._key == 'options' and ch == '['
+            elif self._depth == 2 and self._in_options:
+                # a non-string option ends the list, as in the reply
+                self._options_done = True
+            self._depth += 1
+        elif ch in '}]':
+            self._depth -= 1
+            if self._depth == 1:
+                if self._in_options:
+                    self._options_done = True
+                self._in_options = False
+                self._expect = 'comma'
+            elif self._depth == 0:
+                # the object is closed: nothing more can arrive
+                self._summary_done = self._options_done = True
+        elif self._depth == 1:
+            if ch == ':':
+                self._expect = 'value'
+            elif ch == ',':
+                self._expect = 'key'
+        elif self._depth == 2 and self._in_options and ch != ',':
+            self._options_done = True
+
+    def _string_target(self) -> str:
+        if self._depth == 1:
+            if self._expect == 'key':
+                return 'key'
+            if self._expect == 'value' and self._key == 'summary':
+                return 'summary'
+        elif self._depth == 2 and self._in_options:
+            if not self._options_done:
+                return 'option'
+        return ''
+
+    def _end_string(self, events: List[Tuple[str, str]]) -> None:
+        target, raw = self._target, ''.join(self._raw)
+        self._target, self._raw = '', []
+        if self._depth == 1:
+            if self._expect == 'key':
+                self._key = _decode_prefix(raw)
+                self._expect = 'colon'
+            else:
+                self._expect = 'comma'
+        if target == 'summary':
+            self._summary_raw = raw
+            self._summary_done = True
+        elif target == 'option':
+            option = _decode_prefix(raw)
+            self.options.append(option)
+            events.append(('option', option))
+
+
+__all__ = ['PartialDiagnosis']
@@ -20,4 +20,29 @@ class LLMDiagnosis(BaseModel):
         return cls.model_validate_json(cleaned)
 
 
-__all__ = ['LLMDiagnosis']
+class LLMDiagnosisWithExams(LLMDiagnosis):
+    """Differential diagnosis plus candidate exams for every option."""
+
+    exams: dict[str, list[str]] = Field(default_factory=dict)
+    exams_summary: str = Field('', max_length=800)
+
+    def exams_for(
+        self, selected: list[str], limit: int = 10
+    ) -> LLMDiagnosis | None:
+        """Merge the precomputed exams for *selected* diagnoses.
+
+        Returns ``None`` when any selection has no precomputed exams (for
+        example a diagnosis typed in by the physician), so the caller can
+        fall back to a dedicated exams request.
+        """
+        if not selected or any(dx not in self.exams for dx in selected):
+            return None
+        merged: list[str] = []
+        for dx in selected:
+            for exam in self.exams[dx]:
+                if exam not in merged:
+                    merged.append(exam)
+        return LLMDiagnosis(summary=self.exams_summary, options=merged[:limit])
+
+
+__all__ = ['LLMDiagnosis', 'LLMDiagnosisWithExams']
@@ -4,22 +4,27 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
 import warnings
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
 
 from dotenv import dotenv_values, load_dotenv
 from fastapi.testclient import TestClient
+from hiperhealth.agents import client as llm_client
 from hiperhealth.agents.extraction.medical_reports import (
     MedicalReportFileExtractor,
 )
 from hiperhealth.agents.extraction.wearable import WearableDataFileExtractor
+from hiperhealth.agents.settings import LLMSettings
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from research.app.main import app
+from research.app.main import app, get_repository
 from research.models.repositories import ResearchRepository
 from research.models.ui import Base
 
@@ -115,3 +120,174 @@ def test_repo(db_session):
 def client():
     """FastAPI test client fixture."""
     return TestClient(app)
+
+
+@pytest.fixture
+def app_repo(tmp_path):
+    """Serve the research app from a throwaway file-backed database.
+
+    A file is used instead of ``:memory:`` because the app handles requests
+    on another thread than the test.
+    """
+    app_engine = create_engine(
+        f'sqlite:///{tmp_path / "app.sqlite"}',
+        connect_args={'check_same_thread': False},
+    )
+    Base.metadata.create_all(bind=app_engine)
+    session = sessionmaker(autoflush=False, bind=app_engine)()
+    repo = ResearchRepository(session)
+    app.dependency_overrides[get_repository] = lambda: repo
+    try:
+        yield repo
+    finally:
+        app.dependency_overrides.pop(get_repository, None)
+        session.close()
+        app_engine.dispose()
+
+
+class FakeOpenAIServer:
+    """Local HTTP server speaking the chat-completions API.
+
+    Replies are taken from ``script`` in order (``(status, content,
+    delay)`` tuples); once it is exhausted ``default`` is used. Streaming
+    requests receive the content in ``chunk_size`` character deltas.
+    """
+
+    DEFAULT_CONTENT = json.dumps(
+        {'summary': 'Fake summary.', 'options': ['Flu', 'Cold']}
+    )
+
+    def __init__(self) -> None:
+        self.script: list[tuple[int, str, float]] = []
+        self.default = (200, self.DEFAULT_CONTENT, 0.0)
+        self.requests: list[dict] = []
+        self.chunk_size = 8
+        self.chunk_delay = 0.0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_port}/v1'
+
+    def push(self, status: int, content: str = '', delay: float = 0.0):
+        """Queue one scripted reply."""
+        self.script.append((status, content or self.DEFAULT_CONTENT, delay))
+
+    def _next(self, body: dict) -> tuple[int, str, float]:
+        with self._lock:
+            self.requests.append(body)
+            return self.script.pop(0) if self.script else self.default
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                status, content, delay = server._next(body)
+                time.sleep(delay)
+                if status == 200 and body.get('stream'):
+                    self._stream(body, content)
+                    return
+                if status == 200:
+                    payload = {
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion',
+                        'created': 0,
+                        'model': body.get('model', 'fake'),
+                        'choices': [
+                            {
+                                'index': 0,
+                                'finish_reason': 'stop',
+                                'message': {
+                                    'role': 'assistant',
+                                    'content': content,
+                                },
+                            }
+                        ],
+                        'usage': {
+                            'prompt_tokens': 11,
+                            'completion_tokens': 7,
+                            'total_tokens': 18,
+                        },
+                    }
+                else:
+                    payload = {'error': {'message': 'fake', 'type': 'fake'}}
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _stream(self, body: dict, content: str) -> None:
+                size = server.chunk_size
+                pieces = [
+                    content[i : i + size] for i in range(0, len(content), size)
+                ]
+                chunks = [
+                    {'choices': [{'index': 0, 'delta': {'content': piece}}]}
+                    for piece in pieces
+                ]
+                chunks.append(
+                    {
+                        'choices': [],
+                        'usage': {
+                            'prompt_tokens': 11,
+                            'completion_tokens': len(pieces),
+                            'total_tokens': 11 + len(pieces),
+                        },
+                    }
+                )
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.end_headers()
+                    for chunk in chunks:
+                        chunk.update(
+                            id='chatcmpl-fake',
+                            object='chat.completion.chunk',
+                            created=0,
+                            model=body.get('model', 'fake'),
+                        )
+                        line = f'data: {json.dumps(chunk)}\n\n'
+                        self.wfile.write(line.encode())
+                        self.wfile.flush()
+                        time.sleep(server.chunk_delay)
+                    self.wfile.write(b'data: [DONE]\n\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+@pytest.fixture
+def llm_server(tmp_path):
+    """Point the shared LLM client at a local fake completions server."""
+    server = FakeOpenAIServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    previous = llm_client.get_settings()
+    llm_client.configure(
+        LLMSettings(
+            api_key='test-key',
+            base_url=server.base_url,
+            raw_dir=tmp_path / 'llm_raw',
+            timeout=5.0,
+            deadline=5.0,
+            retry_base_delay=0.01,
+            retry_max_delay=0.02,
+        )
+    )
+    try:
+        yield server
+    finally:
+        llm_client.configure(previous)
+        server.httpd.shutdown()
+        server.httpd.server_close()
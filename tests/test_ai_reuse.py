@@ -0,0 +1,148 @@
+"""Tests for reusing stored AI outputs in the research app."""
+
+import asyncio
+
+from uuid import uuid4
+
+import pytest
+
+from hiperhealth.agents import client as llm_client
+from hiperhealth.agents.cache import MemoryCache
+
+from research.app import main
+
+
+@pytest.fixture
+def patient_id(app_repo, llm_server, monkeypatch):
+    """Create a consultation served by the fake LLM, without prefetching."""
+    monkeypatch.setattr(main, 'get_exam_prefetcher', lambda: None)
+    monkeypatch.setattr(main, 'get_job_queue', lambda: None)
+    monkeypatch.setenv('DIAGNOSIS_STREAMING', '0')
+    pid = str(uuid4())
+    app_repo.create_patient_and_consultation(
+        {
+            'meta': {'uuid': pid, 'lang': 'en'},
+            'patient': {'age': 40, 'gender': 'female'},
+        }
+    )
+    return pid
+
+
+def _consultation(repo, pid):
+    repo.db.expire_all()
+    return repo.get_patient_by_uuid(pid).consultations[-1]
+
+
+def test_diagnosis_reused_until_inputs_change(
+    client, app_repo, llm_server, patient_id
+):
+    """Refreshing the page does not call the model again."""
+    params = {'patient_id': patient_id}
+    first = client.get('/diagnosis', params=params)
+    second = client.get('/diagnosis', params=params)
+    assert first.status_code == second.status_code == 200
+    assert 'Fake summary.' in second.text
+    assert len(llm_server.requests) == 1
+    assert _consultation(app_repo, patient_id).ai_diag_fingerprint
+
+    _consultation(app_repo, patient_id).symptoms = 'fever'
+    app_repo.db.commit()
+    client.get('/diagnosis', params=params)
+    assert len(llm_server.requests) == 2
+
+
+def test_diagnosis_regenerate(client, app_repo, llm_server, patient_id):
+    """The regenerate action forces a fresh completion."""
+    params = {'patient_id': patient_id}
+    client.get('/diagnosis', params=params)
+    rsp = client.post('/diagnosis/regenerate', params=params)
+    assert rsp.status_code == 200
+    assert len(llm_server.requests) == 2
+
+
+def test_regenerate_bypasses_response_cache(
+    client, app_repo, llm_server, patient_id
+):
+    """Regenerating asks the model again even for a cached prompt."""
+    record = main.patient_to_dict(app_repo.get_patient_by_uuid(patient_id))
+    record['selected_diagnoses'] = ['Flu']
+    record['evaluations'] = {'ai_diag': {}, 'ai_exam': {}}
+    app_repo.update_consultation(patient_id, record)
+    params = {'patient_id': patient_id}
+    llm_client.set_cache(MemoryCache())
+    try:
+        client.get('/diagnosis', params=params)
+        client.post('/diagnosis/regenerate', params=params)
+        assert len(llm_server.requests) == 2
+        client.get('/exams', params=params)
+        client.post('/exams/regenerate', params=params)
+        assert len(llm_server.requests) == 4
+    finally:
+        llm_client.set_cache(None)
+
+
+def test_exams_reused_and_regenerated(
+    client, app_repo, llm_server, patient_id
+):
+    """Exams are served from storage until explicitly regenerated."""
+    record = main.patient_to_dict(app_repo.get_patient_by_uuid(patient_id))
+    record['selected_diagnoses'] = ['Flu']
+    record['evaluations'] = {'ai_diag': {}, 'ai_exam': {}}
+    app_repo.update_consultation(patient_id, record)
+
+    params = {'patient_id': patient_id}
+    client.get('/exams', params=params)
+    client.get('/exams', params=params)
+    assert len(llm_server.requests) == 1
+
+    rsp = client.post('/exams/regenerate', params=params)
+    assert rsp.status_code == 200
+    assert len(llm_server.requests) == 2
+    assert _consultation(app_repo, patient_id).ai_exam_fingerprint
+
+
+def test_stale_differential_exams_are_not_reused(
+    client, app_repo, llm_server, patient_id
+):
+    """Exams bundled with an outdated differential are asked for again."""
+    record = main.patient_to_dict(app_repo.get_patient_by_uuid(patient_id))
+    record['selected_diagnoses'] = ['Flu']
+    record['evaluations'] = {'ai_diag': {}, 'ai_exam': {}}
+    app_repo.update_consultation(patient_id, record)
+    consultation = _consultation(app_repo, patient_id)
+    consultation.ai_diag_raw = {
+        'summary': 'Old.',
+        'options': ['Flu'],
+        'exams': {'Flu': ['Stale test']},
+        'exams_summary': 'Old exams.',
+    }
+    consultation.ai_diag_fingerprint = 'outdated'
+    app_repo.db.commit()
+
+    page = client.get('/exams', params={'patient_id': patient_id})
+    assert 'Stale test' not in page.text
+    assert len(llm_server.requests) == 1
+
+
+def test_records_are_loaded_off_the_event_loop(
+    client, app_repo, llm_server, patient_id, monkeypatch
+):
+    """Queries and serialisation run in the threadpool, not the loop."""
+    on_loop = []
+    to_dict = main.patient_to_dict
+
+    def tracking(patient):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return to_dict(patient)
+
+    monkeypatch.setattr(main, 'patient_to_dict', tracking)
+    params = {'patient_id': patient_id}
+    assert client.get('/diagnosis', params=params).status_code == 200
+    assert client.get('/exams', params=params).status_code == 200
+    assert on_loop and not any(on_loop)
+    missing = {'patient_id': 'missing'}
+    assert client.get('/diagnosis/stream', params=missing).status_code == 404
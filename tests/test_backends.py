@@ -0,0 +1,164 @@
+"""Tests for pluggable LLM backends and the offline fake."""
+
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from hiperhealth.agents import client as llm_client
+from hiperhealth.agents import metrics
+from hiperhealth.agents.backends import Distribution, FakeBackend
+from hiperhealth.agents.settings import LLMSettings
+from hiperhealth.schema.clinical_outputs import (
+    LLMDiagnosis,
+    LLMDiagnosisWithExams,
+)
+from openai import APITimeoutError
+
+
+@pytest.fixture
+def fake_llm(tmp_path):
+    """Configure the client with the fake backend; yield a setter."""
+    previous = llm_client.get_settings()
+    llm_client.configure(
+        LLMSettings(
+            raw_dir=tmp_path / 'llm_raw',
+            backend='fake',
+            fake_latency='fixed:0',
+            deadline=5.0,
+            retry_base_delay=0.0,
+            retry_max_delay=0.0,
+        )
+    )
+
+    def _use(**kwargs) -> FakeBackend:
+        backend = FakeBackend(**kwargs)
+        llm_client.set_backend(backend)
+        return backend
+
+    try:
+        yield _use
+    finally:
+        llm_client.configure(previous)
+
+
+@pytest.fixture
+def recorded():
+    """Collect the metrics of every LLM call made by the test."""
+    calls: list[metrics.CallMetrics] = []
+    sink = metrics.add_sink(metrics.CallbackSink(calls.append))
+    yield calls
+    metrics.remove_sink(sink)
+
+
+@pytest.mark.parametrize(
+    'spec, low, high',
+    [
+        ('0.25', 0.25, 0.25),
+        ('uniform:1,2', 1.0, 2.0),
+        ('lognormal:0.5,0.3', 0.0, 5.0),
+        ('normal:-5,1', 0.0, 0.0),
+    ],
+)
+def test_distribution_samples(spec, low, high):
+    """Specs parse and samples stay in range (never negative)."""
+    dist = Distribution.parse(spec)
+    rng = random.Random(1)
+    assert all(low <= dist.sample(rng) <= high for _ in range(200))
+
+
+def test_distribution_rejects_bad_specs():
+    """Unknown kinds and wrong arity are reported."""
+    with pytest.raises(ValueError):
+        Distribution.parse('gamma:1,2')
+    with pytest.raises(ValueError):
+        Distribution.parse('uniform:1')
+
+
+def test_settings_select_fake_backend(fake_llm):
+    """``LLM_BACKEND=fake`` answers with schema-valid differentials."""
+    assert isinstance(llm_client.get_backend(), FakeBackend)
+    first = llm_client.chat('sys', '{"age": 40}', schema=LLMDiagnosisWithExams)
+    again = llm_client.chat('sys', '{"age": 40}', schema=LLMDiagnosisWithExams)
+    assert first == again
+    assert len(first.options) == 3
+    assert set(first.exams) == set(first.options)
+
+
+def test_fake_answers_exam_requests(fake_llm):
+    """A JSON list of diagnoses is answered with exams."""
+    result = llm_client.chat('sys', json.dumps(['Influenza', 'Unknown']))
+    assert result.options == [
+        'Rapid influenza test',
+        'Complete blood count',
+        'Clinical examination',
+    ]
+
+
+def test_fake_errors_are_retried(fake_llm, recorded):
+    """Injected 429/500 errors go through the normal retry loop."""
+    backend = fake_llm(error_rate=0.5, seed=3)
+    for i in range(10):
+        llm_client.chat('sys', f'user {i}')
+    assert backend.calls == 10 + sum(c.retries for c in recorded)
+    assert sum(c.retries for c in recorded) > 0
+
+
+def test_fake_invalid_replies_are_reasked(fake_llm, recorded):
+    """Invalid replies trigger the corrective re-ask."""
+    fake_llm(invalid_rate=1.0)
+    with pytest.raises(Exception):
+        llm_client.chat('sys', 'user')
+    assert recorded[-1].reasked
+
+
+def test_fake_latency_and_tokens(fake_llm, recorded):
+    """Latency and completion tokens follow the configured specs."""
+    fake_llm(latency='fixed:0.05', tokens='fixed:120')
+    result = llm_client.chat('sys', 'user')
+    (call,) = recorded
+    assert call.wall_time >= 0.05
+    assert call.ttfb is not None and call.ttfb >= 0.05
+    assert call.completion_tokens == 120
+    assert call.prompt_tokens > 0
+    assert 'Findings are consistent' in result.summary
+
+
+def test_fake_timeout_is_retryable(fake_llm, recorded):
+    """A sampled latency above the timeout raises a retryable timeout."""
+    llm_client.configure(timeout=0.02)
+    fake_llm(latency='fixed:10')
+    with pytest.raises(APITimeoutError):
+        llm_client.chat('sys', 'user')
+    assert recorded[-1].retries == llm_client.get_settings().max_attempts - 1
+
+
+def test_fake_streams(fake_llm, recorded):
+    """Sync and async streams reassemble into the validated reply."""
+    fake_llm(chunk_size=5)
+    *deltas, result = list(llm_client.chat_stream('sys', 'a'))
+    assert len(deltas) > 1
+    assert LLMDiagnosis.from_llm(''.join(deltas)) == result
+
+    async def _collect() -> list:
+        return [item async for item in llm_client.achat_stream('sys', 'b')]
+
+    *deltas, result = asyncio.run(_collect())
+    assert LLMDiagnosis.from_llm(''.join(deltas)) == result
+    assert all(c.completion_tokens > 0 for c in recorded)
+
+
+def test_fake_runs_concurrently(fake_llm):
+    """Async calls overlap instead of queueing behind each other."""
+    fake_llm(latency='fixed:0.1')
+
+    async def _many() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(llm_client.achat('sys', f'user {i}') for i in range(20))
+        )
+        return time.perf_counter() - start
+
+    assert asyncio.run(_many()) < 1.0
@@ -0,0 +1,93 @@
+"""Tests for the cohort differential runner."""
+
+import asyncio
+import json
+import time
+
+from pathlib import Path
+
+from hiperhealth.agents.diagnostics import batch
+
+PATIENTS = Path(__file__).parent / 'data' / 'patients' / 'patients.json'
+
+
+def _rows(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_run_cohort_with_stub_backend(tmp_path):
+    """The stub backend scores every record offline."""
+    records = batch.load_records(PATIENTS)
+    output = tmp_path / 'out.jsonl'
+    seen = []
+
+    counts = batch.run_cohort(
+        records,
+        output,
+        backend=batch.stub_differential,
+        concurrency=2,
+        progress=seen.append,
+        label='stub',
+    )
+
+    assert counts == {'ok': len(records), 'failed': 0, 'skipped': 0}
+    rows = _rows(output)
+    assert {r['id'] for r in rows} == {r['meta']['uuid'] for r in records}
+    assert all(r['label'] == 'stub' for r in rows)
+    assert all(len(r['result']['options']) == 3 for r in rows)
+    assert len(seen) == len(records)
+
+
+def test_run_cohort_resumes_and_retries_failures(tmp_path):
+    """Successful ids are skipped on resume, failed ones are retried."""
+    records = batch.load_records(PATIENTS)
+    output = tmp_path / 'out.jsonl'
+    failing = records[0]['meta']['uuid']
+
+    async def flaky(patient, language='en', session_id=None):
+        if session_id == failing:
+            raise RuntimeError('upstream unavailable')
+        return await batch.stub_differential(patient, language, session_id)
+
+    first = batch.run_cohort(records, output, backend=flaky)
+    assert first == {'ok': 2, 'failed': 1, 'skipped': 0}
+
+    second = batch.run_cohort(records, output, backend=batch.stub_differential)
+    assert second == {'ok': 1, 'failed': 0, 'skipped': 2}
+    assert batch.completed_ids(output) == {r['meta']['uuid'] for r in records}
+
+
+def test_rate_limiter_throttles():
+    """Requests beyond the per-minute budget wait for the bucket."""
+
+    async def _run() -> float:
+        limiter = batch.RateLimiter(per_minute=600)  # 10 per second
+        await limiter.acquire(600)
+        start = time.monotonic()
+        await limiter.acquire(2)
+        return time.monotonic() - start
+
+    assert asyncio.run(_run()) >= 0.15
+
+
+def test_run_cohort_pulls_records_lazily(tmp_path):
+    """Workers take records from the iterator only as they free up."""
+    records = batch.load_records(PATIENTS) * 4
+    pulled = []
+    running = []
+
+    def feed():
+        for record in records:
+            pulled.append(record)
+            yield record
+
+    async def backend(patient, language='en', session_id=None):
+        running.append(len(pulled))
+        await asyncio.sleep(0)
+        return await batch.stub_differential(patient, language, session_id)
+
+    counts = batch.run_cohort(
+        feed(), tmp_path / 'out.jsonl', backend=backend, concurrency=2
+    )
+    assert counts == {'ok': len(records), 'failed': 0, 'skipped': 0}
+    assert max(n - i for i, n in enumerate(running)) <= 2
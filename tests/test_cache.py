@@ -0,0 +1,125 @@
+"""Tests for the LLM response cache."""
+
+import json
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from hiperhealth.agents import client
+from hiperhealth.agents.cache import (
+    MemoryCache,
+    SQLiteCache,
+    make_cache_key,
+)
+
+REPLY = json.dumps({'summary': 'Short summary.', 'options': ['Flu']})
+
+
+def test_cache_key_ignores_json_formatting():
+    """Equivalent user payloads produce the same key."""
+    a = make_cache_key('m', 'sys', '{"age": 30, "gender": "F"}')
+    b = make_cache_key('m', 'sys', '{"gender":"F","age":30}')
+    assert a == b
+    assert a != make_cache_key('other', 'sys', '{"age": 30, "gender": "F"}')
+    assert a != make_cache_key('m', 'sys2', '{"age": 30, "gender": "F"}')
+
+
+def test_memory_cache_lru_and_counters():
+    """The in-memory cache evicts the least recently used entry."""
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('c') == '3'
+    assert cache.stats == {'hits': 2, 'misses': 1}
+
+
+def test_counters_survive_concurrent_lookups():
+    """Hits and misses from many threads are all counted."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    cache = MemoryCache()
+    cache.set('a', '1')
+
+    def lookups(n):
+        for i in range(2000):
+            cache.get('a' if i % 2 else 'b')
+
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lookups, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert cache.stats == {'hits': 8000, 'misses': 8000}
+
+
+def test_memory_cache_ttl():
+    """Expired entries are treated as misses."""
+    cache = MemoryCache(ttl=0.01)
+    cache.set('a', '1')
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_persists(tmp_path):
+    """Entries survive reopening the SQLite database."""
+    path = tmp_path / 'cache.sqlite'
+    cache = SQLiteCache(path)
+    cache.set('a', '1')
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get('a') == '1'
+    assert reopened.get('b') is None
+    assert reopened.stats == {'hits': 1, 'misses': 1}
+    reopened.clear()
+    assert reopened.get('a') is None
+    reopened.close()
+
+
+@pytest.fixture
+def fake_sync(monkeypatch):
+    """Replace the sync OpenAI client with a call-counting fake."""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=REPLY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    fake = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(client, 'get_client', lambda: fake)
+    monkeypatch.setattr(client, 'dump_llm_json', lambda text, sid: None)
+    cache = MemoryCache()
+    client.set_cache(cache)
+    yield calls, cache
+    client.set_cache(None)
+
+
+def test_refresh_skips_and_replaces_cached_reply(fake_sync):
+    """refresh=True always calls the model and re-caches the reply."""
+    calls, cache = fake_sync
+    client.chat('sys', '{"age": 30}')
+    client.chat('sys', '{"age": 30}', refresh=True)
+    client.chat('sys', '{"age": 30}')
+    assert len(calls) == 2
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_chat_serves_repeated_prompt_from_cache(fake_sync):
+    """A repeated prompt does not reach the completion API."""
+    calls, cache = fake_sync
+    first = client.chat('sys', '{"age": 30}')
+    second = client.chat('sys', '{ "age" : 30 }')
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats == {'hits': 1, 'misses': 1}
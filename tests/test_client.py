@@ -0,0 +1,71 @@
+"""Tests for the shared LLM client helpers."""
+
+import asyncio
+import json
+
+from types import SimpleNamespace
+
+import pytest
+
+from hiperhealth.agents import client
+from hiperhealth.agents.diagnostics import core as diag
+
+REPLY = json.dumps({'summary': 'Short summary.', 'options': ['Flu', 'Cold']})
+
+
+class _FakeCompletions:
+    """Record calls and return a canned chat completion."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[dict] = []
+        self.delay = delay
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content=REPLY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_async(monkeypatch):
+    """Replace the pooled async client with an in-process fake."""
+    completions = _FakeCompletions(delay=0.05)
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(client, 'get_async_client', lambda: fake)
+    monkeypatch.setattr(client, 'dump_llm_json', lambda text, sid: None)
+    return completions
+
+
+def test_get_async_client_is_shared():
+    """The pooled async client is created once and reused."""
+    assert client.get_async_client() is client.get_async_client()
+
+
+def test_achat_passes_timeout(fake_async):
+    """A per-call timeout is forwarded to the completion request."""
+    result = asyncio.run(client.achat('sys', 'user', timeout=3.5))
+    assert result.options == ['Flu', 'Cold']
+    assert fake_async.calls[0]['timeout'] == 3.5
+
+
+def test_async_diagnostics_run_concurrently(fake_async):
+    """Many async differentials overlap instead of running back to back."""
+
+    async def _run() -> list:
+        return await asyncio.gather(
+            *(diag.adifferential({'age': i}) for i in range(20)),
+            diag.aexams(['Flu']),
+        )
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = loop.time()
+        results = loop.run_until_complete(_run())
+        elapsed = loop.time() - start
+    finally:
+        loop.close()
+
+    assert len(results) == 21
+    assert len(fake_async.calls) == 21
+    assert elapsed < 0.05 * 21 / 2
@@ -0,0 +1,76 @@
+"""Tests for the diagnostics helpers."""
+
+import json
+
+from types import SimpleNamespace
+
+import pytest
+
+from hiperhealth.agents import client
+from hiperhealth.agents.diagnostics import core as diag
+from hiperhealth.schema.clinical_outputs import LLMDiagnosisWithExams
+
+COMBINED = {
+    'summary': 'Epigastric pain radiating to the back.',
+    'options': ['Acute pancreatitis', 'Peptic ulcer'],
+    'exams': {
+        'Acute pancreatitis': ['Serum lipase', 'Abdominal CT'],
+        'Peptic ulcer': ['Upper endoscopy', 'Serum lipase'],
+    },
+    'exams_summary': 'Confirm pancreatic injury and rule out ulcer.',
+}
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    """Serve a canned combined reply from a fake sync client."""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=json.dumps(COMBINED))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    fake = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(client, 'get_client', lambda: fake)
+    monkeypatch.setattr(client, 'dump_llm_json', lambda text, sid: None)
+    return calls
+
+
+def test_differential_with_exams(fake_chat):
+    """The combined mode returns options and exams in one call."""
+    result = diag.differential_with_exams({'age': 40}, language='pt')
+    assert isinstance(result, LLMDiagnosisWithExams)
+    assert result.options == COMBINED['options']
+    assert result.exams['Peptic ulcer'] == ['Upper endoscopy', 'Serum lipase']
+    assert len(fake_chat) == 1
+    assert 'exams_summary' in fake_chat[0]['messages'][0]['content']
+
+
+def test_exams_for_merges_selected_options():
+    """Exams of the selected options are merged without duplicates."""
+    combined = LLMDiagnosisWithExams.model_validate(COMBINED)
+    exams = combined.exams_for(['Acute pancreatitis', 'Peptic ulcer'])
+    assert exams is not None
+    assert exams.summary == COMBINED['exams_summary']
+    assert exams.options == [
+        'Serum lipase',
+        'Abdominal CT',
+        'Upper endoscopy',
+    ]
+    assert combined.exams_for(['Acute pancreatitis', 'Custom dx']) is None
+    assert combined.exams_for([]) is None
+
+
+def test_precomputed_exams_from_stored_raw():
+    """Stored differentials without an exams mapping fall back to None."""
+    selected = ['Peptic ulcer']
+    assert diag.precomputed_exams(COMBINED, selected).options == [
+        'Upper endoscopy',
+        'Serum lipase',
+    ]
+    plain = {'summary': 's', 'options': ['Peptic ulcer']}
+    assert diag.precomputed_exams(plain, selected) is None
+    assert diag.precomputed_exams(None, selected) is None
@@ -6,7 +6,12 @@ from pathlib import Path
 
 import pytest
 
-from hiperhealth.agents.extraction.wearable import WearableDataExtractorError
+from hiperhealth.agents.extraction import wearable
+from hiperhealth.agents.extraction.wearable import (
+    SNIFF_BYTES,
+    FileProcessingError,
+    WearableDataExtractorError,
+)
 
 TEST_DATA_PATH = Path(__file__).parent / 'data' / 'wearable'
 JSON_FILE = TEST_DATA_PATH / 'wearable_data.json'
@@ -107,3 +112,43 @@ def test_support_inmemory_csv(wearable_extractor):
     assert len(wearable_data) == 4
     assert wearable_data[0]['name'] == 'John Doe'
     assert wearable_data[1]['heart_rate'] == 80
+
+
+def test_inmemory_upload_is_parsed_once(wearable_extractor, monkeypatch):
+    """Detection only reads a prefix; the file is parsed a single time."""
+    calls = []
+    real_load = wearable.json.load
+
+    def _load(*args, **kwargs):
+        calls.append(1)
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(wearable.json, 'load', _load)
+    rows = [{'heart_rate': 60 + i % 40, 'steps': i} for i in range(20_000)]
+    upload = io.BytesIO(wearable.json.dumps(rows).encode())
+    assert upload.getbuffer().nbytes > SNIFF_BYTES
+
+    assert wearable_extractor.extract_wearable_data(upload) == rows
+    assert calls == [1]
+    assert not upload.closed
+
+
+def test_sniff_handles_truncated_prefix(wearable_extractor):
+    """A CSV larger than the sniff window is still recognised."""
+    body = 'heart_rate,note\n' + 'é70,ok\n' * SNIFF_BYTES
+    upload = io.BytesIO(('\ufeff' + body).encode())
+    assert wearable_extractor._is_csv(upload)
+
+    data = wearable_extractor.extract_wearable_data(upload)
+    assert len(data) == SNIFF_BYTES
+    assert data[0] == {'heart_rate': 'é70', 'note': 'ok'}
+
+
+def test_malformed_inmemory_json_is_rejected(wearable_extractor):
+    """Broken JSON fails during the single parse with a clear error."""
+    upload = io.BytesIO(b'[{"heart_rate": 70},')
+    assert wearable_extractor._is_json(upload)
+    with pytest.raises(FileProcessingError):
+        wearable_extractor.extract_wearable_data(upload)
+    with pytest.raises(FileProcessingError):
+        wearable_extractor.extract_wearable_data(io.BytesIO(b'\xff\xfe'))
@@ -0,0 +1,47 @@
+"""Import-time regression tests for the hiperhealth package."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI runners, but far below the ~1s it took when
+# the client eagerly imported openai/fastapi and built its clients.
+IMPORT_BUDGET_SECONDS = 0.75
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'heavy': [m for m in ('openai', 'fastapi', 'httpx') if m in sys.modules],
+}}))
+"""
+
+
+def _probe(module: str, cwd) -> dict:
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+@pytest.mark.parametrize(
+    'module', ['hiperhealth', 'hiperhealth.agents.diagnostics.core']
+)
+def test_import_is_fast_and_side_effect_free(module, tmp_path):
+    """Importing the package neither loads SDKs nor touches the CWD."""
+    result = min(
+        (_probe(module, tmp_path) for _ in range(3)),
+        key=lambda r: r['elapsed'],
+    )
+    assert result['heavy'] == []
+    assert result['elapsed'] < IMPORT_BUDGET_SECONDS
+    assert list(tmp_path.iterdir()) == []
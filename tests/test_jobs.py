@@ -0,0 +1,218 @@
+"""Tests for the research app's background job queue."""
+
+import threading
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from sqlalchemy.orm import sessionmaker
+
+from research.app import main
+from research.app.jobs import JobQueue
+from research.models.ui import Job
+
+
+@pytest.fixture
+def session_factory(app_repo):
+    """Return a session factory bound to the test app database."""
+    return sessionmaker(autoflush=False, bind=app_repo.db.get_bind())
+
+
+def test_jobs_run_by_priority_and_persist(session_factory):
+    """Higher priority jobs run first; results are stored, inputs dropped."""
+    gate = threading.Event()
+    order = []
+    jobs = JobQueue(session_factory, max_workers=1)
+    jobs.register('block', lambda payload, db: gate.wait(5))
+    jobs.register('echo', lambda payload, db: order.append(payload['n']))
+    jobs.start()
+
+    jobs.submit('block', {})
+    low = jobs.submit('echo', {'n': 'low'}, priority=9)
+    high = jobs.submit('echo', {'n': 'high'}, priority=1)
+    gate.set()
+    jobs.join()
+    jobs.shutdown()
+
+    assert order == ['high', 'low']
+    assert jobs.get(low)['status'] == 'done'
+    with session_factory() as db:
+        assert db.get(Job, high).payload is None
+
+
+def test_failed_job_records_error(session_factory):
+    """Handler exceptions mark the job as failed with a message."""
+
+    def boom(payload, db):
+        raise RuntimeError('extraction failed')
+
+    jobs = JobQueue(session_factory, max_workers=1)
+    jobs.register('boom', boom)
+    jobs.start()
+    job_id = jobs.submit('boom', {})
+    jobs.join()
+    jobs.shutdown()
+
+    job = jobs.get(job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == 'extraction failed'
+
+
+def test_unfinished_jobs_resume_on_start(session_factory):
+    """Jobs left running by a previous process are executed again."""
+    with session_factory() as db:
+        db.add(
+            Job(
+                id='interrupted',
+                kind='echo',
+                status='running',
+                priority=0,
+                payload={'n': 1},
+                created_at=datetime.utcnow(),
+            )
+        )
+        db.commit()
+
+    seen = []
+    jobs = JobQueue(session_factory, max_workers=1)
+    jobs.register('echo', lambda payload, db: seen.append(payload['n']))
+    jobs.start()
+    jobs.join()
+    jobs.shutdown()
+
+    assert seen == [1]
+    assert jobs.get('interrupted')['status'] == 'done'
+
+
+def test_only_expired_leases_are_reclaimed(session_factory):
+    """A job another live process holds is left to it."""
+    now = datetime.utcnow()
+    with session_factory() as db:
+        for job_id, lease in (
+            ('live', now + timedelta(minutes=5)),
+            ('expired', now - timedelta(seconds=1)),
+        ):
+            db.add(
+                Job(
+                    id=job_id,
+                    kind='echo',
+                    status='running',
+                    priority=0,
+                    payload={'n': job_id},
+                    created_at=now,
+                    owner='other-host:1:abc',
+                    lease_expires_at=lease,
+                )
+            )
+        db.commit()
+
+    seen = []
+    jobs = JobQueue(session_factory, max_workers=1)
+    jobs.register('echo', lambda payload, db: seen.append(payload['n']))
+    jobs.start()
+    jobs.join()
+    jobs.shutdown()
+
+    assert seen == ['expired']
+    assert jobs.get('live')['status'] == 'running'
+    assert jobs.get('expired')['status'] == 'done'
+
+
+def test_claims_are_exclusive_and_leases_renewed(session_factory):
+    """Two queues never run the same job; the runner keeps its lease."""
+    gate = threading.Event()
+    runs = []
+
+    def slow(payload, db):
+        runs.append(payload['n'])
+        gate.wait(5)
+
+    first = JobQueue(session_factory, max_workers=1, lease_seconds=0.3)
+    second = JobQueue(session_factory, max_workers=1, lease_seconds=0.3)
+    for jobs in (first, second):
+        jobs.register('slow', slow)
+    job_id = first.submit('slow', {'n': 1})
+    first.start()
+    second.start()
+    second._push(0, job_id)
+
+    threading.Event().wait(1)
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert job.owner == first.owner
+        assert job.lease_expires_at > datetime.utcnow()
+    second._reclaim()
+    gate.set()
+    for jobs in (first, second):
+        jobs.join()
+        jobs.shutdown()
+
+    assert runs == [1]
+    assert first.get(job_id)['status'] == 'done'
+
+
+def test_submit_dedupes_active_jobs(session_factory):
+    """A second request for the same patient reuses the queued job."""
+    jobs = JobQueue(session_factory, max_workers=1)
+    jobs.register('echo', lambda payload, db: None)
+    first = jobs.submit('echo', {}, patient_id='p1')
+    assert jobs.submit('echo', {}, patient_id='p1') == first
+    assert jobs.submit('echo', {}, patient_id='p1', dedupe=False) != first
+
+
+def test_diagnosis_page_enqueues_and_polls(
+    client, app_repo, llm_server, session_factory, monkeypatch
+):
+    """The page hands the differential to a worker and shows the result."""
+    jobs = main.build_job_queue(session_factory, max_workers=2).start()
+    monkeypatch.setattr(main, 'get_job_queue', lambda: jobs)
+    monkeypatch.setattr(main, 'get_exam_prefetcher', lambda: None)
+    monkeypatch.setenv('DIAGNOSIS_STREAMING', '0')
+    patient_id = str(uuid4())
+    app_repo.create_patient_and_consultation(
+        {
+            'meta': {'uuid': patient_id, 'lang': 'en'},
+            'patient': {'age': 40, 'gender': 'female'},
+        }
+    )
+    params = {'patient_id': patient_id}
+
+    rsp = client.get('/diagnosis', params=params, follow_redirects=False)
+    assert rsp.status_code == 303
+    wait_url = rsp.headers['location']
+    job_id = wait_url.split('/')[2]
+    assert client.get(wait_url).status_code == 200
+
+    jobs.join()
+    jobs.shutdown()
+    status = client.get(f'/jobs/{job_id}').json()
+    assert status['status'] == 'done'
+    assert status['result']['options'] == ['Flu', 'Cold']
+    assert client.get('/jobs', params=params).json()[0]['id'] == job_id
+
+    page = client.get('/diagnosis', params=params, follow_redirects=False)
+    assert page.status_code == 200
+    assert 'Fake summary.' in page.text
+    assert len(llm_server.requests) == 1
+    assert client.get('/jobs/missing').status_code == 404
+
+
+def test_reports_job_discards_spooled_files(session_factory, tmp_path):
+    """Spooled uploads are deleted even when the job fails early."""
+    spool = tmp_path / 'batch'
+    spool.mkdir()
+    report = spool / '000.pdf'
+    report.write_bytes(b'%PDF-1.4')
+    payload = {
+        'patient_id': 'missing',
+        'files': [{'path': str(report), 'filename': 'labs.pdf'}],
+    }
+    with session_factory() as db, pytest.raises(LookupError):
+        main._reports_job(payload, db)
+    assert not spool.exists()
+    if 'JOB_SPOOL_DIR' not in main.os.environ:
+        assert main.PROJECT_ROOT.resolve() not in (
+            main.JOB_SPOOL_DIR.resolve().parents
+        )
@@ -0,0 +1,133 @@
+"""Tests for the raw LLM reply journal."""
+
+import json
+import multiprocessing
+
+import pytest
+
+from hiperhealth.agents.journal import JournalReader, RawResponseJournal
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_journal_round_trip(tmp_path, compress):
+    """Records written in batches can be iterated and looked up."""
+    journal = RawResponseJournal(
+        tmp_path, compress=compress, flush_interval=0.01
+    )
+    for i in range(10):
+        journal.append(f'{{"n": {i}}}', session_id=f'sid-{i % 3}')
+    journal.append('{}', session_id=None)
+    journal.close()
+
+    reader = JournalReader(tmp_path)
+    records = list(reader.iter_records())
+    assert len(records) == 11
+    assert [r['raw'] for r in records[:2]] == ['{"n": 0}', '{"n": 1}']
+
+    found = reader.lookup('sid-1')
+    assert [r['raw'] for r in found] == ['{"n": 1}', '{"n": 4}', '{"n": 7}']
+    assert reader.lookup('missing') == []
+    assert None not in reader.index()
+
+
+def test_journal_rotates_segments(tmp_path):
+    """A new segment is started once the current one exceeds its size."""
+    journal = RawResponseJournal(
+        tmp_path, max_segment_bytes=64, flush_interval=0
+    )
+    for i in range(5):
+        journal.append('x' * 50, session_id=f'sid-{i}')
+        journal.flush()
+    journal.close()
+
+    segments = sorted(p.name for p in tmp_path.glob('segment-*'))
+    assert len(segments) == 5
+    index = JournalReader(tmp_path).index()
+    assert index['sid-4'] == [segments[-1]]
+    assert len(JournalReader(tmp_path).lookup('sid-4')) == 1
+
+
+def test_journal_prunes_old_segments(tmp_path):
+    """Old segments and their index entries are dropped past the limit."""
+    journal = RawResponseJournal(
+        tmp_path, max_segment_bytes=64, flush_interval=0, max_segments=2
+    )
+    reader = journal.reader()
+    for i in range(5):
+        journal.append('x' * 50, session_id=f'sid-{i}')
+        journal.flush()
+        assert len(reader.lookup(f'sid-{i}')) == 1
+    journal.close()
+
+    segments = sorted(p.name for p in tmp_path.glob('segment-*'))
+    assert len(segments) == 2
+    assert reader.index() == {'sid-3': [segments[0]], 'sid-4': [segments[1]]}
+    assert reader.lookup('sid-0') == []
+    index = (tmp_path / 'index.jsonl').read_text().splitlines()
+    assert len(index) == 2
+
+
+def test_reader_reads_only_new_index_lines(tmp_path, monkeypatch):
+    """Lookups parse the index lines appended since the previous one."""
+    journal = RawResponseJournal(tmp_path, flush_interval=0)
+    reader = journal.reader()
+    parsed = []
+    loads = json.loads
+    monkeypatch.setattr(
+        'hiperhealth.agents.journal.json.loads',
+        lambda text: parsed.append(text) or loads(text),
+    )
+    for i in range(3):
+        journal.append('{}', session_id=f'sid-{i}')
+        journal.flush()
+        reader.lookup(f'sid-{i}')
+    journal.close()
+    index_lines = [text for text in parsed if isinstance(text, bytes)]
+    assert len(index_lines) == 3
+
+
+def test_journal_resumes_existing_directory(tmp_path):
+    """Reopening a journal appends to the last segment."""
+    first = RawResponseJournal(tmp_path, flush_interval=0)
+    first.append('a', session_id='s')
+    first.close()
+
+    second = RawResponseJournal(tmp_path, flush_interval=0)
+    second.append('b', session_id='s')
+    second.close()
+
+    assert len(list(tmp_path.glob('segment-*'))) == 1
+    assert [r['raw'] for r in JournalReader(tmp_path).lookup('s')] == [
+        'a',
+        'b',
+    ]
+
+
+def _write_many(directory, name):
+    journal = RawResponseJournal(
+        directory, max_segment_bytes=256 * 1024, flush_interval=0.01
+    )
+    for i in range(200):
+        # batches larger than one write() may interleave without the lock
+        journal.append(f'{name}-{i}' + ' ' * 4096, session_id=name)
+    journal.close()
+
+
+def test_journal_processes_share_a_directory(tmp_path):
+    """Concurrent writer processes neither interleave nor lose records."""
+    context = multiprocessing.get_context('spawn')
+    writers = [
+        context.Process(target=_write_many, args=(tmp_path, f'p{n}'))
+        for n in range(3)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(30)
+        assert writer.exitcode == 0
+
+    reader = JournalReader(tmp_path)
+    assert len(list(reader.iter_records())) == 600
+    for n in range(3):
+        raws = [r['raw'].rstrip() for r in reader.lookup(f'p{n}')]
+        assert raws == [f'p{n}-{i}' for i in range(200)]
@@ -0,0 +1,91 @@
+"""Tests for per-call LLM metrics."""
+
+import pytest
+
+from hiperhealth.agents import client as llm_client
+from hiperhealth.agents import metrics
+from hiperhealth.agents.cache import MemoryCache
+
+
+@pytest.fixture
+def recorded():
+    """Collect the metrics of every LLM call made by the test."""
+    calls: list[metrics.CallMetrics] = []
+    sink = metrics.add_sink(metrics.CallbackSink(calls.append))
+    yield calls
+    metrics.remove_sink(sink)
+
+
+def test_percentile_interpolates():
+    """Quantiles interpolate between neighbouring samples."""
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert metrics.percentile(values, 0.5) == 2.5
+    assert metrics.percentile(values, 1.0) == 4.0
+
+
+def test_registry_summary_and_prometheus():
+    """The registry aggregates counters and per-model percentiles."""
+    registry = metrics.MetricsRegistry(window=3)
+    for i in range(5):
+        registry.record(
+            metrics.CallMetrics(
+                model='m',
+                language='en',
+                wall_time=float(i),
+                prompt_tokens=10,
+                retries=1,
+            )
+        )
+    summary = registry.summary()
+    assert summary['totals']['calls'] == 5
+    assert summary['totals']['prompt_tokens'] == 50
+    assert summary['window']['calls'] == 3
+    assert summary['by_model']['m']['wall_time']['p50'] == 3.0
+
+    text = registry.render_prometheus()
+    assert 'hiperhealth_llm_retries_total 5' in text
+    assert 'hiperhealth_llm_wall_time_seconds{model="m",quantile="0.5"}' in (
+        text
+    )
+
+
+def test_chat_reports_usage_and_timings(llm_server, recorded):
+    """Tokens, retries, TTFB and language are captured per call."""
+    llm_server.push(429)
+    llm_client.chat('sys', 'user', session_id='s1', language='pt')
+
+    (call,) = recorded
+    assert call.ok and not call.cache_hit
+    assert call.retries == 1
+    assert (call.prompt_tokens, call.completion_tokens) == (11, 7)
+    assert call.language == 'pt'
+    assert call.session_id == 's1'
+    assert call.ttfb is not None
+    assert 0 < call.ttfb <= call.wall_time
+
+
+def test_cache_hits_and_failures_are_reported(llm_server, recorded):
+    """Cache hits cost no tokens and failed calls are flagged."""
+    llm_client.set_cache(MemoryCache())
+    llm_client.chat('sys', 'user')
+    llm_client.chat('sys', 'user')
+    assert [c.cache_hit for c in recorded] == [False, True]
+    assert recorded[1].total_tokens == 0
+
+    llm_server.push(400)
+    with pytest.raises(Exception):
+        llm_client.chat('sys', 'other')
+    assert recorded[-1].ok is False
+    assert recorded[-1].error == 'BadRequestError'
+
+
+def test_metrics_endpoint(client):
+    """The research app exposes JSON and Prometheus views."""
+    metrics.registry.record(metrics.CallMetrics(model='m', wall_time=0.2))
+
+    body = client.get('/metrics').json()
+    assert body['totals']['calls'] >= 1
+    assert 'p95' in body['window']['wall_time']
+
+    text = client.get('/metrics', params={'format': 'prometheus'}).text
+    assert 'hiperhealth_llm_calls_total' in text
@@ -0,0 +1,80 @@
+"""Tests for the shared MIME detection service."""
+
+import io
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from hiperhealth.agents.extraction.medical_reports import (
+    get_medical_report_extractor,
+)
+from hiperhealth.agents.extraction.mime import (
+    MimeDetector,
+    get_mime_detector,
+    sniff,
+)
+from hiperhealth.agents.extraction.wearable import (
+    get_wearable_data_extractor,
+)
+
+DATA = Path(__file__).parent / 'data'
+PNG = DATA / 'reports' / 'image_reports' / 'image-1.png'
+CSV_FILE = DATA / 'wearable' / 'wearable_data.csv'
+JSON_FILE = DATA / 'wearable' / 'wearable_data.json'
+
+
+def test_signatures_skip_libmagic():
+    """PDF, PNG and JPEG headers are recognised without libmagic."""
+    assert sniff(b'%PDF-1.7\n') == 'application/pdf'
+    assert sniff(b'\xff\xd8\xff\xe0') == 'image/jpeg'
+    assert sniff(b'plain text') is None
+
+    detector = MimeDetector()
+    assert detector.detect(PNG) == 'image/png'
+    assert detector.detect(io.BytesIO(PNG.read_bytes())) == 'image/png'
+    assert detector.magic_calls == 0
+    assert detector._magic is None
+
+
+def test_text_formats_use_libmagic_once_loaded():
+    """CSV and JSON fall back to the single libmagic handle."""
+    detector = MimeDetector()
+    assert detector.detect(CSV_FILE) == 'text/csv'
+    handle = detector._magic
+    assert detector.detect(JSON_FILE) == 'application/json'
+    assert detector._magic is handle
+    assert detector.magic_calls == 2
+
+
+def test_stream_position_is_restored():
+    """Detection reads the header and rewinds to where it started."""
+    stream = io.BytesIO(b'xx%PDF-1.4')
+    stream.seek(2)
+    assert get_mime_detector().detect(stream) == 'application/pdf'
+    assert stream.tell() == 2
+
+
+def test_concurrent_detection_is_consistent():
+    """Threads share the detector without corrupting libmagic results."""
+    sources = [CSV_FILE, JSON_FILE, PNG] * 20
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(get_mime_detector().detect, sources))
+    assert results == ['text/csv', 'application/json', 'image/png'] * 20
+
+
+def test_extractor_factories_are_singletons():
+    """The app reuses one extractor of each kind per process."""
+    assert get_medical_report_extractor() is get_medical_report_extractor()
+    assert get_wearable_data_extractor() is get_wearable_data_extractor()
+
+
+def test_wearable_mime_cache_tracks_file_changes(tmp_path):
+    """Edited files are detected again; streams are never cached."""
+    extractor = get_wearable_data_extractor()
+    target = tmp_path / 'data.json'
+    target.write_text('[{"heart_rate": 70}]')
+    assert extractor._get_mime_type(target) == 'application/json'
+
+    target.write_text('not json at all')
+    assert extractor._get_mime_type(target) == 'text/plain'
+    assert extractor._get_cache_key(io.BytesIO(b'[]')) is None
@@ -0,0 +1,80 @@
+"""Tests for OCR preprocessing of report images."""
+
+import io
+
+import pytest
+
+from hiperhealth.agents.extraction import medical_reports
+from hiperhealth.agents.extraction.medical_reports import (
+    MedicalReportFileExtractor,
+    TextExtractionError,
+)
+from hiperhealth.agents.extraction.ocr import (
+    OCRConfig,
+    otsu_threshold,
+    preprocess,
+)
+from PIL import Image
+
+
+def test_exif_orientation_is_applied():
+    """Photos tagged as rotated are turned upright."""
+    photo = Image.new('RGB', (400, 200), 'white')
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise when displayed
+    buffer = io.BytesIO()
+    photo.save(buffer, 'JPEG', exif=exif)
+
+    result = preprocess(Image.open(buffer))
+    assert result.size == (200, 400)
+    assert result.mode == 'L'
+
+
+def test_transparency_is_flattened_onto_white():
+    """Transparent pixels become white instead of black."""
+    image = Image.new('RGBA', (10, 10), (0, 0, 0, 0))
+    assert preprocess(image).getpixel((5, 5)) == 255
+
+
+def test_downscale_to_target_dpi():
+    """High-DPI scans are resampled to the target resolution."""
+    image = Image.new('L', (1200, 600), 255)
+    image.info['dpi'] = (600, 600)
+    assert preprocess(image, OCRConfig(target_dpi=300)).size == (600, 300)
+
+
+def test_downscale_without_dpi_caps_longest_side():
+    """Photos without DPI information are capped at ``max_side``."""
+    image = Image.new('L', (4000, 3000), 255)
+    assert preprocess(image, OCRConfig(max_side=2000)).size == (2000, 1500)
+    small = Image.new('L', (800, 600), 255)
+    assert preprocess(small, OCRConfig(max_side=2000)).size == (800, 600)
+
+
+def test_binarize_uses_otsu_threshold():
+    """Binarisation separates a bimodal image into pure black and white."""
+    image = Image.new('L', (20, 10), 200)
+    image.paste(40, (0, 0, 10, 10))
+    assert 40 <= otsu_threshold(image) < 200
+
+    result = preprocess(image, OCRConfig(binarize=True))
+    assert sorted(set(result.getdata())) == [0, 255]
+
+
+def test_extractor_runs_preprocessed_ocr(monkeypatch):
+    """Image reports go through ``ocr_bytes`` with the extractor config."""
+    seen = []
+
+    def _ocr(data, config):
+        seen.append(config)
+        return 'Glucose 92 mg/dL' if data else ''
+
+    monkeypatch.setattr(medical_reports, 'ocr_bytes', _ocr)
+    config = OCRConfig(binarize=True)
+    extractor = MedicalReportFileExtractor(ocr_workers=1, ocr_config=config)
+
+    text = extractor._extract_text_from_image(io.BytesIO(b'png bytes'))
+    assert text == 'Glucose 92 mg/dL'
+    assert seen == [config]
+    with pytest.raises(TextExtractionError):
+        extractor._extract_text_from_image(io.BytesIO(b''))
@@ -0,0 +1,124 @@
+"""Tests for page-parallel PDF extraction with OCR fallback."""
+
+import io
+import os
+
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from hiperhealth.agents.extraction import pdf
+from hiperhealth.agents.extraction.medical_reports import (
+    MedicalReportFileExtractor,
+    TextExtractionError,
+)
+from hiperhealth.agents.extraction.pool import get_process_pool
+from PIL import Image
+
+
+def make_text_pdf(pages):
+    """Return a minimal PDF with one line of text per page."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for text in pages:
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+        objects.append(
+            b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+        )
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> '
+            b'/Contents %d 0 R >>' % len(objects)
+        )
+        kids.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(kids),
+        len(kids),
+    )
+    out = io.BytesIO(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(
+        b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+        % (len(objects) + 1, xref)
+    )
+    return out.getvalue()
+
+
+def make_scanned_pdf(pages):
+    """Return a PDF whose pages are images without a text layer."""
+    images = [Image.new('L', (120, 60), 255) for _ in range(pages)]
+    out = io.BytesIO()
+    images[0].save(out, 'PDF', save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Replace tesseract with a counter (OCR runs in-process here)."""
+    calls = []
+
+    def _ocr(image, config=None):
+        calls.append(image.size)
+        return f'scanned page {len(calls)}'
+
+    monkeypatch.setattr(pdf, 'ocr_image', _ocr)
+    return calls
+
+
+def test_ranges_cover_every_page():
+    """Pages are split into contiguous, balanced ranges."""
+    assert pdf._ranges(5, 2) == [(0, 3), (3, 5)]
+    assert pdf._ranges(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_parallel_extraction_keeps_page_order():
+    """Worker processes return pages in document order."""
+    data = make_text_pdf([f'Page{i}' for i in range(5)])
+    texts = pdf.extract_pdf_pages(data, max_workers=2)
+    assert [t.strip() for t in texts] == [f'Page{i}' for i in range(5)]
+
+
+def test_broken_pool_is_replaced():
+    """A pool whose worker died is discarded and the pages retried."""
+    broken = get_process_pool(2)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    data = make_text_pdf(['One', 'Two'])
+    texts = pdf.extract_pdf_pages(data, max_workers=2)
+    assert [t.strip() for t in texts] == ['One', 'Two']
+    assert get_process_pool(2) is not broken
+
+
+def test_page_limit():
+    """Pages beyond the limit are skipped."""
+    data = make_text_pdf(['One', 'Two', 'Three'])
+    texts = pdf.extract_pdf_pages(data, max_workers=1, max_pages=2)
+    assert [t.strip() for t in texts] == ['One', 'Two']
+
+
+def test_scanned_pages_fall_back_to_ocr(fake_ocr):
+    """Pages without a text layer are OCR'd from their images."""
+    extractor = MedicalReportFileExtractor(pdf_workers=1)
+    text = extractor._extract_text_from_pdf(io.BytesIO(make_scanned_pdf(2)))
+    assert text == 'scanned page 1\n\f\nscanned page 2'
+    assert fake_ocr == [(120, 60), (120, 60)]
+
+
+def test_scanned_pdf_without_ocr_raises(fake_ocr):
+    """Disabling the fallback keeps the old error for scanned PDFs."""
+    extractor = MedicalReportFileExtractor(pdf_workers=1, ocr_fallback=False)
+    with pytest.raises(TextExtractionError):
+        extractor._extract_text_from_pdf(io.BytesIO(make_scanned_pdf(1)))
+    assert fake_ocr == []
@@ -0,0 +1,113 @@
+"""Tests for the speculative exam prefetcher of the research app."""
+
+import asyncio
+import threading
+
+from concurrent.futures import Future
+from types import SimpleNamespace
+from uuid import uuid4
+
+from hiperhealth.schema.clinical_outputs import LLMDiagnosis
+
+from research.app import main
+from research.app.prefetch import ExamPrefetcher, candidate_selections
+
+
+def test_candidate_selections_rank_by_score():
+    """Scored options are ranked before taking prefixes."""
+    options = {'Cold': 0.2, 'Flu': 0.7, 'COVID-19': 0.5}
+    assert candidate_selections(options, 2) == [
+        ['Flu'],
+        ['Flu', 'COVID-19'],
+    ]
+    assert candidate_selections(['A', 'B'], 5) == [['A'], ['A', 'B']]
+
+
+def test_prefetch_reuses_match_and_cancels_stale():
+    """A matching selection reuses the prefetched result."""
+    release = threading.Event()
+    calls = []
+
+    def fetch(selection, language='en', session_id=None):
+        calls.append(list(selection))
+        release.wait(timeout=5)
+        return LLMDiagnosis(summary=language, options=selection)
+
+    prefetcher = ExamPrefetcher(max_workers=1, top_n=3, fetch=fetch)
+    submitted = prefetcher.schedule(
+        'p1',
+        ['A', 'B', 'C'],
+        language='pt',
+        skip=lambda selection: selection == ['A', 'B'],
+    )
+    assert submitted == 2
+
+    future = prefetcher.take('p1', ['A'], language='pt')
+    release.set()
+    assert future is not None
+    assert future.result(timeout=5).options == ['A']
+    prefetcher.shutdown()
+
+    assert calls == [['A']]
+    assert prefetcher.take('p1', ['A'], language='pt') is None
+
+
+def test_prefetch_miss_returns_none():
+    """Unmatched selections fall through to a regular request."""
+    prefetcher = ExamPrefetcher(
+        max_workers=1,
+        fetch=lambda selection, **kw: LLMDiagnosis(
+            summary='', options=selection
+        ),
+    )
+    prefetcher.schedule('p1', ['A', 'B'])
+    assert prefetcher.take('p1', ['B'], language='en') is None
+    prefetcher.shutdown()
+
+
+def test_unclaimed_prefetches_are_evicted(monkeypatch):
+    """Expired and surplus patients are dropped on the next schedule."""
+    prefetcher = ExamPrefetcher(
+        max_workers=1,
+        top_n=1,
+        fetch=lambda selection, **kw: LLMDiagnosis(
+            summary='', options=selection
+        ),
+        ttl=60,
+        max_patients=2,
+    )
+    clock = [1000.0]
+    monkeypatch.setattr(
+        'research.app.prefetch.time.monotonic', lambda: clock[0]
+    )
+    for patient_id in ('p1', 'p2', 'p3'):
+        prefetcher.schedule(patient_id, ['A'])
+    assert list(prefetcher._pending) == ['p2', 'p3']
+
+    clock[0] += 61
+    prefetcher.schedule('p4', ['A'])
+    assert list(prefetcher._pending) == ['p4']
+    assert prefetcher.take('p2', ['A']) is None
+    assert prefetcher.take('p4', ['A']) is not None
+    prefetcher.shutdown()
+
+
+def test_cancelled_prefetch_falls_back(app_repo, monkeypatch):
+    """A cancelled speculative request is treated as a miss."""
+    cancelled = Future()
+    cancelled.cancel()
+    fake = SimpleNamespace(take=lambda *args, **kwargs: cancelled)
+    monkeypatch.setattr(main, 'get_exam_prefetcher', lambda: fake)
+    fresh = LLMDiagnosis(summary='fresh', options=['CBC'])
+    monkeypatch.setattr(main.diag, 'exams', lambda *args, **kwargs: fresh)
+    patient_id = str(uuid4())
+    app_repo.create_patient_and_consultation(
+        {
+            'meta': {'uuid': patient_id, 'lang': 'en'},
+            'patient': {'age': 40, 'gender': 'female'},
+        }
+    )
+
+    assert asyncio.run(main._prefetched_exams(patient_id, [], 'en')) is None
+    result = main._exams_job({'patient_id': patient_id}, app_repo.db)
+    assert result == {'summary': 'fresh', 'options': ['CBC']}
@@ -0,0 +1,196 @@
+"""Tests for token-budgeted differential prompt assembly."""
+
+import json
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from hiperhealth.agents import client, metrics
+from hiperhealth.agents.diagnostics import core as diag
+from hiperhealth.agents.diagnostics import prompt
+from hiperhealth.agents.diagnostics.prompt import assemble_patient
+from hiperhealth.agents.extraction.rollup import rollup_table
+
+CSV_FILE = Path(__file__).parent / 'data' / 'wearable' / 'wearable_data.csv'
+
+REPORTS = [
+    {
+        'filename': 'labs.pdf',
+        'Patient': {'resourceType': 'Patient', 'name': [{'text': 'Ana'}]},
+        'Observation': [
+            {
+                'resourceType': 'Observation',
+                'code': {'text': 'Hemoglobin'},
+                'valueQuantity': {'value': 10.2, 'unit': 'g/dL'},
+                'referenceRange': [
+                    {'low': {'value': 12}, 'high': {'value': 16}}
+                ],
+                'effectiveDateTime': '2025-04-02T10:00:00Z',
+            },
+            {
+                'resourceType': 'Observation',
+                'code': {'coding': [{'display': 'Lipase'}]},
+                'valueQuantity': {'value': 40, 'unit': 'U/L'},
+                'interpretation': [{'coding': [{'code': 'N'}]}],
+            },
+        ],
+        'DiagnosticReport': {
+            'resourceType': 'DiagnosticReport',
+            'code': {'text': 'CBC'},
+            'conclusion': 'Mild anemia.',
+        },
+    },
+    {
+        'resourceType': 'Bundle',
+        'entry': [
+            {
+                'resource': {
+                    'resourceType': 'Condition',
+                    'code': {'text': 'Type 2 diabetes'},
+                }
+            }
+        ],
+    },
+]
+
+
+@pytest.fixture
+def patient(wearable_extractor):
+    """Return a patient payload with raw wearable rows and FHIR reports."""
+    return {
+        'age': 40,
+        'symptoms': 'Epigastric pain',
+        'previous_tests': REPORTS,
+        'wearable_data': wearable_extractor.extract_wearable_data(CSV_FILE),
+    }
+
+
+def test_raw_fields_are_summarised(patient):
+    """Series and FHIR blobs become findings; other fields are kept."""
+    assembly = assemble_patient(patient, token_budget=0)
+    payload = json.loads(assembly.text)
+
+    assert payload['age'] == 40
+    assert payload['symptoms'] == 'Epigastric pain'
+    tests = payload['previous_tests']
+    assert tests['reports'] == 2
+    assert tests['abnormal'] == [
+        'Hemoglobin: 10.2 g/dL (L, ref 12.0-16.0) [2025-04-02]'
+    ]
+    assert tests['normal'] == ['Lipase: 40 U/L (N)']
+    assert tests['conclusions'] == ['CBC: Mild anemia.']
+    assert tests['conditions'] == ['Type 2 diabetes']
+    assert 'Ana' not in assembly.text
+
+    wearable = payload['wearable_data']
+    assert wearable['rows'] == 15
+    assert wearable['period'] == '2025-04-24 to 2025-05-08'
+    assert wearable['metrics']['steps']['max'] == 3675
+    assert 'sleep_deep_duration' not in wearable['metrics']
+    assert wearable['sleep_per_day']['deep'] == pytest.approx(33.67)
+    assert len(wearable['daily']) == 15
+    assert assembly.tokens_saved > 0
+    assert assembly.original_tokens == assembly.tokens + assembly.tokens_saved
+
+
+def test_stored_reference_matches_raw_rows(patient, wearable_extractor):
+    """The reference saved at upload summarises like the raw rows."""
+    table = wearable_extractor.extract_wearable_table(CSV_FILE)
+    stored = dict(
+        patient,
+        wearable_data={
+            'series_id': 1,
+            'rows': len(table),
+            'summary': table.describe(),
+            'daily': rollup_table(table)['windows']['day'],
+        },
+    )
+    raw = json.loads(assemble_patient(patient, 0).text)
+    assert json.loads(assemble_patient(stored, 0).text) == raw
+
+
+def test_budget_coarsens_largest_field_first(patient):
+    """Detail is dropped step by step until the payload fits."""
+    full = assemble_patient(patient, token_budget=0)
+    trimmed = assemble_patient(patient, token_budget=full.tokens - 50)
+    payload = json.loads(trimmed.text)
+
+    assert trimmed.tokens <= full.tokens - 50
+    assert not trimmed.over_budget
+    assert len(payload['wearable_data']['daily']) < 15
+    assert 'normal' in payload['previous_tests']
+
+    tiny = assemble_patient(patient, token_budget=10)
+    payload = json.loads(tiny.text)
+    assert tiny.over_budget
+    assert set(payload['wearable_data']) == {'rows', 'period', 'days'}
+    assert payload['previous_tests'] == {
+        'reports': 2,
+        'abnormal_results': 1,
+        'conditions': ['Type 2 diabetes'],
+    }
+
+
+def test_budget_defaults_to_settings(patient):
+    """LLM_PROMPT_TOKEN_BUDGET is used when no budget is passed."""
+    previous = client.get_settings()
+    try:
+        client.configure(prompt_token_budget=10)
+        assert assemble_patient(patient).over_budget
+        assert diag.differential_fingerprint(
+            patient
+        ) != diag.differential_fingerprint(patient, token_budget=0)
+    finally:
+        client.configure(previous)
+
+
+def test_differential_reports_tokens_saved(patient, monkeypatch):
+    """The summarised payload is sent and the saving is recorded."""
+    sent = []
+
+    def create(**kwargs):
+        sent.append(kwargs['messages'][1]['content'])
+        reply = {'summary': 's', 'options': ['Anemia']}
+        message = SimpleNamespace(content=json.dumps(reply))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    fake = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(client, 'get_client', lambda: fake)
+    monkeypatch.setattr(client, 'dump_llm_json', lambda text, sid: None)
+    calls = []
+    sink = metrics.add_sink(metrics.CallbackSink(calls.append))
+    try:
+        diag.differential(patient, token_budget=0)
+    finally:
+        metrics.remove_sink(sink)
+
+    expected = assemble_patient(patient, token_budget=0)
+    assert sent == [expected.text]
+    assert calls[0].prompt_tokens_saved == expected.tokens_saved > 0
+
+
+def test_original_size_is_sampled(monkeypatch):
+    """Long series are sized from a sample instead of dumped whole."""
+    rows = [
+        {'date': f'2025-05-{i % 28 + 1:02d}', 'steps': 1000 + i}
+        for i in range(5000)
+    ]
+    expected = len(json.dumps({'wearable_data': rows})) // 4
+    sizes = []
+
+    def dumps(data):
+        text = json.dumps(data)
+        sizes.append(len(text))
+        return text
+
+    monkeypatch.setattr(prompt, '_dumps', dumps)
+    assembly = assemble_patient({'wearable_data': rows}, token_budget=0)
+
+    assert assembly.original_tokens == pytest.approx(expected, rel=0.05)
+    assert max(sizes) < expected
+    stored = {'summary': {}, 'rows': 0, 'rollups': {'windows': rows}}
+    assert assemble_patient({'wearable_data': stored}, 0).original_tokens < 20
@@ -0,0 +1,157 @@
+"""Tests for batch extraction and directory ingestion of reports."""
+
+import asyncio
+import io
+import json
+
+from pathlib import Path
+
+import pytest
+
+from fastapi import UploadFile
+from hiperhealth.agents.extraction.medical_reports import (
+    MedicalReportExtractorError,
+    MedicalReportFileExtractor,
+)
+from starlette.datastructures import Headers
+
+from research.app.reports import (
+    discard_spooled_reports,
+    ingest_report_directory,
+    process_uploaded_reports,
+    spool_uploaded_reports,
+)
+
+PNG = (
+    Path(__file__).parent
+    / 'data'
+    / 'reports'
+    / 'image_reports'
+    / 'image-1.png'
+).read_bytes()
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """Return an extractor whose OCR and FHIR steps are fakes.
+
+    Images ending in ``BAD`` fail the FHIR conversion.
+    """
+
+    def _ocr(self, source):
+        data = self._read_bytes(source)
+        return 'bad report' if data.endswith(b'BAD') else f'{len(data)} bytes'
+
+    def _fhir(self, text, api_key=None):
+        if text == 'bad report':
+            raise MedicalReportExtractorError('conversion failed')
+        return {'Observation': {'text': text}}
+
+    monkeypatch.setattr(
+        MedicalReportFileExtractor, '_extract_text_from_image', _ocr
+    )
+    monkeypatch.setattr(MedicalReportFileExtractor, '_convert_to_fhir', _fhir)
+    return MedicalReportFileExtractor(ocr_workers=1)
+
+
+def test_extract_many_reports_each_file(extractor, tmp_path):
+    """Failures are reported per file and never abort the batch."""
+    text_file = tmp_path / 'notes.txt'
+    text_file.write_text('not a report')
+    sources = [
+        io.BytesIO(PNG),
+        tmp_path / 'missing.png',
+        io.BytesIO(PNG + b'BAD'),
+        text_file,
+        io.BytesIO(PNG + b'\0'),
+    ]
+    seen = []
+
+    results = extractor.extract_many(
+        sources, max_workers=2, progress=seen.append
+    )
+
+    assert [r.ok for r in results] == [True, False, False, False, True]
+    assert [r.source for r in results] == sources
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert isinstance(results[2].error, MedicalReportExtractorError)
+    assert 'Unsupported MIME type' in str(results[3].error)
+    assert results[0].data == {'Observation': {'text': f'{len(PNG)} bytes'}}
+    assert sorted(map(id, seen)) == sorted(map(id, results))
+
+
+def _upload(name, data, content_type='image/png'):
+    return UploadFile(
+        io.BytesIO(data),
+        filename=name,
+        headers=Headers({'content-type': content_type}),
+    )
+
+
+def test_uploads_keep_successful_reports(extractor):
+    """One broken upload no longer discards the others."""
+    reports = [
+        _upload('good.png', PNG),
+        _upload('broken.png', PNG + b'BAD'),
+        _upload('GOOD.png', PNG),
+        _upload('other.png', PNG + b'\0'),
+    ]
+    fhir, error = asyncio.run(
+        process_uploaded_reports(reports, set(), extractor)
+    )
+
+    assert [r['filename'] for r in fhir] == ['good.png', 'other.png']
+    assert error == (
+        'GOOD.png: File already uploaded; '
+        'broken.png: Failed to extract report data'
+    )
+
+
+def test_spooling_skips_invalid_uploads(extractor, tmp_path):
+    """Invalid files are reported and the others are still spooled."""
+    reports = [
+        _upload('notes.txt', b'text', 'text/plain'),
+        _upload('good.png', PNG),
+        _upload('GOOD.png', PNG),
+        _upload('other.png', PNG + b'\0'),
+    ]
+    files, error = asyncio.run(
+        spool_uploaded_reports(reports, set(), extractor, tmp_path)
+    )
+
+    assert [f['filename'] for f in files] == ['good.png', 'other.png']
+    assert Path(files[1]['path']).read_bytes() == PNG + b'\0'
+    assert error == (
+        'notes.txt: Only PDF, PNG, JPEG, JPG files allowed; '
+        'GOOD.png: File already uploaded'
+    )
+    discard_spooled_reports(files)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_ingest_directory_resumes(extractor, tmp_path):
+    """A second run skips extracted files and retries failed ones."""
+    source = tmp_path / 'reports'
+    (source / '2019').mkdir(parents=True)
+    (source / 'a.png').write_bytes(PNG)
+    (source / '2019' / 'b.png').write_bytes(PNG + b'BAD')
+    (source / 'readme.md').write_text('ignored')
+    output = tmp_path / 'out' / 'reports.jsonl'
+
+    counts = ingest_report_directory(source, output, extractor)
+    assert counts == {'ok': 1, 'failed': 1, 'skipped': 0}
+
+    (source / '2019' / 'b.png').write_bytes(PNG + b'\1')
+    rows = []
+    counts = ingest_report_directory(
+        source, output, extractor, progress=rows.append
+    )
+    assert counts == {'ok': 1, 'failed': 0, 'skipped': 1}
+    assert [row['file'] for row in rows] == ['2019/b.png']
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    first_run = sorted((r['file'], r['ok']) for r in lines[:2])
+    assert first_run == [('2019/b.png', False), ('a.png', True)]
+    assert (lines[2]['file'], lines[2]['ok']) == ('2019/b.png', True)
+    failed = next(r for r in lines if not r['ok'])
+    assert failed['error_type'] == 'MedicalReportExtractorError'
@@ -0,0 +1,113 @@
+"""Tests for the content-addressed medical report extraction cache."""
+
+import io
+
+from pathlib import Path
+
+import pytest
+
+from hiperhealth.agents.extraction import medical_reports
+from hiperhealth.agents.extraction.medical_reports import (
+    MedicalReportFileExtractor,
+)
+
+IMAGE_FILE = (
+    Path(__file__).parent
+    / 'data'
+    / 'reports'
+    / 'image_reports'
+    / 'image-1.png'
+)
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Count OCR runs and FHIR conversions without tesseract or an LLM."""
+    calls = {'ocr': 0, 'fhir': 0}
+
+    def _ocr(self, source):
+        calls['ocr'] += 1
+        return 'Hemoglobin 13.2 g/dL'
+
+    def _fhir(self, text, api_key=None):
+        calls['fhir'] += 1
+        return {'Observation': {'text': text}}
+
+    monkeypatch.setattr(
+        MedicalReportFileExtractor, '_extract_text_from_image', _ocr
+    )
+    monkeypatch.setattr(MedicalReportFileExtractor, '_convert_to_fhir', _fhir)
+    return calls
+
+
+def test_same_bytes_hit_across_streams(counted):
+    """Distinct streams with identical bytes share one cache entry."""
+    extractor = MedicalReportFileExtractor()
+    data = IMAGE_FILE.read_bytes()
+
+    first = extractor.extract_report_data(io.BytesIO(data))
+    again = extractor.extract_report_data(io.BytesIO(data))
+    from_path = extractor.extract_report_data(IMAGE_FILE)
+
+    assert first == again == from_path
+    assert counted == {'ocr': 1, 'fhir': 1}
+
+
+def test_stream_is_hashed_once(counted, monkeypatch):
+    """Validation, MIME sniffing and text caching share one digest."""
+    hashed = []
+    sha256 = medical_reports._sha256
+
+    def counting(stream):
+        hashed.append(stream)
+        return sha256(stream)
+
+    monkeypatch.setattr(medical_reports, '_sha256', counting)
+    extractor = MedicalReportFileExtractor()
+    extractor.extract_report_data(io.BytesIO(IMAGE_FILE.read_bytes()))
+    assert len(hashed) == 1
+    assert counted == {'ocr': 1, 'fhir': 1}
+
+
+def test_different_bytes_do_not_collide(counted):
+    """Streams are keyed by content, never by object identity."""
+    extractor = MedicalReportFileExtractor()
+    data = IMAGE_FILE.read_bytes()
+    stream = io.BytesIO(data)
+    extractor.extract_report_data(stream)
+    extractor.extract_report_data(io.BytesIO(data + b'\0'))
+    assert counted['ocr'] == 2
+
+
+def test_memory_cache_is_bounded(counted):
+    """Old entries are evicted once the LRU is full."""
+    extractor = MedicalReportFileExtractor(cache_size=2)
+    data = IMAGE_FILE.read_bytes()
+    for i in range(5):
+        extractor.extract_report_data(io.BytesIO(data + bytes([i])))
+    assert len(extractor._cache.memory) <= 2
+
+    extractor.extract_report_data(io.BytesIO(data + bytes([0])))
+    assert counted['ocr'] == 6
+
+
+def test_disk_tier_survives_new_extractor(counted, tmp_path):
+    """Text and FHIR output persist across extractor instances."""
+    path = tmp_path / 'reports.sqlite'
+    MedicalReportFileExtractor(cache_path=path).extract_report_data(IMAGE_FILE)
+    fresh = MedicalReportFileExtractor(cache_path=path)
+    result = fresh.extract_report_data(IMAGE_FILE)
+    assert result == {'Observation': {'text': 'Hemoglobin 13.2 g/dL'}}
+    assert counted == {'ocr': 1, 'fhir': 1}
+    assert fresh._extract_text(IMAGE_FILE) == 'Hemoglobin 13.2 g/dL'
+
+
+def test_changed_file_is_rehashed(counted, tmp_path):
+    """Rewriting a file at the same path invalidates its digest."""
+    target = tmp_path / 'report.png'
+    target.write_bytes(IMAGE_FILE.read_bytes())
+    extractor = MedicalReportFileExtractor()
+    extractor.extract_report_data(target)
+    target.write_bytes(IMAGE_FILE.read_bytes() + b'\0\0')
+    extractor.extract_report_data(target)
+    assert counted['ocr'] == 2
@@ -0,0 +1,128 @@
+"""Tests for chunked FHIR conversion of long medical reports."""
+
+import pytest
+
+from hiperhealth.agents.extraction import medical_reports
+from hiperhealth.agents.extraction.medical_reports import (
+    PAGE_BREAK,
+    MedicalReportFileExtractor,
+    get_anamnesis,
+    merge_fhir,
+    split_report_text,
+)
+
+
+class Patient:
+    """Stand-in for a FHIR Patient resource."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def model_dump(self):
+        """Return the resource as a dict."""
+        return {'id': str(id(self)), 'name': 'Jane Doe'}
+
+
+class Observation(Patient):
+    """Stand-in for a FHIR Observation resource."""
+
+    def model_dump(self):
+        """Return the resource as a dict."""
+        return {'id': str(id(self)), 'value': self.text.splitlines()[0]}
+
+
+@pytest.fixture
+def anamnesis(monkeypatch):
+    """Replace AnamnesisAI with a fake recording the converted chunks."""
+    created = []
+    converted = []
+
+    class FakeAnamnesisAI:
+        def __init__(self, backend, api_key):
+            created.append(api_key)
+
+        def extract_fhir(self, text):
+            converted.append(text)
+            return [Patient(text), Observation(text)], []
+
+    monkeypatch.setattr(medical_reports, 'AnamnesisAI', FakeAnamnesisAI)
+    monkeypatch.setattr(medical_reports, '_anamnesis', {})
+    return created, converted
+
+
+def _pages(count, size=300):
+    return [f'Glucose page {i}\n' + 'x' * size for i in range(count)]
+
+
+def test_split_prefers_page_boundaries():
+    """Pages are packed whole into chunks under the limit."""
+    chunks = split_report_text(PAGE_BREAK.join(_pages(5)), max_chars=700)
+    assert [c.count('Glucose page') for c in chunks] == [2, 2, 1]
+    assert all(len(c) <= 700 for c in chunks)
+
+
+def test_split_falls_back_to_sections_and_lines():
+    """A long page is split at headings, then lines, then characters."""
+    page = 'HISTORY\n' + 'a' * 50 + '\nLAB RESULTS\n' + 'b' * 50
+    chunks = split_report_text(page, max_chars=70)
+    assert chunks[0].startswith('HISTORY') and 'LAB' not in chunks[0]
+    assert chunks[1].startswith('LAB RESULTS')
+    assert split_report_text('z' * 25, max_chars=10) == [
+        'z' * 10,
+        'z' * 10,
+        'z' * 5,
+    ]
+
+
+def test_appended_pages_keep_earlier_chunks():
+    """Growing a report only changes the chunks after the old end."""
+    before = split_report_text(PAGE_BREAK.join(_pages(4)), max_chars=700)
+    after = split_report_text(PAGE_BREAK.join(_pages(7)), max_chars=700)
+    assert after[: len(before) - 1] == before[:-1]
+
+
+def test_merge_fhir_deduplicates_ignoring_ids():
+    """Identical resources collapse; distinct ones become a list."""
+    merged = merge_fhir(
+        [
+            {'Patient': {'id': '1', 'name': 'Jane'}, 'Observation': {'v': 1}},
+            {'Patient': {'id': '2', 'name': 'Jane'}, 'Observation': {'v': 2}},
+        ]
+    )
+    assert merged['Patient'] == {'id': '1', 'name': 'Jane'}
+    assert merged['Observation'] == [{'v': 1}, {'v': 2}]
+
+
+def test_anamnesis_is_pooled_per_key(anamnesis):
+    """One AnamnesisAI instance is built per API key."""
+    created, _ = anamnesis
+    assert get_anamnesis('k1') is get_anamnesis('k1')
+    assert get_anamnesis('k2') is not get_anamnesis('k1')
+    assert created == ['k1', 'k2']
+
+
+def test_chunks_are_converted_merged_and_cached(anamnesis):
+    """Only new chunks are converted when pages are appended."""
+    _, converted = anamnesis
+    extractor = MedicalReportFileExtractor(chunk_chars=700, chunk_workers=2)
+
+    fhir = extractor._convert_to_fhir(PAGE_BREAK.join(_pages(4)), 'key')
+    assert len(converted) == 2
+    assert fhir['Patient'] == {'id': fhir['Patient']['id'], 'name': 'Jane Doe'}
+    assert [o['value'] for o in fhir['Observation']] == [
+        'Glucose page 0',
+        'Glucose page 2',
+    ]
+
+    extractor._convert_to_fhir(PAGE_BREAK.join(_pages(6)), 'key')
+    assert len(converted) == 3
+    assert converted[-1].startswith('Glucose page 4')
+
+
+def test_chunking_can_be_disabled(anamnesis):
+    """``chunk_chars=0`` sends the whole text in one conversion."""
+    _, converted = anamnesis
+    extractor = MedicalReportFileExtractor(chunk_chars=0)
+    text = PAGE_BREAK.join(_pages(6))
+    extractor._convert_to_fhir(text, 'key')
+    assert converted == [text]
@@ -0,0 +1,143 @@
+"""Tests for retries, re-asks, deadlines and the circuit breaker."""
+
+import asyncio
+import json
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fastapi import HTTPException
+from hiperhealth.agents import client
+from hiperhealth.agents.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    RetryPolicy,
+)
+from openai import APIStatusError, BadRequestError
+
+VALID = json.dumps({'summary': 'Fine.', 'options': ['Flu']})
+
+
+def test_backoff_is_capped_and_jittered():
+    """Backoff never exceeds the exponential cap."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    delays = [policy.backoff(attempt) for attempt in range(6)]
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert all(policy.backoff(0) <= 1.0 for _ in range(20))
+
+
+def test_breaker_opens_and_half_opens():
+    """The breaker blocks calls until the reset timeout elapses."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.state == 'half_open'
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    """Concurrent callers wait for the single trial call to finish."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+    start = threading.Barrier(8)
+
+    def call(_):
+        start.wait()
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            return False
+        return True
+
+    with ThreadPoolExecutor(8) as pool:
+        assert sum(pool.map(call, range(8))) == 1
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    asyncio.run(asyncio.sleep(0.06))
+    breaker.before_call()
+    breaker.record_success()
+    with ThreadPoolExecutor(8) as pool:
+        assert sum(pool.map(call, range(8))) == 8
+
+
+def test_chat_retries_rate_limits_and_server_errors(llm_server):
+    """429 and 5xx replies are retried until a valid completion arrives."""
+    llm_server.push(429)
+    llm_server.push(503)
+    result = client.chat('sys', 'user')
+    assert result.options == ['Flu', 'Cold']
+    assert len(llm_server.requests) == 3
+
+
+def test_chat_does_not_retry_client_errors(llm_server):
+    """A 400 is surfaced immediately."""
+    llm_server.push(400)
+    with pytest.raises(BadRequestError):
+        client.chat('sys', 'user')
+    assert len(llm_server.requests) == 1
+
+
+def test_chat_reasks_once_on_invalid_reply(llm_server):
+    """An invalid reply triggers exactly one corrective re-ask."""
+    llm_server.push(200, json.dumps({'summary': 'no options'}))
+    llm_server.push(200, VALID)
+    assert client.chat('sys', 'user').options == ['Flu']
+
+    second = llm_server.requests[1]['messages']
+    assert [m['role'] for m in second] == [
+        'system',
+        'user',
+        'assistant',
+        'user',
+    ]
+    assert 'LLMDiagnosis' in second[-1]['content']
+
+
+def test_chat_gives_up_after_second_invalid_reply(llm_server):
+    """Two invalid replies in a row surface as HTTP 422."""
+    llm_server.push(200, '{"summary": "bad"}')
+    llm_server.push(200, '{"summary": "still bad"}')
+    with pytest.raises(HTTPException) as info:
+        client.chat('sys', 'user')
+    assert info.value.status_code == 422
+    assert len(llm_server.requests) == 2
+
+
+def test_breaker_fails_fast_while_provider_is_down(llm_server):
+    """After repeated failures calls stop reaching the provider."""
+    client.configure(max_attempts=1, breaker_threshold=2)
+    llm_server.default = (503, '', 0.0)
+    for _ in range(2):
+        with pytest.raises(APIStatusError):
+            client.chat('sys', 'user')
+    with pytest.raises(CircuitOpenError):
+        client.chat('sys', 'user')
+    assert len(llm_server.requests) == 2
+
+
+def test_achat_enforces_deadline(llm_server):
+    """A slow provider cannot hold the caller past the deadline."""
+    client.configure(deadline=0.3)
+    llm_server.push(200, VALID, delay=2.0)
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(client.achat('sys', 'user'))
+
+
+def test_chat_enforces_deadline(llm_server):
+    """The sync client also stops retrying once the deadline is spent."""
+    client.configure(deadline=0.3, timeout=0.2)
+    llm_server.default = (200, VALID, 1.0)
+    with pytest.raises(DeadlineExceededError):
+        client.chat('sys', 'user')
@@ -0,0 +1,141 @@
+"""Tests for streamed completions and the SSE differential endpoint."""
+
+import asyncio
+import json
+
+from itertools import pairwise
+from uuid import uuid4
+
+from hiperhealth.agents import client as llm_client
+from hiperhealth.agents.streaming import PartialDiagnosis
+from hiperhealth.schema.clinical_outputs import LLMDiagnosis
+
+from research.app import main
+
+REPLY = json.dumps(
+    {
+        'summary': 'Fever, cough and fatigue for three days.',
+        'options': ['Influenza', 'COVID-19', 'Common cold'],
+        'exams': {'Influenza': ['Rapid influenza test']},
+        'exams_summary': 'Rule out viral causes first.',
+    }
+)
+
+
+def test_partial_diagnosis_emits_each_option_once():
+    """Feeding a reply char by char reports every option exactly once."""
+    partial = PartialDiagnosis()
+    events = [event for ch in REPLY for event in partial.feed(ch)]
+
+    options = [value for kind, value in events if kind == 'option']
+    summaries = [value for kind, value in events if kind == 'summary']
+    assert options == ['Influenza', 'COVID-19', 'Common cold']
+    assert summaries[-1] == 'Fever, cough and fatigue for three days.'
+    assert all(
+        later.startswith(earlier) for earlier, later in pairwise(summaries)
+    )
+
+
+def test_partial_diagnosis_stops_after_options():
+    """Fields after the summary and options are not scanned."""
+    partial = PartialDiagnosis()
+    head = REPLY.split('"exams"')[0]
+    partial.feed(head)
+    assert partial.complete
+    assert partial.feed('"exams": {"never": ["parsed"') == []
+    assert partial.options == ['Influenza', 'COVID-19', 'Common cold']
+
+
+def test_achat_stream_yields_deltas_then_result(llm_server):
+    """Deltas reassemble into the reply and the last item is validated."""
+    llm_server.default = (200, REPLY, 0.0)
+
+    async def _collect() -> list:
+        return [item async for item in llm_client.achat_stream('sys', 'user')]
+
+    items = asyncio.run(_collect())
+    *deltas, result = items
+    assert ''.join(deltas) == REPLY
+    assert len(deltas) > 1
+    assert isinstance(result, LLMDiagnosis)
+    assert result.options[0] == 'Influenza'
+    assert llm_server.requests[0]['stream'] is True
+
+
+def test_chat_stream_reasks_invalid_reply(llm_server):
+    """An invalid streamed reply is corrected with one regular request."""
+    llm_server.push(200, '{"summary": "no options"}')
+    llm_server.push(200, REPLY)
+
+    *_, result = list(llm_client.chat_stream('sys', 'user'))
+    assert result.options[-1] == 'Common cold'
+    assert 'stream' not in llm_server.requests[1]
+
+
+def test_diagnosis_stream_endpoint(llm_server, app_repo, client, monkeypatch):
+    """The SSE endpoint streams options and persists the final reply."""
+    monkeypatch.setattr(main, 'get_exam_prefetcher', lambda: None)
+    llm_server.default = (200, REPLY, 0.0)
+    patient_id = str(uuid4())
+    app_repo.create_patient_and_consultation(
+        {
+            'meta': {'uuid': patient_id, 'lang': 'en'},
+            'patient': {'age': 40, 'gender': 'female'},
+        }
+    )
+
+    page = client.get('/diagnosis', params={'patient_id': patient_id})
+    assert page.status_code == 200
+    assert 'option-template' in page.text
+
+    with client.stream(
+        'GET', '/diagnosis/stream', params={'patient_id': patient_id}
+    ) as rsp:
+        assert rsp.headers['content-type'].startswith('text/event-stream')
+        body = ''.join(rsp.iter_text())
+
+    events = [
+        (block.split('\n')[0][len('event: ') :], block.split('data: ')[1])
+        for block in body.strip().split('\n\n')
+    ]
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == 'summary'
+    assert kinds[-1] == 'done'
+    options = [json.loads(data) for kind, data in events if kind == 'option']
+    assert options == ['Influenza', 'COVID-19', 'Common cold']
+
+    app_repo.db.expire_all()
+    stored = app_repo.get_patient_by_uuid(patient_id).consultations[-1]
+    assert stored.ai_diag_raw['options'] == options
+    assert stored.ai_diag_raw['exams'] == {
+        'Influenza': ['Rapid influenza test']
+    }
+
+
+def test_diagnosis_stream_reports_unexpected_errors(
+    llm_server, app_repo, client, monkeypatch
+):
+    """A failure after the stream started ends with an error event."""
+    monkeypatch.setattr(main, 'get_exam_prefetcher', lambda: None)
+
+    def broken(*args):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(main, '_store_differential', broken)
+    llm_server.default = (200, REPLY, 0.0)
+    patient_id = str(uuid4())
+    app_repo.create_patient_and_consultation(
+        {
+            'meta': {'uuid': patient_id, 'lang': 'en'},
+            'patient': {'age': 40, 'gender': 'female'},
+        }
+    )
+
+    with client.stream(
+        'GET', '/diagnosis/stream', params={'patient_id': patient_id}
+    ) as rsp:
+        body = ''.join(rsp.iter_text())
+
+    last = body.strip().split('\n\n')[-1]
+    assert last.startswith('event: error')
+    assert 'event: done' not in body
@@ -0,0 +1,158 @@
+"""Tests for wearable hourly/daily rollups."""
+
+import io
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from hiperhealth.agents.extraction import wearable
+from hiperhealth.agents.extraction.columnar import WearableTable
+from hiperhealth.agents.extraction.rollup import rollup_table
+
+TEST_DATA_PATH = Path(__file__).parent / 'data' / 'wearable'
+CSV_FILE = TEST_DATA_PATH / 'wearable_data.csv'
+
+
+def _series(start, step_s, values, zone):
+    """Return a CSV of UTC samples every *step_s* seconds in *zone*."""
+    times = np.datetime64(start) + np.arange(len(values)) * np.timedelta64(
+        step_s, 's'
+    )
+    stamps = np.datetime_as_string(times, unit='s').tolist()
+    lines = ['timestamp,heart_rate,timezone']
+    lines += [f'{t}Z,{v},{zone}' for t, v in zip(stamps, values)]
+    return '\n'.join(lines)
+
+
+def test_stats_match_numpy():
+    """Per-window stats equal numpy on the same slices."""
+    values = np.random.default_rng(0).integers(40, 180, 7200).tolist()
+    table = WearableTable.from_csv(
+        _series('2025-05-01T00:00:00', 1, values, 'UTC')
+    )
+    rollup = rollup_table(table, percentiles=(25, 50, 95))
+
+    hours = rollup['windows']['hour']
+    assert [w['start'] for w in hours] == [
+        '2025-05-01T00:00',
+        '2025-05-01T01:00',
+    ]
+    for i, window in enumerate(hours):
+        chunk = np.array(values[i * 3600 : (i + 1) * 3600])
+        stats = window['metrics']['heart_rate']
+        assert stats['count'] == 3600
+        assert stats['min'] == chunk.min()
+        assert stats['max'] == chunk.max()
+        assert stats['mean'] == pytest.approx(chunk.mean())
+        for q in (25, 50, 95):
+            assert stats[f'p{q}'] == pytest.approx(np.percentile(chunk, q))
+    assert rollup['windows']['day'][0]['rows'] == 7200
+
+
+def test_timezone_column_sets_local_windows():
+    """Windows follow the timezone column, including DST changes."""
+    values = [60] * 72
+    fixed = WearableTable.from_csv(
+        _series('2025-05-01T00:00:00', 3600, values, '-03:00')
+    )
+    days = rollup_table(fixed, ['day'])['windows']['day']
+    assert [(d['start'], d['rows']) for d in days] == [
+        ('2025-04-30', 3),
+        ('2025-05-01', 24),
+        ('2025-05-02', 24),
+        ('2025-05-03', 21),
+    ]
+
+    dst = WearableTable.from_csv(
+        _series('2025-03-08T05:00:00', 3600, values, 'America/New_York')
+    )
+    days = rollup_table(dst, ['day'])['windows']['day']
+    assert [(d['start'], d['rows']) for d in days] == [
+        ('2025-03-08', 24),
+        ('2025-03-09', 23),
+        ('2025-03-10', 24),
+        ('2025-03-11', 1),
+    ]
+
+
+def test_daily_export_sleep_totals(wearable_extractor):
+    """Date-only exports get daily windows with summed sleep stages."""
+    table = wearable_extractor.extract_wearable_table(CSV_FILE)
+    rollup = rollup_table(table)
+
+    assert rollup['time_column'] == 'date'
+    assert list(rollup['windows']) == ['day']
+    day = next(
+        d for d in rollup['windows']['day'] if d['start'] == '2025-05-08'
+    )
+    assert day['sleep'] == {'deep': 27, 'light': 212, 'rem': 83, 'total': 322}
+    assert day['metrics']['steps']['max'] == 937
+    assert 'sleep_deep_duration' not in day['metrics']
+
+
+def test_long_format_sleep_stages():
+    """Stage segments are summed per stage and window."""
+    table = WearableTable.from_records(
+        [
+            {
+                'start_time': '2025-05-01T23:10:00',
+                'stage': 'Deep',
+                'duration': 30,
+            },
+            {
+                'start_time': '2025-05-01T23:40:00',
+                'stage': 'rem',
+                'duration': 20,
+            },
+            {
+                'start_time': '2025-05-02T00:00:00',
+                'stage': 'deep',
+                'duration': 15,
+            },
+            {
+                'start_time': '2025-05-02T00:15:00',
+                'stage': 'light',
+                'duration': 45,
+            },
+        ]
+    )
+    hours = rollup_table(table, ['hour'])['windows']['hour']
+    assert [(h['start'], h['sleep']) for h in hours] == [
+        ('2025-05-01T23:00', {'deep': 30, 'light': 0, 'rem': 20}),
+        ('2025-05-02T00:00', {'deep': 15, 'light': 45, 'rem': 0}),
+    ]
+
+
+def test_without_time_column():
+    """Tables without timestamps have no windows."""
+    table = WearableTable.from_records([{'steps': 1}, {'steps': 2}])
+    assert rollup_table(table) == {'time_column': None, 'windows': {}}
+    with pytest.raises(ValueError, match='frequency'):
+        rollup_table(
+            WearableTable.from_records([{'date': '2025-05-01'}]), ['week']
+        )
+
+
+def test_rollups_are_cached_per_upload(wearable_extractor, monkeypatch):
+    """The same upload is reduced once; new content is reduced again."""
+    calls = []
+
+    def counting(table, *args):
+        calls.append(len(table))
+        return rollup_table(table, *args)
+
+    monkeypatch.setattr(wearable, 'rollup_table', counting)
+    data = CSV_FILE.read_bytes()
+
+    first = wearable_extractor.rollup_wearable_data(io.BytesIO(data))
+    again = wearable_extractor.rollup_wearable_data(io.BytesIO(data))
+    assert first == again
+    assert calls == [15]
+
+    wearable_extractor.rollup_wearable_data(CSV_FILE)
+    wearable_extractor.rollup_wearable_data(CSV_FILE)
+    edited = data.replace(b',937,', b',938,')
+    wearable_extractor.rollup_wearable_data(io.BytesIO(edited))
+    assert calls == [15, 15, 15]
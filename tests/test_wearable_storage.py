@@ -0,0 +1,147 @@
+"""Tests for columnar wearable storage."""
+
+from pathlib import Path
+
+import pytest
+
+from hiperhealth.agents.extraction.columnar import TableBuilder, WearableTable
+from hiperhealth.agents.extraction.rollup import rollup_table
+from sqlalchemy import inspect
+
+from research.app.wearable import (
+    load_wearable_table,
+    save_wearable_table,
+    wearable_prompt_data,
+    wearable_rollups,
+    wearable_summary,
+)
+from research.models.ui import Consultation, WearableSeries
+
+TEST_DATA_PATH = Path(__file__).parent / 'data' / 'wearable'
+
+
+@pytest.fixture
+def consultation(test_repo, patients_json):
+    """Return the first consultation of a freshly created patient."""
+    patient = test_repo.create_patient_and_consultation(patients_json[0])
+    return patient.consultations[0]
+
+
+@pytest.mark.parametrize('name', ['wearable_data.csv', 'wearable_data.json'])
+def test_npz_round_trip(wearable_extractor, name):
+    """A table survives to_npz/from_npz unchanged."""
+    table = wearable_extractor.extract_wearable_table(TEST_DATA_PATH / name)
+    restored = WearableTable.from_npz(table.to_npz())
+    assert restored.schema == table.schema
+    assert restored.to_records() == table.to_records()
+
+
+def test_builder_fills_missing_keys():
+    """Rows without a key get None in that column."""
+    builder = TableBuilder()
+    builder.add([{'hr': 60, 'steps': 10}])
+    builder.add([{'hr': 61}, {'steps': 12, 'note': 'run'}])
+    table = builder.build()
+
+    assert len(builder) == 3
+    assert table.to_records() == [
+        {'hr': 60, 'steps': 10, 'note': None},
+        {'hr': 61, 'steps': None, 'note': None},
+        {'hr': None, 'steps': 12, 'note': 'run'},
+    ]
+    assert table.describe()['hr'] == {
+        'kind': 'int',
+        'count': 2,
+        'min': 60,
+        'max': 61,
+        'mean': 60.5,
+    }
+
+
+def test_builder_joins_typed_batches():
+    """Batches of different types are joined like a single batch."""
+    rows = [
+        {'hr': 60, 'os': 'ios', 'at': '2025-05-01T10:00'},
+        {'hr': 61.5, 'os': 'ios', 'at': '2025-05-01T10:01:30'},
+        {'hr': None, 'os': 'android', 'at': None},
+        {'hr': 63, 'os': 'ios', 'at': 'n/a'},
+    ]
+    builder = TableBuilder()
+    for row in rows:
+        builder.add([row] * 2)
+    table = builder.build()
+    single = WearableTable.from_records(
+        [row for row in rows for _ in range(2)]
+    )
+
+    assert table.schema == single.schema
+    assert table.schema['hr'] == 'float'
+    assert table.to_records() == single.to_records()
+
+
+def test_builder_keeps_categories_with_small_tail():
+    """A one-row tail batch does not demote a categorical column."""
+    rows = [
+        {'hr': 60 + i % 40, 'os': ('ios', 'android')[i % 2], 'tz': 'UTC'}
+        for i in range(1001)
+    ]
+    builder = TableBuilder()
+    builder.add(rows[:1000])
+    builder.add(rows[1000:])
+    table = builder.build()
+
+    assert table.schema == {'hr': 'int', 'os': 'category', 'tz': 'category'}
+    assert table.to_records() == rows
+    assert table.nbytes == WearableTable.from_records(rows).nbytes
+
+
+@pytest.mark.parametrize('name', ['wearable_data.csv', 'wearable_data.json'])
+def test_raw_batches_match_table(wearable_extractor, name):
+    """String cells typed per batch give the table of the whole file."""
+    path = TEST_DATA_PATH / name
+    builder = TableBuilder()
+    for batch in wearable_extractor.iter_wearable_records(path, 4, raw=True):
+        builder.add(batch)
+    table = wearable_extractor.extract_wearable_table(path)
+    assert builder.build().to_records() == table.to_records()
+
+
+def test_save_and_load(db_session, consultation, wearable_extractor):
+    """The blob is stored once and only read on demand."""
+    table = wearable_extractor.extract_wearable_table(
+        TEST_DATA_PATH / 'wearable_data.csv'
+    )
+    save_wearable_table(consultation, table, db_session)
+    db_session.commit()
+    consultation_id = consultation.id
+    db_session.expunge_all()
+
+    stored = db_session.get(Consultation, consultation_id)
+    assert stored.wearable_data['rows'] == len(table)
+    assert 'rollups' not in stored.wearable_data
+    assert wearable_summary(stored) == table.describe()
+
+    series = db_session.query(WearableSeries).one()
+    assert {'data', 'rollups'} <= inspect(series).unloaded
+    assert wearable_rollups(stored) == rollup_table(table)
+    assert 'daily' not in stored.wearable_data
+    assert (
+        wearable_prompt_data(stored)['daily']
+        == (series.rollups['windows']['day'])
+    )
+    assert load_wearable_table(stored).to_records() == table.to_records()
+
+    save_wearable_table(stored, table, db_session)
+    db_session.commit()
+    assert db_session.query(WearableSeries).count() == 1
+
+
+def test_legacy_rows_are_converted(db_session, consultation):
+    """Rows stored inline before the series table are still readable."""
+    consultation.wearable_data = [{'hr': 60}, {'hr': 62}]
+    db_session.commit()
+
+    table = load_wearable_table(consultation)
+    assert table is not None
+    assert table.to_records() == [{'hr': 60}, {'hr': 62}]
+    assert wearable_summary(consultation)['hr']['mean'] == 61.0
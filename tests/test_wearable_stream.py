@@ -0,0 +1,177 @@
+"""Tests for streaming wearable extraction."""
+
+import asyncio
+import io
+import json
+import tempfile
+
+from pathlib import Path
+
+import pytest
+
+from fastapi import UploadFile
+from hiperhealth.agents.extraction import wearable
+from hiperhealth.agents.extraction.wearable import (
+    FileProcessingError,
+    RecordTooLongError,
+    WearableDataExtractorError,
+)
+
+TEST_DATA_PATH = Path(__file__).parent / 'data' / 'wearable'
+JSON_FILE = TEST_DATA_PATH / 'wearable_data.json'
+CSV_FILE = TEST_DATA_PATH / 'wearable_data.csv'
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    """Read 7 bytes at a time so values straddle chunk boundaries."""
+    monkeypatch.setattr(wearable, 'READ_BYTES', 7)
+
+
+class CountingReader(io.BytesIO):
+    """BytesIO recording how much was read before each batch."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.largest_read = 0
+
+    def read(self, size=-1):
+        """Read and record the request size."""
+        self.largest_read = max(self.largest_read, size)
+        return super().read(size)
+
+
+def _flatten(batches):
+    return [row for batch in batches for row in batch]
+
+
+@pytest.mark.parametrize('path', [CSV_FILE, JSON_FILE])
+def test_batches_match_full_extraction(wearable_extractor, small_reads, path):
+    """Streamed rows equal the materialised list, in order."""
+    batches = list(wearable_extractor.iter_wearable_records(path, 4))
+    assert all(len(batch) == 4 for batch in batches[:-1])
+    assert _flatten(batches) == wearable_extractor.extract_wearable_data(path)
+
+
+def test_stream_is_read_lazily(wearable_extractor):
+    """The first batch is produced before the file has been read."""
+    rows = [{'heart_rate': i} for i in range(50_000)]
+    stream = CountingReader(json.dumps(rows).encode())
+    batches = wearable_extractor.iter_wearable_records(stream, 1000)
+
+    assert next(batches) == rows[:1000]
+    assert stream.tell() < len(stream.getvalue())
+    assert stream.largest_read <= wearable.READ_BYTES
+    assert len(_flatten(batches)) == 49_000
+
+
+def test_quoted_newlines_and_split_numbers(wearable_extractor, small_reads):
+    """CSV quotes and JSON numbers survive chunk boundaries."""
+    csv_data = b'note,steps\n"slept\nwell, mostly",123456789\nok,2\n'
+    rows = _flatten(
+        wearable_extractor.iter_wearable_records(io.BytesIO(csv_data))
+    )
+    assert rows == [
+        {'note': 'slept\nwell, mostly', 'steps': 123456789},
+        {'note': 'ok', 'steps': 2},
+    ]
+
+    json_data = b'[ 123456789 , {"hr": 1.25e3} ,"x"]'
+    rows = _flatten(
+        wearable_extractor.iter_wearable_records(io.BytesIO(json_data))
+    )
+    assert rows == [123456789, {'hr': 1250.0}, 'x']
+
+
+def test_non_array_json_is_a_single_row(wearable_extractor, small_reads):
+    """A JSON object at the root is returned as one row."""
+    rows = _flatten(
+        wearable_extractor.iter_wearable_records(io.BytesIO(b'{"hr": 70}'))
+    )
+    assert rows == [{'hr': 70}]
+
+
+@pytest.mark.parametrize(
+    'data', [b'[{"hr": 70}, {"hr": }]', b'[{"hr": 70}', b'[1] [2]']
+)
+def test_malformed_json_raises(wearable_extractor, small_reads, data):
+    """Broken arrays raise FileProcessingError while streaming."""
+    with pytest.raises(FileProcessingError):
+        list(wearable_extractor.iter_wearable_records(io.BytesIO(data)))
+
+
+def test_oversized_record_is_rejected(
+    wearable_extractor, small_reads, monkeypatch
+):
+    """A single element larger than the limit stops the parse."""
+    monkeypatch.setattr(wearable, 'MAX_RECORD_CHARS', 100)
+    data = json.dumps([{'note': 'x' * 500}]).encode()
+    with pytest.raises(FileProcessingError, match='too long'):
+        list(wearable_extractor.iter_wearable_records(io.BytesIO(data)))
+
+
+def test_oversized_document_is_rejected(
+    wearable_extractor, small_reads, monkeypatch
+):
+    """A root that is not an array is capped like an element."""
+    monkeypatch.setattr(wearable, 'MAX_RECORD_CHARS', 100)
+    data = json.dumps({'note': 'x' * 500}).encode()
+    with pytest.raises(RecordTooLongError, match='document is too long'):
+        list(wearable_extractor.iter_wearable_records(io.BytesIO(data)))
+    assert issubclass(RecordTooLongError, ValueError)
+
+
+def test_split_element_is_decoded_once(
+    wearable_extractor, small_reads, monkeypatch
+):
+    """An element spanning many chunks is decoded when it closes."""
+    calls = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            calls.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(wearable._RecordParser, '_decoder', CountingDecoder())
+    rows = [{'note': 'a "quoted" ] } \\ x' * 20, 'hr': [1, {'b': 2}]}, 'y']
+    data = json.dumps(rows).encode()
+    batches = wearable_extractor.iter_wearable_records(io.BytesIO(data))
+
+    assert _flatten(batches) == rows
+    assert len(calls) < 10 < len(data) // wearable.READ_BYTES
+
+
+def test_async_upload_is_read_in_chunks(wearable_extractor, small_reads):
+    """UploadFile chunks are parsed as they arrive."""
+    spool = tempfile.SpooledTemporaryFile()
+    spool.write(CSV_FILE.read_bytes())
+    spool.seek(0)
+    upload = UploadFile(spool, filename='export.csv')
+
+    async def collect():
+        return [
+            batch
+            async for batch in wearable_extractor.aiter_wearable_records(
+                upload, chunk_rows=5
+            )
+        ]
+
+    batches = asyncio.run(collect())
+    assert [len(batch) for batch in batches] == [5, 5, 5]
+    assert _flatten(batches) == wearable_extractor.extract_wearable_data(
+        CSV_FILE
+    )
+
+
+def test_async_rejects_empty_and_unknown(wearable_extractor):
+    """Empty and unrecognised uploads fail before parsing."""
+
+    async def first(data):
+        upload = UploadFile(io.BytesIO(data), filename='x')
+        async for batch in wearable_extractor.aiter_wearable_records(upload):
+            return batch
+
+    with pytest.raises(WearableDataExtractorError, match='empty'):
+        asyncio.run(first(b''))
+    with pytest.raises(FileProcessingError):
+        asyncio.run(first(b'iasufoiasufioafuao\n'))
@@ -0,0 +1,120 @@
+"""Tests for the columnar wearable parser."""
+
+import io
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from hiperhealth.agents.extraction import columnar
+from hiperhealth.agents.extraction.columnar import (
+    Column,
+    WearableTable,
+    infer_kind,
+)
+from hiperhealth.agents.extraction.wearable import FileProcessingError
+
+TEST_DATA_PATH = Path(__file__).parent / 'data' / 'wearable'
+JSON_FILE = TEST_DATA_PATH / 'wearable_data.json'
+CSV_FILE = TEST_DATA_PATH / 'wearable_data.csv'
+
+
+@pytest.mark.parametrize('path', [CSV_FILE, JSON_FILE])
+def test_records_match_row_parser(wearable_extractor, path):
+    """``to_records`` reproduces the rows of ``extract_wearable_data``."""
+    table = wearable_extractor.extract_wearable_table(path)
+    assert table.to_records() == wearable_extractor.extract_wearable_data(path)
+
+
+def test_schema_is_inferred_per_column(wearable_extractor):
+    """Numbers, timestamps and categoricals get NumPy representations."""
+    table = wearable_extractor.extract_wearable_table(CSV_FILE)
+    assert table.schema['steps'] == 'int'
+    assert table.schema['heart_rate_sleep'] == 'float'
+    assert table.schema['date'] == 'date'
+    assert table.schema['sleep_start_time'] == 'datetime'
+    assert table.schema['os'] == 'category'
+    assert table.schema['timezone'] == 'category'
+
+    assert table['steps'].values.dtype == np.int64
+    assert table['os'].values.dtype == np.uint8
+    assert table['os'].categories.tolist() == ['android']
+    assert table['date'].values.dtype == np.dtype('datetime64[D]')
+
+
+def test_timestamps_are_stored_in_utc_with_offsets():
+    """Offsets are split off in bulk and the instants shifted to UTC."""
+    column = Column.from_strings(
+        'start',
+        ['2025-04-28T07:09-03:00', '2025-04-28T10:09:30Z', ''],
+    )
+    assert column.kind == 'datetime'
+    assert (column.values[0] == np.datetime64('2025-04-28T10:09')).all()
+    assert column.offsets.tolist() == [-180, 0, 0]
+    assert column.to_list() == [
+        '2025-04-28T07:09-03:00',
+        '2025-04-28T10:09:30+00:00',
+        None,
+    ]
+
+
+def test_values_outside_the_sample_demote_the_column(monkeypatch):
+    """A late value that does not fit the inferred type widens it."""
+    monkeypatch.setattr(columnar, 'SAMPLE_SIZE', 2)
+    assert Column.from_strings('a', ['1', '2', '3.5']).kind == 'float'
+    text = Column.from_strings('b', ['1', '2', 'n/a'])
+    assert text.kind == 'string'
+    assert text.to_list() == ['1', '2', 'n/a']
+    aware = '2025-01-01T00:00Z'
+    mixed = Column.from_strings('c', [aware, aware, '2025-01-01T00:00'])
+    assert mixed.kind == 'string'
+
+
+def test_missing_cells_are_masked():
+    """Empty cells become ``None`` without changing the column type."""
+    column = Column.from_strings('steps', ['10', '', ' 30 '])
+    assert column.kind == 'int'
+    assert column.mask.tolist() == [False, True, False]
+    assert column.to_list() == [10, None, 30]
+    assert np.isnan(Column.from_strings('hr', ['1.5', '']).values[1])
+
+
+def test_infer_kind():
+    """Inference picks the narrowest type fitting the sample."""
+    assert infer_kind(['1', '-2']) == 'int'
+    assert infer_kind(['1', '2.5e3']) == 'float'
+    assert infer_kind(['2025-05-08']) == 'date'
+    assert infer_kind(['2025-05-08 07:15:21']) == 'datetime'
+    assert infer_kind(['ios', 'ios', 'android', 'ios']) == 'category'
+    assert infer_kind(['a', 'b']) == 'string'
+
+
+def test_nested_json_values_are_kept_as_objects():
+    """JSON values that are not scalars stay Python objects."""
+    records = [
+        {'name': 'A', 'age': 30, 'records': [{'hr': 70}]},
+        {'name': 'B', 'records': []},
+    ]
+    table = WearableTable.from_records(records)
+    assert table.schema == {
+        'name': 'string',
+        'age': 'int',
+        'records': 'object',
+    }
+    assert table.to_records() == [
+        {'name': 'A', 'age': 30, 'records': [{'hr': 70}]},
+        {'name': 'B', 'age': None, 'records': []},
+    ]
+
+
+def test_inmemory_csv_table(wearable_extractor):
+    """Uploads are parsed without per-row dicts and ragged rows padded."""
+    upload = io.BytesIO(b'hr,os\n70,ios\n80\n90,ios\n')
+    table = wearable_extractor.extract_wearable_table(upload)
+    assert len(table) == 3
+    assert table['hr'].values.tolist() == [70, 80, 90]
+    assert table['os'].to_list() == ['ios', None, 'ios']
+
+    with pytest.raises(FileProcessingError):
+        wearable_extractor.extract_wearable_table(io.BytesIO(b'[1,'))